@@ -1,19 +1,23 @@
-from datetime import datetime, date
+import time
+from datetime import date
 from django import forms
 from django.conf import settings
 from django.contrib import admin, messages
-from django.core.files.base import ContentFile
-from django.core.mail import send_mail
-from django.http import HttpResponse
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.db import transaction
 from django.shortcuts import redirect, get_object_or_404
 from django.template.loader import render_to_string
 from django.urls import path, reverse
+from django.utils import timezone
 from django.utils.html import format_html
 #from .models import CertificateSettings
 from studentpanel.views import view_all_certificates
+from . import availability, conditional, documents, exports, media, refdata, sequences
+from .outbox import queue_mail, queue_mails
 from .models import (
     StudentProfile, FeeChallan, Project, ProjectSelection,
-    IDCard, Certificate, BatchSlot, ProjectIncharge, Director
+    IDCard, Certificate, BatchSlot, ProjectIncharge, Director, OutboundEmail
 )
 
 
@@ -34,27 +38,107 @@ class StudentProfileAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         first_select = obj.is_selected and not obj.unique_id
+        if first_select:
+            obj.unique_id = sequences.next_serial(sequences.STUDENT_PREFIX)
         super().save_model(request, obj, form, change)
 
         if first_select:
-            year = datetime.now().year % 100
-            seq = StudentProfile.objects.filter(is_selected=True).exclude(pk=obj.pk).count() + 1
-            obj.unique_id = f"STVT{year}/{seq:02d}"
-            obj.save(update_fields=["unique_id"])
             FeeChallan.objects.get_or_create(student=obj)
 
 
+# ---------- Bulk admit cards ----------
+def issue_admit_cards(modeladmin, request, selections):
+    """Render the admit cards of ``selections`` in parallel and mail the newly issued ones."""
+    selections = list(selections.filter(status="Approved").select_related("student__user", "project__batch_slot"))
+    if not selections:
+        modeladmin.message_user(request, "No approved selections.", level=messages.WARNING)
+        return
+
+    started = time.perf_counter()
+    issued, updated, skipped, failed = documents.admit_card_pdfs(selections)
+    elapsed = max(time.perf_counter() - started, 0.001)
+
+    link = request.build_absolute_uri("/dashboard/?tab=admit")
+    queue_mails(
+        ("Your Admit Card is Ready",
+         f"Dear {sel.student.student_name},\n\nDownload your admit card:\n{link}",
+         settings.DEFAULT_FROM_EMAIL,
+         [sel.student.user.email])
+        for sel in issued
+    )
+    rendered = len(issued) + len(updated) + len(failed)
+    modeladmin.message_user(
+        request,
+        f"Admit cards: {len(issued)} issued, {len(updated)} re-rendered, {skipped} unchanged, "
+        f"{len(failed)} failed ({rendered / elapsed:.1f}/s).",
+        level=messages.WARNING if failed else messages.SUCCESS,
+    )
+    for sel, error in failed[:10]:
+        modeladmin.message_user(request, f"{sel.student}: {error}", level=messages.ERROR)
+
+
 # ---------- Batch Slot ----------
 @admin.register(BatchSlot)
 class BatchSlotAdmin(admin.ModelAdmin):
-    list_display = ("start_date", "end_date")
+    list_display = ("start_date", "end_date", "rosters_btn")
+    actions = ["download_rosters", "generate_admit_cards"]
+
+    def get_urls(self):
+        base = super().get_urls()
+        extra = [
+            path("rosters/<int:pk>/", self.admin_site.admin_view(self._rosters_single), name="batch_rosters"),
+        ]
+        return extra + base
+
+    def rosters_btn(self, obj):
+        url = reverse("admin:batch_rosters", args=[obj.pk])
+        return format_html('<a class="button" href="{}">📦 Rosters (ZIP)</a>', url)
+    rosters_btn.short_description = "Rosters"
+
+    @admin.action(description="Download rosters of all projects in the selected batch slots (ZIP)")
+    def download_rosters(self, request, queryset):
+        return self._rosters_zip(request, list(queryset.order_by("start_date")))
+
+    @admin.action(description="Generate admit cards for all approved students in the selected batch slots")
+    def generate_admit_cards(self, request, queryset):
+        issue_admit_cards(self, request, ProjectSelection.objects.filter(project__batch_slot__in=queryset))
+
+    def _rosters_single(self, request, pk):
+        return self._rosters_zip(request, [get_object_or_404(BatchSlot, pk=pk)])
+
+    def _rosters_zip(self, request, slots):
+        projects = list(
+            Project.objects.filter(batch_slot__in=slots)
+            .select_related("batch_slot", "incharge")
+            .order_by("batch_slot__start_date", "project_code", "pk")
+        )
+        if not projects:
+            self.message_user(request, "No projects in the selected batch slot(s).", level=messages.WARNING)
+            return redirect("admin:studentpanel_batchslot_changelist")
+
+        # stale rosters are rendered in parallel here; the ZIP is then
+        # streamed from storage
+        names = documents.roster_pdfs(projects)
+        files = [
+            (
+                f"{p.batch_slot.start_date:%Y-%m-%d}/{p.project_code.replace('/', '_')}_{p.pk}.pdf",
+                lambda name=name: default_storage.open(name, "rb"),
+            )
+            for p, name in zip(projects, names)
+        ]
+        response = StreamingHttpResponse(exports.zip_stream(files), content_type="application/zip")
+        filename = f"rosters_{slots[0].start_date:%Y%m%d}.zip" if len(slots) == 1 else "rosters.zip"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
 
 # ---------- Fee Challan ----------
 @admin.register(FeeChallan)
 class FeeChallanAdmin(admin.ModelAdmin):
     list_display = ("student", "status", "ticket_number", "created_on", "sent_on", "send_btn", "verify_btn")
+    list_select_related = ("student",)
     list_filter = ("status",)
+    actions = ["issue_challans", "verify_payments"]
 
     def get_urls(self):
         base = super().get_urls()
@@ -78,62 +162,85 @@ class FeeChallanAdmin(admin.ModelAdmin):
         return "✔️" if obj.status == "Verified" else "-"
     verify_btn.short_description = "Payment"
 
+    @admin.action(description="Issue challans for selected students")
+    def issue_challans(self, request, queryset):
+        issued, skipped = self._issue_challans(request, queryset.select_related("student__user"))
+        self.message_user(request, f"Challans issued: {issued}, skipped (already issued): {skipped}.", level=messages.SUCCESS)
+
+    @admin.action(description="Verify payment for selected challans")
+    def verify_payments(self, request, queryset):
+        verified, skipped = self._verify_payments(request, queryset.select_related("student__user"))
+        self.message_user(request, f"Payments verified: {verified}, skipped (not in 'Sent' state): {skipped}.", level=messages.SUCCESS)
+
     def _send_single(self, request, pk):
-        challan = get_object_or_404(FeeChallan, pk=pk)
+        challan = get_object_or_404(FeeChallan.objects.select_related("student__user"), pk=pk)
         if challan.status != "Pending":
             self.message_user(request, "Already processed.", level=messages.WARNING)
             return redirect("..")
-        self._generate_and_email_challan(request, challan)
+        self._issue_challans(request, [challan])
         self.message_user(request, "Challan sent.", level=messages.SUCCESS)
         return redirect("..")
 
     def _verify_single(self, request, pk):
-        challan = get_object_or_404(FeeChallan, pk=pk)
+        challan = get_object_or_404(FeeChallan.objects.select_related("student__user"), pk=pk)
         if challan.status != "Sent":
             self.message_user(request, "Challan not in 'Sent' state.", level=messages.WARNING)
             return redirect("..")
-        challan.status = "Verified"
-        challan.save(update_fields=["status"])
-        profile = challan.student
-        profile.payment_verified = True
-        profile.save(update_fields=["payment_verified"])
-        link = request.build_absolute_uri("/dashboard/?tab=batch")
-        send_mail(
-            "Payment Verified – Select Your Project",
-            f"Dear {profile.student_name},\n\nYour fee payment is verified. "
-            f"Please log in to your dashboard and choose your project:\n{link}\n\nRegards,\nTraining Centre",
-            settings.DEFAULT_FROM_EMAIL,
-            [profile.user.email],
-            fail_silently=True,
-        )
+        self._verify_payments(request, [challan])
         self.message_user(request, "Payment verified & student notified.", level=messages.SUCCESS)
         return redirect("..")
 
-    def _generate_and_email_challan(self, request, challan):
-        profile = challan.student
-        html = render_to_string("studentpanel/challan.html", {
-            "student_name": profile.student_name,
-            "unique_id": profile.unique_id,
-            "date": date.today().strftime("%d-%m-%Y"),
-        })
-        fname = f"challan_{profile.unique_id}.html"
-        challan.challan_pdf.save(fname, ContentFile(html.encode("utf-8")))
-        challan.status = "Sent"
-        challan.sent_on = datetime.now()
-        challan.save(update_fields=["challan_pdf", "status", "sent_on"])
+    def _issue_challans(self, request, challans):
+        """Render, mark Sent and queue the email for every Pending challan. Returns (issued, skipped)."""
+        challans = list(challans)
+        todo = [c for c in challans if c.status == "Pending"]
+        now = timezone.now()
+        for challan in todo:
+            challan.status = "Sent"
+            challan.sent_on = now
+        documents.challan_pdfs(todo)
+        FeeChallan.objects.bulk_update(todo, ["challan_pdf", "input_hash", "status", "sent_on"])
+        conditional.bump_many(c.student.user_id for c in todo)
 
         dash_link = request.build_absolute_uri("/dashboard/?tab=challan")
-        send_mail(
-            "Your Fee Challan is Ready",
-            "",
-            settings.DEFAULT_FROM_EMAIL,
-            [profile.user.email],
-            html_message=render_to_string("studentpanel/email_challan.html", {
-                "student": profile.student_name,
-                "link": dash_link,
-            }),
-            fail_silently=True,
+        queue_mails(
+            (
+                "Your Fee Challan is Ready",
+                "",
+                settings.DEFAULT_FROM_EMAIL,
+                [c.student.user.email],
+                render_to_string("studentpanel/email_challan.html", {
+                    "student": c.student.student_name,
+                    "link": dash_link,
+                }),
+            )
+            for c in todo
+        )
+        return len(todo), len(challans) - len(todo)
+
+    def _verify_payments(self, request, challans):
+        """Mark Sent challans Verified, unlock project selection and notify. Returns (verified, skipped)."""
+        challans = list(challans)
+        todo = [c for c in challans if c.status == "Sent"]
+        for challan in todo:
+            challan.status = "Verified"
+            challan.student.payment_verified = True
+        FeeChallan.objects.bulk_update(todo, ["status"])
+        StudentProfile.objects.filter(pk__in=[c.student_id for c in todo]).update(payment_verified=True)
+        conditional.bump_many(c.student.user_id for c in todo)
+
+        link = request.build_absolute_uri("/dashboard/?tab=batch")
+        queue_mails(
+            (
+                "Payment Verified – Select Your Project",
+                f"Dear {c.student.student_name},\n\nYour fee payment is verified. "
+                f"Please log in to your dashboard and choose your project:\n{link}\n\nRegards,\nTraining Centre",
+                settings.DEFAULT_FROM_EMAIL,
+                [c.student.user.email],
+            )
+            for c in todo
         )
+        return len(todo), len(challans) - len(todo)
 
 
 # ---------- Project ----------
@@ -154,8 +261,10 @@ class ProjectAdminForm(forms.ModelForm):
 class ProjectAdmin(admin.ModelAdmin):
     form = ProjectAdminForm
     list_display = ("title", "branch", "duration_weeks", "slots", "slots_taken",  "incharge", "concerd_shop", "pdf_btn")
+    list_select_related = ("incharge",)
     list_filter = ("branch", "duration_weeks","incharge")
     search_fields = ("title", "project_code", "incharge__name", "concerd_shop")
+    actions = ["generate_admit_cards"]
     fieldsets = (
         ("Project Info", {
             "fields": ("project_code", "title", "branch", "incharge", "slots", "slots_taken", "batch_slot", "concerd_shop")
@@ -174,11 +283,14 @@ class ProjectAdmin(admin.ModelAdmin):
         return format_html(f'<a class="button" target="_blank" href="{url}">📄 View PDF</a>')
     pdf_btn.short_description = "Project PDF"
 
+    @admin.action(description="Generate admit cards for all approved students of the selected projects")
+    def generate_admit_cards(self, request, queryset):
+        issue_admit_cards(self, request, ProjectSelection.objects.filter(project__in=queryset))
+
     def view_project_pdf(self, request, pk):
-        project = get_object_or_404(Project, pk=pk)
-        students = ProjectSelection.objects.filter(project=project, status="Approved").select_related("student")
-        html = render_to_string("studentpanel/batch_pdf.html", {"project": project, "students": students})
-        return HttpResponse(html)
+        project = get_object_or_404(Project.objects.select_related("batch_slot", "incharge"), pk=pk)
+        name = documents.roster_pdf(project)
+        return FileResponse(default_storage.open(name, "rb"), content_type="application/pdf")
 
 
 # Custom Filter for ProjectIncharge
@@ -187,12 +299,11 @@ class ProjectInchargeFilter(admin.SimpleListFilter):
     parameter_name = "project_incharge"
 
     def lookups(self, request, model_admin):
-        incharges = ProjectIncharge.objects.all()
-        return [(incharge.id, incharge.name) for incharge in incharges]
+        return [(incharge.id, incharge.name) for incharge in refdata.incharges()]
 
     def queryset(self, request, queryset):
         if self.value():
-            return queryset.filter(project__Guide_By__id=self.value())
+            return queryset.filter(project__incharge_id=self.value())
         return queryset
 
 
@@ -202,6 +313,7 @@ class ProjectInchargeFilter(admin.SimpleListFilter):
 @admin.register(ProjectSelection)
 class ProjectSelectionAdmin(admin.ModelAdmin):
     list_display = ("student", "project", "status", "action_btn")
+    list_select_related = ("student__idcard", "project")
     list_filter = ("status", "project", ProjectInchargeFilter)
 
     def get_urls(self):
@@ -216,7 +328,7 @@ class ProjectSelectionAdmin(admin.ModelAdmin):
         if obj.status == "Pending":
             url = reverse("admin:psel_approve", args=[obj.pk])
             return format_html('<a class="button" href="{}">Approve</a>', url)
-        elif obj.status == "Approved" and not hasattr(obj, "idcard"):
+        elif obj.status == "Approved" and not hasattr(obj.student, "idcard"):
             url = reverse("admin:psel_send_admit", args=[obj.pk])
             return format_html('<a class="button" href="{}">Send Admit Card</a>', url)
         return "✔️"
@@ -227,15 +339,15 @@ class ProjectSelectionAdmin(admin.ModelAdmin):
         if sel.status != "Pending":
             self.message_user(request, "Already approved.", level=messages.WARNING)
             return redirect("..")
-        sel.status = "Approved"
-        sel.save(update_fields=["status"])
+        with transaction.atomic():
+            sel.status = "Approved"
+            sel.save(update_fields=["status"])
+            availability.refresh(sel.project_id)
 
-        profile = sel.student
-        if not hasattr(profile, 'certificate'):
-            year = datetime.now().year % 100
-            count = Certificate.objects.filter(serial_number__startswith=f"CERT{year}/").count() + 1
-            serial = f"CERT{year}/{count:02d}"
-            Certificate.objects.create(student=profile, serial_number=serial)
+            profile = sel.student
+            if not hasattr(profile, 'certificate'):
+                serial = sequences.next_serial(sequences.CERTIFICATE_PREFIX)
+                Certificate.objects.create(student=profile, serial_number=serial)
 
         self.message_user(request, "Project approved & certificate created.", level=messages.SUCCESS)
         return redirect("..")
@@ -247,21 +359,15 @@ class ProjectSelectionAdmin(admin.ModelAdmin):
             return redirect("..")
 
         profile = sel.student
-        project = sel.project
-        ctx = {"profile": profile, "project": project}
-
-        admit_html = render_to_string("studentpanel/admit_card.html", ctx)
         idcard, _ = IDCard.objects.get_or_create(student=profile)
-        idcard.id_pdf.save(f"admit_{profile.unique_id}.html", ContentFile(admit_html.encode("utf-8")))
-        idcard.save()
+        documents.admit_card_pdf(idcard, sel.project)
 
         link = request.build_absolute_uri("/dashboard/?tab=admit")
-        send_mail(
+        queue_mail(
             "Your Admit Card is Ready",
             f"Dear {profile.student_name},\n\nDownload your admit card:\n{link}",
             settings.DEFAULT_FROM_EMAIL,
             [profile.user.email],
-            fail_silently=True,
         )
 
         self.message_user(request, "Admit card sent.", level=messages.SUCCESS)
@@ -274,6 +380,7 @@ class ProjectSelectionAdmin(admin.ModelAdmin):
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
     list_display = ("student", "serial_number", "is_verified", "issued_on", "verify_btn")
+    list_select_related = ("student",)
     list_filter = ("is_verified",)
     readonly_fields = ("issued_on",)
     change_list_template = "admin/cert_change_list.html"
@@ -313,22 +420,14 @@ class CertificateAdmin(admin.ModelAdmin):
         cert.issued_on = date.today()
 
         profile = cert.student
-        project = ProjectSelection.objects.get(student=profile).project
-
-        # Render certificate HTML with dynamic signatures/names
-        html = render_to_string("studentpanel/certificate.html", {
-            "profile": profile,
-            "project": project,
-            "certificate": cert,
-            "today": date.today(),
-        })
-
-        fname = f"certificate_{profile.unique_id}.html"
-        cert.certificate_pdf.save(fname, ContentFile(html.encode("utf-8")))
+        project = ProjectSelection.objects.select_related("project__batch_slot", "project__incharge").get(student=profile).project
         cert.save()
 
-        link = request.build_absolute_uri(cert.certificate_pdf.url)
-        send_mail(
+        # Render the certificate PDF with dynamic signatures/names
+        documents.certificate_pdf(cert, project)
+
+        link = request.build_absolute_uri(media.signed_url("certificate", cert.pk))
+        queue_mail(
             "Your Internship Certificate is Ready",
             f"Dear {profile.student_name},\n\nDownload your certificate:\n{link}",
             settings.DEFAULT_FROM_EMAIL,
@@ -369,7 +468,7 @@ class DirectorAdmin(admin.ModelAdmin):
 
     def has_add_permission(self, request):
         # ✅ Allow only 1 director (singleton)
-        if Director.objects.exists():
+        if refdata.director() is not None:
             return False
         return True
 
@@ -378,3 +477,18 @@ class DirectorAdmin(admin.ModelAdmin):
             return format_html('<img src="{}" style="height:50px;"/>', obj.signature.url)
         return "No signature"
     signature_preview.short_description = "Signature"
+
+
+# ---------- Outbox ----------
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "recipients", "status", "attempts", "created_on", "sent_on")
+    list_filter = ("status",)
+    search_fields = ("recipients", "subject")
+    readonly_fields = ("attempts", "last_error", "created_on", "sent_on")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        n = queryset.exclude(status__in=["Sent", "Sending"]).update(status="Pending", next_attempt_at=timezone.now())
+        self.message_user(request, f"{n} email(s) queued for retry.", level=messages.SUCCESS)
@@ -0,0 +1,55 @@
+# studentpanel/allocation.py
+"""
+Project seat allocation.
+
+A seat is claimed with one conditional UPDATE
+(``slots_taken = slots_taken + 1 WHERE slots_taken < slots``) and the
+ProjectSelection is created in the same transaction, so a project can
+never be oversubscribed no matter how many students click at once. The
+database serialises the UPDATE itself (row lock on PostgreSQL, write lock
+on SQLite); nobody retries, a lost race simply gets FULL. The seats-left
+index the student pages read (availability.py) is updated in the same
+transaction.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from . import availability
+from .models import Project, ProjectSelection
+
+ALLOCATED        = "allocated"
+FULL             = "full"
+ALREADY_SELECTED = "already_selected"
+
+
+def claim_seat(profile, project_id):
+    """
+    Try to give ``profile`` a seat in project ``project_id``.
+
+    Returns ``(status, selection)``; ``selection`` is None unless the status
+    is ALLOCATED. Projects of another branch count as FULL.
+    """
+    try:
+        with transaction.atomic():
+            claimed = (
+                Project.objects
+                .filter(pk=project_id, branch=profile.branch, slots_taken__lt=F("slots"))
+                .update(slots_taken=F("slots_taken") + 1)
+            )
+            if not claimed:
+                return FULL, None
+            selection = ProjectSelection.objects.create(student=profile, project_id=project_id, status="Pending")
+            availability.claimed(project_id)
+    except IntegrityError:
+        # OneToOne on student: a second request from the same student lost
+        # the race; the seat increment was rolled back with it.
+        return ALREADY_SELECTED, None
+    return ALLOCATED, selection
+
+
+def release_seat(project_id):
+    """Give back the seat of a deleted selection."""
+    with transaction.atomic():
+        if Project.objects.filter(pk=project_id, slots_taken__gt=0).update(slots_taken=F("slots_taken") - 1):
+            availability.released(project_id)
+
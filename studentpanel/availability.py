@@ -0,0 +1,97 @@
+# studentpanel/availability.py
+"""
+Project availability index.
+
+SeatAvailability holds one row per project: its branch, batch slot and
+seats left, under an index on (branch, batch_slot, seats_left). The
+student pages list open projects from that index alone; project details
+come from the refdata catalogue, so neither touches the Project table.
+
+The rows live in the database, so every worker sees the same counts.
+They are kept up to date incrementally in the transaction that changes
+the seats: ``claimed`` in allocation.claim_seat, ``released`` when a
+selection is deleted, ``refresh`` when a project is saved or a selection
+approved. ``rebuild`` recomputes every row, for bulk writers that skip
+those paths (benchmark seeding).
+
+The index is advisory. claim_seat's conditional UPDATE on Project stays
+the authority for who gets a seat.
+"""
+import copy
+
+from django.db.models import F
+
+from . import refdata
+from .models import Project, SeatAvailability
+
+
+def seats(branch, batch_slot_ids):
+    """``{project_id: seats_left}`` for the open projects of a branch in the given slots."""
+    return dict(
+        SeatAvailability.objects
+        .filter(branch=branch, batch_slot_id__in=batch_slot_ids, seats_left__gt=0)
+        .values_list("project_id", "seats_left")
+    )
+
+
+def available_projects(branch, batch_slot_id=None):
+    """
+    Projects of a branch (optionally one batch slot) with seats left, as
+    Project objects carrying an ``available`` attribute.
+    """
+    catalogue = refdata.projects(branch)
+    if batch_slot_id is not None:
+        catalogue = [p for p in catalogue if p.batch_slot_id == batch_slot_id]
+    if not catalogue:
+        return []
+    left = seats(branch, sorted({p.batch_slot_id for p in catalogue}))
+
+    result = []
+    for project in catalogue:
+        if project.pk in left:
+            project = copy.copy(project)
+            project.available = left[project.pk]
+            result.append(project)
+    return result
+
+
+# ───────────────────────────────
+# Maintenance
+# ───────────────────────────────
+def claimed(project_id):
+    """A seat of ``project_id`` was taken."""
+    SeatAvailability.objects.filter(project_id=project_id, seats_left__gt=0).update(seats_left=F("seats_left") - 1)
+
+
+def released(project_id):
+    """A seat of ``project_id`` was given back."""
+    SeatAvailability.objects.filter(project_id=project_id).update(seats_left=F("seats_left") + 1)
+
+
+def _row(project):
+    return {
+        "branch": project["branch"],
+        "batch_slot_id": project["batch_slot_id"],
+        "seats_left": max(project["slots"] - project["slots_taken"], 0),
+    }
+
+
+_FIELDS = ("pk", "branch", "batch_slot_id", "slots", "slots_taken")
+
+
+def refresh(project_id):
+    """Recompute the row of one project from the Project table."""
+    project = Project.objects.filter(pk=project_id).values(*_FIELDS).first()
+    if project is None:
+        SeatAvailability.objects.filter(project_id=project_id).delete()
+    else:
+        SeatAvailability.objects.update_or_create(project_id=project_id, defaults=_row(project))
+
+
+def rebuild():
+    """Recompute every row."""
+    SeatAvailability.objects.all().delete()
+    SeatAvailability.objects.bulk_create(
+        [SeatAvailability(project_id=p["pk"], **_row(p)) for p in Project.objects.values(*_FIELDS).iterator()],
+        batch_size=1000,
+    )
@@ -0,0 +1,544 @@
+# studentpanel/benchmark.py
+"""
+Season-scale benchmark of the portal's hot paths.
+
+``seed`` fills the database with synthetic students (usernames ``bench…``,
+project codes ``BN-…``, batch slots in 2099) using bulk inserts, so 100k
+students take seconds rather than hours. ``run`` drives every scenario
+through the Django test client and measures latency percentiles, SQL
+query counts and peak Python memory; ``compare`` checks the result
+against a stored baseline. ``handler_throughput`` pushes the student
+views through Django's WSGI and ASGI request paths with many requests in
+flight and reports requests per second for each. These are handler-only
+numbers: the test clients call the handlers in this process, so no
+server (gunicorn, uvicorn, daphne), socket or HTTP parsing is involved.
+``server_throughput`` is the end-to-end counterpart: it starts gunicorn
+(sync workers) and uvicorn as subprocesses and drives them over TCP with
+a concurrent load generator. Those servers are not in requirements.txt;
+install them (``pip install gunicorn uvicorn``) to run it.
+
+Point SQLITE_PATH at a scratch file when benchmarking; see the
+``seed_benchmark`` and ``benchmark`` commands.
+"""
+import asyncio
+import importlib.util
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import availability, refdata, sequences
+from .models import (
+    BatchSlot, Certificate, Director, FeeChallan, IDCard, Project, ProjectIncharge, ProjectSelection, StudentProfile,
+)
+
+USER_PREFIX    = "bench"
+PROJECT_PREFIX = "BN-"
+SLOT_YEAR      = 2099
+ADMIN_USERNAME = "bench_admin"
+
+BRANCHES = ["Mechanical", "Electrical", "Civil", "Computer Science", "Electronics"]
+BATCH    = 2000
+
+
+# ───────────────────────────────
+# Seeding
+# ───────────────────────────────
+def flush():
+    """Delete everything a previous seed created."""
+    with transaction.atomic():
+        ProjectSelection.objects.filter(project__project_code__startswith=PROJECT_PREFIX).delete()
+        User.objects.filter(username__startswith=USER_PREFIX).delete()
+        Project.objects.filter(project_code__startswith=PROJECT_PREFIX).delete()
+        BatchSlot.objects.filter(start_date__year=SLOT_YEAR).delete()
+    refdata.bump()
+    cache.clear()
+
+
+def seed(students, projects_per_branch=40):
+    """
+    Insert ``students`` synthetic students. Roughly: 60 % have paid, 80 %
+    of those picked a project and 80 % of those picks are approved with a
+    certificate (half of them verified).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if not Director.objects.exists():
+            Director.objects.bulk_create([Director(name="Benchmark Director")])
+        incharge = ProjectIncharge.objects.bulk_create([ProjectIncharge(name="Benchmark Incharge")])[0]
+        slots = BatchSlot.objects.bulk_create([
+            BatchSlot(start_date=date(SLOT_YEAR, 5, 1) + timedelta(weeks=4 * i),
+                      end_date=date(SLOT_YEAR, 5, 28) + timedelta(weeks=4 * i), duration_weeks=4)
+            for i in range(4)
+        ])
+        seats = max(students // (len(BRANCHES) * projects_per_branch) + 1, 5)
+        projects = Project.objects.bulk_create([
+            Project(project_code=f"{PROJECT_PREFIX}{branch[:3].upper()}{n:03d}", title=f"{branch} project {n}",
+                    branch=branch, concerd_shop="Shop", incharge=incharge, slots=seats,
+                    batch_slot=slots[n % len(slots)], duration_weeks=4)
+            for branch in BRANCHES for n in range(projects_per_branch)
+        ])
+        by_branch = {b: [p for p in projects if p.branch == b] for b in BRANCHES}
+
+        start = User.objects.filter(username__startswith=USER_PREFIX).count()
+        users = User.objects.bulk_create([
+            User(username=f"{USER_PREFIX}{start + i:06d}", email=f"{USER_PREFIX}{start + i}@example.com",
+                 password="!")
+            for i in range(students)
+        ], batch_size=BATCH)
+
+        ids = sequences.reserve_serials(sequences.STUDENT_PREFIX, students)
+        profiles = StudentProfile.objects.bulk_create([
+            StudentProfile(user=u, student_name=f"Student {u.username}", father_name="Father", unique_id=uid,
+                           college="Benchmark College", course="B.Tech", branch=BRANCHES[i % len(BRANCHES)],
+                           address="Lucknow 226001", mobile="9999999999", payment_verified=i % 5 < 3)
+            for i, (u, uid) in enumerate(zip(users, ids))
+        ], batch_size=BATCH)
+
+        FeeChallan.objects.bulk_create([
+            FeeChallan(student=p, status="Verified" if p.payment_verified else "Sent", sent_on=now,
+                       ticket_number=f"T{p.pk}" if p.payment_verified else None)
+            for p in profiles
+        ], batch_size=BATCH)
+
+        selections, used = [], {p.pk: 0 for p in projects}
+        for i, profile in enumerate(p for p in profiles if p.payment_verified):
+            if i % 5 == 4:
+                continue
+            options = by_branch[profile.branch]
+            project = options[i % len(options)]
+            if used[project.pk] >= project.slots:
+                continue
+            used[project.pk] += 1
+            selections.append(ProjectSelection(student=profile, project=project,
+                                               status="Approved" if i % 5 < 3 else "Pending"))
+        ProjectSelection.objects.bulk_create(selections, batch_size=BATCH)
+        for project in projects:
+            project.slots_taken = used[project.pk]
+        Project.objects.bulk_update(projects, ["slots_taken"], batch_size=BATCH)
+        availability.rebuild()
+
+        approved = [s.student for s in selections if s.status == "Approved"]
+        if approved:
+            serials = sequences.reserve_serials(sequences.CERTIFICATE_PREFIX, len(approved))
+            Certificate.objects.bulk_create([
+                Certificate(student=p, serial_number=serial, is_verified=i % 2 == 0)
+                for i, (p, serial) in enumerate(zip(approved, serials))
+            ], batch_size=BATCH)
+            # no file yet: the admit card is rendered on its first download
+            IDCard.objects.bulk_create([IDCard(student=p) for p in approved], batch_size=BATCH)
+
+        User.objects.filter(username=ADMIN_USERNAME).delete()
+        User.objects.create_superuser(ADMIN_USERNAME, f"{ADMIN_USERNAME}@example.com", None)
+    refdata.bump()
+    cache.clear()
+    return {"students": students, "projects": len(projects), "selections": len(selections)}
+
+
+# ───────────────────────────────
+# Scenarios
+# ───────────────────────────────
+def _sample_users():
+    """A student in each state the student views care about, plus the admin."""
+    students = StudentProfile.objects.filter(user__username__startswith=USER_PREFIX)
+    return {
+        "unpaid": students.filter(payment_verified=False).values_list("user", flat=True).first(),
+        "choosing": students.filter(payment_verified=True, projectselection__isnull=True)
+                            .values_list("user", flat=True).first(),
+        "approved": students.filter(projectselection__status="Approved", certificate__is_verified=True)
+                            .values_list("user", flat=True).first(),
+        "admin": User.objects.filter(username=ADMIN_USERNAME).values_list("pk", flat=True).first(),
+    }
+
+
+def _changelist(model):
+    return reverse(f"admin:studentpanel_{model}_changelist")
+
+
+def scenarios():
+    """``[(name, user key, url, POST data or None)]``."""
+    slot = BatchSlot.objects.filter(start_date__year=SLOT_YEAR).order_by("start_date").first()
+    dashboard = reverse("studentpanel:dashboard")
+    return [
+        ("dashboard.profile", "approved", dashboard + "?tab=profile", None),
+        ("dashboard.unpaid", "unpaid", dashboard + "?tab=challan", None),
+        ("dashboard.choosing", "choosing", dashboard + "?tab=batch", None),
+        ("dashboard_tab.certificate", "approved", reverse("studentpanel:dashboard_tab", args=["certificate"]), None),
+        ("batch_allotment", "choosing", reverse("studentpanel:batch_allotment"), None),
+        ("batch_allotment.slot", "choosing", reverse("studentpanel:batch_allotment"),
+         {"batch_slot": slot.pk if slot else ""}),
+        ("challan_view", "approved", reverse("studentpanel:challan"), None),
+        ("admit_card", "approved", reverse("studentpanel:admit_card"), None),
+        ("certificate", "approved", reverse("studentpanel:certificate"), None),
+        ("admin.studentprofile", "admin", _changelist("studentprofile"), None),
+        ("admin.studentprofile.branch", "admin", _changelist("studentprofile") + "?branch=Mechanical", None),
+        ("admin.projectselection", "admin", _changelist("projectselection") + "?status=Approved", None),
+        ("admin.feechallan", "admin", _changelist("feechallan") + "?status=Sent", None),
+        ("admin.certificate", "admin", _changelist("certificate") + "?is_verified__exact=1", None),
+        ("admin.project", "admin", _changelist("project"), None),
+    ]
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _request(client, url, data):
+    response = client.post(url, data) if data is not None else client.get(url)
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def _measure(client, url, data, iterations):
+    _request(client, url, data)                         # warm caches, stored PDFs, sessions
+    timings, queries = [], []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            _request(client, url, data)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(ctx.captured_queries))
+
+    tracemalloc.start()
+    response = _request(client, url, data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "status": response.status_code,
+        "p50_ms": round(_percentile(timings, 50), 2),
+        "p95_ms": round(_percentile(timings, 95), 2),
+        "p99_ms": round(_percentile(timings, 99), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "queries": max(queries),
+        "peak_kib": peak // 1024,
+    }
+
+
+def run(iterations=30, only=None):
+    """Run every scenario (or those named in ``only``) and return the report dict."""
+    users = _sample_users()
+    results = {}
+    for name, user_key, url, data in scenarios():
+        if only and name not in only:
+            continue
+        user_id = users.get(user_key)
+        if user_id is None:
+            results[name] = {"error": f"no seeded '{user_key}' user"}
+            continue
+        client = Client()
+        client.force_login(User.objects.get(pk=user_id))
+        try:
+            results[name] = _measure(client, url, data, iterations)
+        except Exception as exc:        # e.g. WeasyPrint missing for the PDF views
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"[:200]}
+
+    return {
+        "meta": {
+            "students": StudentProfile.objects.filter(user__username__startswith=USER_PREFIX).count(),
+            "iterations": iterations,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "when": timezone.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+# ───────────────────────────────
+# Baseline comparison
+# ───────────────────────────────
+def compare(report, baseline, tolerance=0.2):
+    """
+    Rows of ``(name, metric, baseline, current, regressed)``. p95 latency may
+    grow by ``tolerance``; query counts and the presence of errors may not
+    grow at all.
+    """
+    rows = []
+    for name, current in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        if "error" in current or "error" in before:
+            rows.append((name, "error", before.get("error", "-"), current.get("error", "-"),
+                         "error" in current and "error" not in before))
+            continue
+        rows.append((name, "p95_ms", before["p95_ms"], current["p95_ms"],
+                     current["p95_ms"] > before["p95_ms"] * (1 + tolerance)))
+        rows.append((name, "queries", before["queries"], current["queries"],
+                     current["queries"] > before["queries"]))
+    return rows
+
+
+# ───────────────────────────────
+# WSGI vs ASGI
+# ───────────────────────────────
+HANDLER_SCENARIOS = ["certificate", "admit_card", "challan_view", "dashboard_tab.certificate"]
+CONNECTIONS       = [1, 16, 64, 256]
+
+
+def _wsgi_rps(url, cookies, connections, per_connection):
+    """One thread per connection, like a threaded WSGI server."""
+    statuses = []
+
+    def worker():
+        client = Client()
+        client.cookies.update(cookies)
+        try:
+            for _ in range(per_connection):
+                statuses.append(_request(client, url, None).status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(connections)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(statuses) / (time.perf_counter() - started), statuses
+
+
+async def _asgi_rps(url, cookies, connections, per_connection):
+    """One task per connection on a single event loop, like an ASGI server."""
+    statuses = []
+
+    async def worker():
+        client = AsyncClient()
+        client.cookies.update(cookies)
+        for _ in range(per_connection):
+            response = await client.get(url)
+            if getattr(response, "is_async", False):
+                [part async for part in response.streaming_content]
+            elif response.streaming:
+                b"".join(response.streaming_content)
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(connections)))
+    return len(statuses) / (time.perf_counter() - started), statuses
+
+
+def handler_throughput(connections=CONNECTIONS, requests=1000, only=None):
+    """
+    ``{scenario: {connections: {"wsgi_handler_rps", "asgi_handler_rps",
+    "errors"}}}``: requests per second through the WSGI and the ASGI
+    handler (each with the full middleware stack) with ``connections``
+    requests in flight. Handler-only: runs in this process through the
+    test clients against the configured database, so the numbers compare
+    the two request paths, not two servers.
+    """
+    users = _sample_users()
+    wanted = only or HANDLER_SCENARIOS
+    results = {}
+    for name, user_key, url, data in scenarios():
+        if name not in wanted or data is not None:
+            continue
+        user_id = users.get(user_key)
+        if user_id is None:
+            results[name] = {"error": f"no seeded '{user_key}' user"}
+            continue
+        client = Client()
+        client.force_login(User.objects.get(pk=user_id))
+        try:
+            _request(client, url, None)                 # warm caches and stored PDFs
+        except Exception as exc:
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"[:200]}
+            continue
+
+        results[name] = {}
+        for n in connections:
+            per_connection = max(requests // n, 1)
+            wsgi, wsgi_statuses = _wsgi_rps(url, client.cookies, n, per_connection)
+            asgi, asgi_statuses = async_to_sync(_asgi_rps)(url, client.cookies, n, per_connection)
+            results[name][n] = {
+                "wsgi_handler_rps": round(wsgi, 1),
+                "asgi_handler_rps": round(asgi, 1),
+                "errors": sum(s >= 400 for s in wsgi_statuses + asgi_statuses),
+            }
+    return results
+
+
+# ───────────────────────────────
+# gunicorn vs uvicorn
+# ───────────────────────────────
+# sync workers answer one request at a time per process and close the
+# connection after each response; uvicorn keeps it alive
+SERVERS = {
+    "gunicorn": ["gunicorn", "summer_training_portal.wsgi:application", "--worker-class", "sync",
+                 "--workers", "{workers}", "--bind", "127.0.0.1:{port}", "--log-level", "warning"],
+    "uvicorn": ["uvicorn", "summer_training_portal.asgi:application", "--workers", "{workers}",
+                "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning", "--no-access-log"],
+}
+SERVER_START_TIMEOUT = 30
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def _server(name, workers):
+    """Run ``name`` with ``workers`` processes on a free local port; yields the port."""
+    port = _free_port()
+    args = [arg.format(workers=workers, port=port) for arg in SERVERS[name]]
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen([sys.executable, "-m", *args], cwd=settings.BASE_DIR,
+                                   stdout=subprocess.DEVNULL, stderr=log)
+        try:
+            deadline = time.monotonic() + SERVER_START_TIMEOUT
+            while True:
+                if process.poll() is not None:
+                    log.seek(0)
+                    raise RuntimeError(f"{name} exited: {log.read()[-500:].decode(errors='replace')}")
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"{name} did not start within {SERVER_START_TIMEOUT} s")
+                    time.sleep(0.1)
+            yield port
+        finally:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+async def _fetch(reader, writer, request):
+    """Send one request and read the whole response: ``(status, keep alive)``."""
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip().lower()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)          # chunk and its CRLF
+            if not size:
+                break
+    else:
+        await reader.read()                             # body ends when the server closes
+        return status, False
+    return status, headers.get("connection") != "close"
+
+
+async def _connection(port, request, deadline, latencies, statuses):
+    """One client connection sending requests back to back until ``deadline``."""
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status, keep_alive = await _fetch(reader, writer, request)
+        except (OSError, EOFError, ValueError, IndexError):
+            status, keep_alive = 0, False
+        latencies.append(time.perf_counter() - started)
+        statuses.append(status)
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _load(port, request, connections, duration):
+    latencies, statuses = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _connection(port, request, started + duration, latencies, statuses) for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    ok = sum(200 <= s < 400 for s in statuses)
+    return {
+        "rps": round(ok / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "errors": len(statuses) - ok,
+    }
+
+
+def server_throughput(servers=tuple(SERVERS), connections=CONNECTIONS, duration=10, workers=None, only=None):
+    """
+    ``{scenario: {connections: {server: {"rps", "p50_ms", "p99_ms",
+    "errors"}}}}``: the student views served by real servers over local
+    TCP. Each server in ``servers`` (gunicorn with sync workers, uvicorn)
+    runs with ``workers`` processes against the configured database while
+    an asyncio load generator in this process keeps ``connections``
+    requests in flight for ``duration`` seconds per level. The generator
+    shares the machine, so compare the servers with each other rather
+    than reading the numbers as capacity.
+    """
+    workers = workers or os.cpu_count() or 1
+    users = _sample_users()
+    wanted = only or HANDLER_SCENARIOS
+    results, requests = {}, {}
+    for name, user_key, url, data in scenarios():
+        if name not in wanted or data is not None:
+            continue
+        user_id = users.get(user_key)
+        if user_id is None:
+            results[name] = {"error": f"no seeded '{user_key}' user"}
+            continue
+        client = Client()
+        client.force_login(User.objects.get(pk=user_id))
+        cookie = "; ".join(f"{key}={morsel.value}" for key, morsel in client.cookies.items())
+        requests[name] = f"GET {url} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n\r\n".encode()
+        results[name] = {}
+
+    for server in servers:
+        try:
+            if importlib.util.find_spec(server) is None:
+                raise RuntimeError(f"{server} is not installed")
+            with _server(server, workers) as port:
+                for name, request in requests.items():
+                    asyncio.run(_load(port, request, workers, 1))       # warm each worker
+                    for n in connections:
+                        results[name].setdefault(n, {})[server] = asyncio.run(_load(port, request, n, duration))
+        except RuntimeError as exc:
+            for name in requests:
+                for n in connections:
+                    results[name].setdefault(n, {}).setdefault(server, {"error": str(exc)[:200]})
+    return results
@@ -0,0 +1,109 @@
+# studentpanel/conditional.py
+"""
+Validators for the per-student documents (certificate, admit card, challan).
+
+A document changes only when one of its inputs does. There are two kinds
+of input:
+
+  the student's own rows     StudentProfile, FeeChallan, IDCard,
+                             Certificate, ProjectSelection. Saving or
+                             deleting any of them bumps the student's
+                             "docs:<user id>" CacheVersion row (signals.py)
+  shared reference data      Director, incharges, projects, batch slots:
+                             refdata.version()
+
+The ETag combines both stamps with the template version. It costs one
+indexed read, so the views' ``condition()`` decorators can answer a
+repeat request with 304 before any document query or render. Async views
+use ``acondition``, which runs the (ORM-backed) etag function in a worker
+thread first.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import CharField, F, Subquery, Value
+from django.db.models.functions import Cast, Concat
+from django.views.decorators.http import condition
+
+from . import documents, refdata
+from .models import CacheVersion, Certificate
+
+# saves that only store the rendered file do not change the document
+ARTIFACT_FIELDS = {"certificate_pdf", "id_pdf", "challan_pdf", "input_hash"}
+
+
+def _name(user_id):
+    return f"docs:{user_id}"
+
+
+def student_version(user_id):
+    return CacheVersion.objects.filter(name=_name(user_id)).values_list("version", flat=True).first() or 0
+
+
+def student_version_subquery(user_id):
+    """``student_version`` as a subquery, for ``user_id`` given as an expression (e.g. an OuterRef)."""
+    name = Concat(Value("docs:"), Cast(user_id, CharField()))
+    return Subquery(CacheVersion.objects.filter(name=name).values("version")[:1])
+
+
+def bump(user_id):
+    if not CacheVersion.objects.filter(name=_name(user_id)).update(version=F("version") + 1):
+        CacheVersion.objects.get_or_create(name=_name(user_id), defaults={"version": 1})
+
+
+def bump_many(user_ids, batch_size=500):
+    """``bump`` for the bulk writers (admin actions, commands) that skip signals."""
+    names = sorted({_name(user_id) for user_id in user_ids})
+    for i in range(0, len(names), batch_size):
+        chunk = names[i:i + batch_size]
+        CacheVersion.objects.filter(name__in=chunk).update(version=F("version") + 1)
+        existing = set(CacheVersion.objects.filter(name__in=chunk).values_list("name", flat=True))
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(name=name, version=1) for name in chunk if name not in existing],
+            ignore_conflicts=True,
+        )
+
+
+def etag(template_name, user_id, *extra):
+    parts = [documents.template_version(template_name), refdata.version(), student_version(user_id), *extra]
+    return '"' + hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def acondition(etag_func):
+    """
+    ``condition(etag_func=...)`` for async views. The ETag is also left on
+    ``request.document_etag`` for the view's own response.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=lambda request, *args, **kwargs: request.document_etag)(view)
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            request.document_etag = await sync_to_async(etag_func)(request, *args, **kwargs)
+            return await conditional_view(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+# ───────────────────────────────
+# etag_func for each view
+# ───────────────────────────────
+def certificate_etag(request):
+    return etag(documents.CERTIFICATE_TEMPLATE, request.user.pk)
+
+
+def certificate_admin_etag(request, cert_id):
+    user_id = Certificate.objects.filter(pk=cert_id).values_list("student__user_id", flat=True).first()
+    if user_id is None:
+        return None
+    # the HTML carries absolute image URLs, so it depends on the host too
+    return etag(documents.CERTIFICATE_TEMPLATE, user_id, "html", request.get_host())
+
+
+def admit_card_etag(request):
+    return etag(documents.ADMIT_CARD_TEMPLATE, request.user.pk)
+
+
+def challan_etag(request):
+    return etag(documents.CHALLAN_TEMPLATE, request.user.pk)
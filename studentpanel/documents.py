@@ -0,0 +1,351 @@
+# studentpanel/documents.py
+"""
+Stored PDF artifacts for challans, admit cards and certificates.
+
+Each document is rendered to a real PDF once and kept in the row's own
+file field (challan_pdf / id_pdf / certificate_pdf) next to a hash of
+everything the template reads. Later requests are served from the stored
+file; it is rendered again only when that hash changes.
+
+Project rosters have no row of their own; they are stored under
+ROSTER_DIR with the hash in the file name.
+"""
+import hashlib
+import json
+from datetime import date, datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+
+from . import refdata, verification
+from .models import IDCard, ProjectSelection
+from .pdf import PdfRenderError, render_pdf, render_pdfs_parallel
+
+CERTIFICATE_TEMPLATE = "studentpanel/certificate.html"
+ADMIT_CARD_TEMPLATE  = "studentpanel/admit_card.html"
+CHALLAN_TEMPLATE     = "studentpanel/challan.html"
+ROSTER_TEMPLATE      = "studentpanel/batch_pdf.html"
+
+ROSTER_DIR = "rosters"
+
+# WeasyPrint resolves /media/ and /static/ against this; the local URL
+# fetcher maps them back to disk by path, so the host is irrelevant.
+PDF_BASE_URL = "file:///"
+
+
+# ───────────────────────────────
+# Contexts
+# ───────────────────────────────
+def _file_url(field_file):
+    return field_file.url if field_file else None
+
+
+def _issue_date(certificate):
+    issued = getattr(certificate, "issued_on", None)
+    if isinstance(issued, datetime):
+        return timezone.localtime(issued).date()
+    return issued or date.today()
+
+
+def certificate_context(abs_url, profile, project, certificate, director):
+    """Template context for studentpanel/certificate.html."""
+    batch_slot = project.batch_slot
+
+    # Logo from MEDIA (change to STATIC if you actually serve it from static)
+    logo_media_path = getattr(settings, "MEDIA_URL", "/media/") + "cert_assets/word/media/image1.png"
+
+    return {
+        "profile": profile,
+        "project": project,
+        "incharge": project.incharge,
+        "director": director,
+        "start_date": getattr(batch_slot, "start_date", None),
+        "end_date": getattr(batch_slot, "end_date", None),
+        "today": _issue_date(certificate),
+        "issue_date": getattr(batch_slot, "start_date", date.today()),
+        "certificate": certificate,
+
+        # absolute URLs used by the template
+        "logo_url": abs_url(logo_media_path),
+        "photo_url": abs_url(_file_url(profile.photo_for_print)),
+        "incharge_sig_url": abs_url(_file_url(getattr(project.incharge, "signature_for_print", None))),
+        "director_sig_url": abs_url(_file_url(getattr(director, "signature_for_print", None))),
+
+        # QR code of the public verification page
+        "verify_qr": verification.qr_data_uri(verification.verify_url(certificate.serial_number)),
+    }
+
+
+def admit_card_context(profile, project, director):
+    return {"profile": profile, "project": project, "director": director}
+
+
+def roster_context(project, selections):
+    return {"project": project, "students": selections, "pdf": True}
+
+
+def challan_context(challan, director):
+    profile = challan.student
+    return {
+        "profile": profile,
+        "challan": challan,
+        "director": director,
+        "student_name": profile.student_name,
+        "unique_id": profile.unique_id,
+        "date": timezone.localtime(challan.sent_on or challan.created_on).strftime("%d-%m-%Y"),
+    }
+
+
+# ───────────────────────────────
+# Input fingerprints
+# ───────────────────────────────
+@lru_cache(maxsize=None)
+def template_version(template_name):
+    """Hash of the template source; editing the template invalidates its PDFs."""
+    source = get_template(template_name).template.source
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _snapshot(obj, *fields):
+    if obj is None:
+        return None
+    # FieldFile -> stored name, dates -> ISO string
+    return [str(getattr(obj, f) or "") for f in fields]
+
+
+def input_hash(template_name, *parts):
+    payload = json.dumps([template_version(template_name), *parts], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _director_inputs(director):
+    return _snapshot(director, "pk", "name", "signature", "signature_print")
+
+
+def certificate_inputs(certificate, project, director):
+    profile = certificate.student
+    return input_hash(
+        CERTIFICATE_TEMPLATE,
+        _snapshot(profile, "student_name", "college", "photo", "photo_print"),
+        _snapshot(project, "pk", "title", "incharge_id"),
+        _snapshot(project.batch_slot, "start_date", "end_date"),
+        _snapshot(project.incharge, "name", "signature", "signature_print"),
+        _director_inputs(director),
+        _snapshot(certificate, "serial_number"),
+        str(_issue_date(certificate)),
+        verification.verify_url(certificate.serial_number),
+    )
+
+
+def admit_card_inputs(profile, project, director):
+    return input_hash(
+        ADMIT_CARD_TEMPLATE,
+        _snapshot(profile, "unique_id", "student_name", "father_name", "course", "branch",
+                  "college", "address", "mobile", "photo", "photo_print"),
+        _snapshot(project, "pk", "title", "concerd_shop"),
+        _snapshot(project.batch_slot, "start_date", "end_date"),
+        _director_inputs(director),
+    )
+
+
+def challan_inputs(challan, director):
+    return input_hash(
+        CHALLAN_TEMPLATE,
+        _snapshot(challan.student, "unique_id", "student_name"),
+        _snapshot(challan, "sent_on", "created_on"),
+        _director_inputs(director),
+    )
+
+
+def roster_inputs(project, selections):
+    return input_hash(
+        ROSTER_TEMPLATE,
+        _snapshot(project, "pk", "project_code", "title", "concerd_shop"),
+        _snapshot(project.batch_slot, "pk", "start_date", "end_date"),
+        _snapshot(project.incharge, "name", "signature", "signature_print"),
+        [_snapshot(sel.student, "unique_id", "student_name", "college", "branch", "course") for sel in selections],
+    )
+
+
+# ───────────────────────────────
+# Stored PDFs
+# ───────────────────────────────
+def _safe_id(profile):
+    return (profile.unique_id or str(profile.pk)).replace("/", "_")
+
+
+def _is_current(row, field_name, digest):
+    field = getattr(row, field_name)
+    return bool(field) and row.input_hash == digest and field.storage.exists(field.name)
+
+
+def _store(row, field_name, filename, pdf, digest):
+    """Write the PDF into row.<field_name> and set input_hash; the row itself is not saved."""
+    field = getattr(row, field_name)
+    if field:
+        field.delete(save=False)
+    field.save(filename, ContentFile(pdf), save=False)
+    row.input_hash = digest
+
+
+def _stored_pdf(row, field_name, filename, digest, template_name, build_context):
+    """Return row.<field_name>, rendering it first when it is missing or stale."""
+    if not _is_current(row, field_name, digest):
+        pdf = render_pdf(render_to_string(template_name, build_context()), base_url=PDF_BASE_URL)
+        _store(row, field_name, filename, pdf, digest)
+        row.save(update_fields=[field_name, "input_hash"])
+    return getattr(row, field_name)
+
+
+def certificate_pdf(certificate, project, director=None):
+    director = director or refdata.director()
+    return _stored_pdf(
+        certificate, "certificate_pdf",
+        f"certificate_{_safe_id(certificate.student)}.pdf",
+        certificate_inputs(certificate, project, director),
+        CERTIFICATE_TEMPLATE,
+        lambda: certificate_context(lambda url: url, certificate.student, project, certificate, director),
+    )
+
+
+def admit_card_pdf(idcard, project, director=None):
+    director = director or refdata.director()
+    profile = idcard.student
+    return _stored_pdf(
+        idcard, "id_pdf",
+        f"admit_{_safe_id(profile)}.pdf",
+        admit_card_inputs(profile, project, director),
+        ADMIT_CARD_TEMPLATE,
+        lambda: admit_card_context(profile, project, director),
+    )
+
+
+def challan_pdf(challan, director=None):
+    director = director or refdata.director()
+    return _stored_pdf(
+        challan, "challan_pdf",
+        f"challan_{_safe_id(challan.student)}.pdf",
+        challan_inputs(challan, director),
+        CHALLAN_TEMPLATE,
+        lambda: challan_context(challan, director),
+    )
+
+
+def challan_pdfs(challans, director=None):
+    """
+    Bulk variant of challan_pdf: every stale challan is laid out in one
+    parallel run. The files are written but the rows are not saved; the
+    changed rows are returned for the caller's bulk_update of
+    ``challan_pdf`` and ``input_hash``.
+    """
+    director = director or refdata.director()
+    stale = [(c, challan_inputs(c, director)) for c in challans]
+    stale = [(c, digest) for c, digest in stale if not _is_current(c, "challan_pdf", digest)]
+
+    htmls = [render_to_string(CHALLAN_TEMPLATE, challan_context(c, director)) for c, _ in stale]
+    for (challan, digest), pdf in zip(stale, render_pdfs_parallel(htmls, base_url=PDF_BASE_URL)):
+        _store(challan, "challan_pdf", f"challan_{_safe_id(challan.student)}.pdf", pdf, digest)
+    return [c for c, _ in stale]
+
+
+def admit_card_pdfs(selections, director=None, workers=None):
+    """
+    Bulk variant of admit_card_pdf for approved selections (with
+    ``student`` and ``project__batch_slot`` loaded). Stale or missing
+    admit cards are rendered in one parallel run; IDCards are created or
+    updated only for cards that rendered.
+
+    Returns ``(issued, updated, skipped, failed)``: selections that got a
+    new IDCard, selections whose IDCard was re-rendered, the number left
+    unchanged, and ``[(selection, error message)]``.
+    """
+    selections = list(selections)
+    director = director or refdata.director()
+    existing = {c.student_id: c for c in IDCard.objects.filter(student__in=[s.student_id for s in selections])}
+
+    stale = []
+    for sel in selections:
+        idcard = existing.get(sel.student_id) or IDCard(student=sel.student)
+        digest = admit_card_inputs(sel.student, sel.project, director)
+        if not _is_current(idcard, "id_pdf", digest):
+            stale.append((sel, idcard, digest))
+
+    htmls = [render_to_string(ADMIT_CARD_TEMPLATE, admit_card_context(sel.student, sel.project, director))
+             for sel, _, _ in stale]
+    results = render_pdfs_parallel(htmls, base_url=PDF_BASE_URL, workers=workers, return_exceptions=True)
+
+    issued, updated, failed = [], [], []
+    for (sel, idcard, digest), pdf in zip(stale, results):
+        if isinstance(pdf, PdfRenderError):
+            failed.append((sel, str(pdf)))
+            continue
+        _store(idcard, "id_pdf", f"admit_{_safe_id(sel.student)}.pdf", pdf, digest)
+        (updated if idcard.pk else issued).append((sel, idcard))
+
+    IDCard.objects.bulk_create([idcard for _, idcard in issued])
+    # bulk_create sends no post_save, so move the new cards' students on here
+    # (re-rendered cards only change the stored file)
+    from .conditional import bump_many
+    bump_many(sel.student.user_id for sel, _ in issued)
+    IDCard.objects.bulk_update([idcard for _, idcard in updated], ["id_pdf", "input_hash"])
+    skipped = len(selections) - len(stale)
+    return [sel for sel, _ in issued], [sel for sel, _ in updated], skipped, failed
+
+
+# ───────────────────────────────
+# Rosters
+# ───────────────────────────────
+def approved_selections(projects):
+    """``{project_id: [approved selections]}`` for several projects in one query."""
+    by_project = {p.pk: [] for p in projects}
+    rows = (
+        ProjectSelection.objects
+        .filter(project__in=list(by_project), status="Approved")
+        .select_related("student")
+        .order_by("pk")
+    )
+    for sel in rows:
+        by_project[sel.project_id].append(sel)
+    return by_project
+
+
+def _roster_name(project, digest):
+    return f"{ROSTER_DIR}/roster_{project.pk}_{digest[:16]}.pdf"
+
+
+def _drop_rosters(projects):
+    """Delete the stored rosters of ``projects``, listing the directory once."""
+    if not projects or not default_storage.exists(ROSTER_DIR):
+        return
+    prefixes = {f"roster_{project.pk}_" for project in projects}
+    for old in default_storage.listdir(ROSTER_DIR)[1]:
+        if old[:old.rfind("_") + 1] in prefixes:        # the digest has no underscore
+            default_storage.delete(f"{ROSTER_DIR}/{old}")
+
+
+def roster_pdfs(projects):
+    """
+    Stored roster PDF names for ``projects`` (in order). Rosters whose
+    approved students, project details and template are unchanged are
+    reused; the rest are rendered together in one parallel run and
+    replace the project's older versions.
+    """
+    projects = list(projects)
+    selections = approved_selections(projects)
+    names = [_roster_name(p, roster_inputs(p, selections[p.pk])) for p in projects]
+
+    stale = [(p, name) for p, name in zip(projects, names) if not default_storage.exists(name)]
+    htmls = [render_to_string(ROSTER_TEMPLATE, roster_context(p, selections[p.pk])) for p, _ in stale]
+    pdfs = render_pdfs_parallel(htmls, base_url=PDF_BASE_URL)
+    _drop_rosters([p for p, _ in stale])
+    for (_, name), pdf in zip(stale, pdfs):
+        default_storage.save(name, ContentFile(pdf))
+    return names
+
+
+def roster_pdf(project):
+    return roster_pdfs([project])[0]
@@ -0,0 +1,307 @@
+# studentpanel/exports.py
+"""
+Streaming spreadsheet exports of students, selections, challans and
+certificates.
+
+Rows are read with ``values_list(...).iterator()`` and written out as they
+arrive, so memory use does not grow with the number of rows. CSV uses the
+csv module; XLSX is written as a zip stream holding one worksheet of
+inline strings, which needs no spreadsheet library and no temp file.
+``zip_stream`` streams a bundle of stored files the same way.
+"""
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import Certificate, FeeChallan, ProjectSelection, StudentProfile
+
+CHUNK_SIZE = 2000
+
+_BATCH = "project__batch_slot"
+_STUDENT_BATCH = "student__projectselection__project__batch_slot"
+
+
+# ───────────────────────────────
+# Export definitions
+# ───────────────────────────────
+class Export:
+    """
+    One downloadable table.
+
+    ``columns`` are ``(header, lookup)`` pairs read with values_list;
+    ``filters`` maps the query parameters branch / batch_slot / status to
+    lookups. ``status_values`` maps the accepted ``status`` values to what
+    is stored.
+    """
+
+    def __init__(self, model, columns, filters, status_values):
+        self.model = model
+        self.columns = columns
+        self.filters = filters
+        self.status_values = status_values
+
+    @property
+    def header(self):
+        return [h for h, _ in self.columns]
+
+    def clean(self, params):
+        """Filter kwargs for the query parameters; ValueError for a bad batch_slot or status."""
+        lookups = {}
+        for param, lookup in self.filters.items():
+            value = params.get(param)
+            if not value:
+                continue
+            if param == "batch_slot":
+                value = int(value)
+            elif param == "status":
+                if value not in self.status_values:
+                    raise ValueError(f"Unknown status {value!r}.")
+                value = self.status_values[value]
+            lookups[lookup] = value
+        return lookups
+
+    def rows(self, params):
+        qs = self.model.objects.filter(**self.clean(params))
+        return qs.order_by("pk").values_list(*[lookup for _, lookup in self.columns]).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _choices(model):
+    return {value: value for value, _ in model._meta.get_field("status").choices}
+
+
+_STUDENT_COLUMNS = [
+    ("Student ID", "student__unique_id"),
+    ("Name", "student__student_name"),
+    ("Branch", "student__branch"),
+    ("College", "student__college"),
+]
+
+EXPORTS = {
+    "students": Export(
+        StudentProfile,
+        [
+            ("Student ID", "unique_id"),
+            ("Name", "student_name"),
+            ("Father's Name", "father_name"),
+            ("College", "college"),
+            ("Course", "course"),
+            ("Branch", "branch"),
+            ("Mobile", "mobile"),
+            ("Email", "user__email"),
+            ("Payment Verified", "payment_verified"),
+            ("Project Code", "projectselection__project__project_code"),
+            ("Project", "projectselection__project__title"),
+            ("Selection Status", "projectselection__status"),
+            ("Batch Start", "projectselection__project__batch_slot__start_date"),
+            ("Batch End", "projectselection__project__batch_slot__end_date"),
+        ],
+        {"branch": "branch", "batch_slot": "projectselection__project__batch_slot", "status": "projectselection__status"},
+        _choices(ProjectSelection),
+    ),
+    "selections": Export(
+        ProjectSelection,
+        _STUDENT_COLUMNS + [
+            ("Project Code", "project__project_code"),
+            ("Project", "project__title"),
+            ("Shop", "project__concerd_shop"),
+            ("Incharge", "project__incharge__name"),
+            ("Batch Start", f"{_BATCH}__start_date"),
+            ("Batch End", f"{_BATCH}__end_date"),
+            ("Status", "status"),
+            ("Selected On", "selected_on"),
+        ],
+        {"branch": "project__branch", "batch_slot": _BATCH, "status": "status"},
+        _choices(ProjectSelection),
+    ),
+    "challans": Export(
+        FeeChallan,
+        _STUDENT_COLUMNS + [
+            ("Ticket Number", "ticket_number"),
+            ("Status", "status"),
+            ("Sent On", "sent_on"),
+            ("Created On", "created_on"),
+            ("Batch Start", f"{_STUDENT_BATCH}__start_date"),
+        ],
+        {"branch": "student__branch", "batch_slot": _STUDENT_BATCH, "status": "status"},
+        _choices(FeeChallan),
+    ),
+    "certificates": Export(
+        Certificate,
+        _STUDENT_COLUMNS + [
+            ("Serial Number", "serial_number"),
+            ("Verified", "is_verified"),
+            ("Issued On", "issued_on"),
+            ("Project", "student__projectselection__project__title"),
+            ("Batch Start", f"{_STUDENT_BATCH}__start_date"),
+            ("Batch End", f"{_STUDENT_BATCH}__end_date"),
+        ],
+        {"branch": "student__branch", "batch_slot": _STUDENT_BATCH, "status": "is_verified"},
+        {"Verified": True, "Pending": False},
+    ),
+}
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+# ───────────────────────────────
+# CSV
+# ───────────────────────────────
+# spreadsheet apps read a CSV cell starting with one of these as a formula
+_FORMULA_START = ("=", "+", "-", "@", "\t", "\r")
+
+
+class _Echo:
+    """File-like object whose write() hands the line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    value = _cell(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_START):
+        return "'" + value
+    return value
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(_Echo())
+    yield "﻿" + writer.writerow(header)      # BOM so Excel picks UTF-8
+    for row in rows:
+        yield writer.writerow([_csv_cell(v) for v in row])
+
+
+# ───────────────────────────────
+# XLSX
+# ───────────────────────────────
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{title}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_TAIL = "</sheetData></worksheet>"
+
+# characters XML 1.0 does not allow
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _Buffer:
+    """Write-only sink for ZipFile; take() returns and clears what was written."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        value = _cell(value)
+        if isinstance(value, (int, float)):
+            cells.append(f"<c><v>{value}</v></c>")
+        elif value != "":
+            text = escape(_ILLEGAL_XML.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        else:
+            cells.append("<c/>")
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def xlsx_stream(header, rows, title="Export"):
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in XLSX_PARTS.items():
+            zf.writestr(name, xml.replace("{title}", escape(title[:31])))
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((SHEET_HEAD + _xlsx_row(header)).encode("utf-8"))
+            pending = []
+            for row in rows:
+                pending.append(_xlsx_row(row))
+                if len(pending) >= 500:
+                    sheet.write("".join(pending).encode("utf-8"))
+                    pending = []
+                    yield buffer.take()
+            sheet.write(("".join(pending) + SHEET_TAIL).encode("utf-8"))
+    yield buffer.take()
+
+
+# ───────────────────────────────
+# ZIP bundles
+# ───────────────────────────────
+COPY_CHUNK = 64 * 1024
+
+
+def zip_stream(files, compression=zipfile.ZIP_STORED):
+    """
+    Zip ``(arcname, open_file)`` pairs into a stream of byte chunks;
+    ``open_file()`` returns a readable binary file. Nothing is written to
+    disk. Stored (not deflated) by default: PDFs are compressed already.
+    """
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, "w", compression) as zf:
+        for arcname, open_file in files:
+            with open_file() as src, zf.open(arcname, "w", force_zip64=True) as dest:
+                while chunk := src.read(COPY_CHUNK):
+                    dest.write(chunk)
+                    yield buffer.take()
+    yield buffer.take()
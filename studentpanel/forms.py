@@ -2,7 +2,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db.models import F
+from . import availability
 from .models import StudentProfile, Project, BatchSlot
 from .models import FeeChallan
 
@@ -90,21 +90,23 @@ class RegistrationForm(forms.ModelForm):
 
 # --------------- Project Request Form ----------------
 class ProjectRequestForm(forms.Form):
-    project_id = forms.ModelChoiceField(
-        queryset=Project.objects.none(),
+    project_id = forms.TypedChoiceField(
+        coerce=int,
         widget=forms.RadioSelect,
-        empty_label=None,
         label="Choose one project",
     )
 
-    def __init__(self, branch, *args, **kwargs):
+    def __init__(self, branch, *args, projects=None, **kwargs):
+        # `projects` lets the caller share an already evaluated list so the
+        # available-projects query is not repeated for validation.
         super().__init__(*args, **kwargs)
-        self.fields["project_id"].queryset = (
-            Project.objects
-            .filter(branch=branch)
-            .annotate(available=F("slots") - F("slots_taken"))
-            .filter(available__gt=0)
-        )
+        if projects is None:
+            projects = availability.available_projects(branch)
+        self._projects = {p.pk: p for p in projects}
+        self.fields["project_id"].choices = [(p.pk, str(p)) for p in self._projects.values()]
+
+    def clean_project_id(self):
+        return self._projects[self.cleaned_data["project_id"]]
 
 
 
@@ -0,0 +1,144 @@
+# studentpanel/images.py
+"""
+Size-bounded derivatives of uploaded photos and signatures.
+
+Students upload photos of up to 4 MB and signatures are stored exactly as
+uploaded. Pages and PDFs embed these derivatives instead:
+
+  photo_thumb      small JPEG for the dashboard
+  photo_print      JPEG sized for a passport photo at print resolution
+  signature_print  signature with the blank margins trimmed, as PNG
+
+They are built once, when the source file changes (see signals.py). The
+``build_image_derivatives`` command backfills existing media. They are
+written without save signals, so the cache stamps covering them (the
+student's documents, or the reference data) are bumped here.
+"""
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageChops, ImageOps
+
+from . import conditional, refdata
+from .models import Director, ProjectIncharge, StudentProfile
+
+log = logging.getLogger(__name__)
+
+THUMB_SIZE      = (200, 200)
+PRINT_SIZE      = (480, 600)     # 40 x 50 mm at 300 dpi
+SIGNATURE_SIZE  = (600, 200)
+JPEG_QUALITY    = 85
+TRIM_THRESHOLD  = 24             # how far from white still counts as background
+
+
+# ───────────────────────────────
+# Pillow operations
+# ───────────────────────────────
+def _flatten(img):
+    """RGB image; transparency is composited onto white."""
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _jpeg(img, size):
+    img = _flatten(img)
+    img.thumbnail(size, Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def thumbnail(img):
+    return _jpeg(img, THUMB_SIZE)
+
+
+def print_photo(img):
+    return _jpeg(img, PRINT_SIZE)
+
+
+def trimmed_signature(img):
+    img = _flatten(img)
+    # bounding box of everything noticeably darker than white
+    diff = ImageChops.difference(img, Image.new("RGB", img.size, (255, 255, 255))).convert("L")
+    bbox = diff.point(lambda p: 255 if p > TRIM_THRESHOLD else 0).getbbox()
+    if bbox:
+        img = img.crop(bbox)
+    img.thumbnail(SIGNATURE_SIZE, Image.LANCZOS)
+    out = io.BytesIO()
+    img.convert("L").save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+# ───────────────────────────────
+# Derivatives per model
+# ───────────────────────────────
+# model -> [(source field, derivative field, suffix, extension, builder)]
+DERIVATIVES = {
+    StudentProfile: [
+        ("photo", "photo_thumb", "thumb", "jpg", thumbnail),
+        ("photo", "photo_print", "print", "jpg", print_photo),
+    ],
+    ProjectIncharge: [("signature", "signature_print", "print", "png", trimmed_signature)],
+    Director: [("signature", "signature_print", "print", "png", trimmed_signature)],
+}
+
+
+def _derived_stem(source, suffix):
+    return f"{os.path.splitext(os.path.basename(source.name))[0]}_{suffix}"
+
+
+def _is_current(source, derived, suffix):
+    # derivative names carry the source name, so a new upload never matches
+    return bool(derived) and os.path.splitext(os.path.basename(derived.name))[0] == _derived_stem(source, suffix)
+
+
+def bump_versions(model, instances):
+    """Record changed derivatives of ``instances``: their students' documents, or the reference data."""
+    if model is StudentProfile:
+        conditional.bump_many([instance.user_id for instance in instances])
+    else:
+        refdata.bump()
+
+
+def update_derivatives(instance, force=False, bump=True):
+    """
+    Build the missing or outdated derivatives of ``instance`` and store
+    them with a queryset UPDATE (no save signals). Returns the names of
+    the fields that changed. With ``bump=False`` the caller runs
+    ``bump_versions`` itself, once for a whole batch.
+    """
+    changed = {}
+    for source_name, derived_name, suffix, ext, build in DERIVATIVES[type(instance)]:
+        source, derived = getattr(instance, source_name), getattr(instance, derived_name)
+        if not source:
+            if derived:
+                derived.delete(save=False)
+                changed[derived_name] = ""
+            continue
+        if not force and _is_current(source, derived, suffix):
+            continue
+        try:
+            with source.open("rb") as f, Image.open(f) as img:
+                data = build(img)
+        except OSError as exc:      # missing file or not an image: keep serving the original
+            log.warning("No %s for %s #%s: %s", derived_name, type(instance).__name__, instance.pk, exc)
+            continue
+        if derived:
+            derived.delete(save=False)
+        derived.save(f"{_derived_stem(source, suffix)}.{ext}", ContentFile(data), save=False)
+        changed[derived_name] = derived.name
+
+    if changed:
+        with transaction.atomic():
+            type(instance).objects.filter(pk=instance.pk).update(**changed)
+            if bump:
+                bump_versions(type(instance), [instance])
+    return list(changed)
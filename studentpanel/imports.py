@@ -0,0 +1,162 @@
+# studentpanel/imports.py
+"""
+Bulk import of applicants from a college's CSV list.
+
+Registering through RegistrationForm costs a PBKDF2 hash, a User INSERT,
+a serial number, a StudentProfile INSERT and a FeeChallan INSERT per
+student. Here the CSV is read in chunks; for each chunk the rows are
+validated against the form's rules, the passwords are hashed across a
+process pool, the student IDs are reserved as one block and User,
+StudentProfile and FeeChallan are written with ``bulk_create`` in one
+transaction. ``bulk_create`` sends no signals, so the rows are complete
+before they are inserted.
+"""
+import csv
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from . import sequences
+from .models import FeeChallan, StudentProfile
+
+CHUNK_SIZE = 1000
+
+PROFILE_FIELDS = ["student_name", "father_name", "college", "course", "branch", "address", "mobile"]
+REQUIRED       = ["username", "email"] + PROFILE_FIELDS
+COLUMNS        = REQUIRED + ["password"]
+
+
+class StudentImportError(Exception):
+    """The file itself cannot be imported (missing columns …)."""
+
+
+def _chunks(reader, size):
+    while chunk := list(islice(reader, size)):
+        yield chunk
+
+
+def _model_field(name):
+    model = User if name in ("username", "email") else StudentProfile
+    return model._meta.get_field(name)
+
+
+def _clean(row):
+    """
+    Stripped copy of ``row`` or a ValidationError, by RegistrationForm's
+    rules and the model fields' own validation (max_length, the username
+    validator, email).
+    """
+    row = {k: (row.get(k) or "").strip() for k in COLUMNS}
+    missing = [k for k in REQUIRED if not row[k]]
+    if missing:
+        raise ValidationError(f"missing {', '.join(missing)}")
+    if len(row["username"]) > 30:
+        raise ValidationError("username longer than 30 characters")
+    for name in REQUIRED:
+        try:
+            row[name] = _model_field(name).clean(row[name], None)
+        except ValidationError as exc:
+            raise ValidationError(f"{name}: {' '.join(exc.messages)}")
+    if not row["mobile"].isdigit() or len(row["mobile"]) != 10:
+        raise ValidationError("mobile must be 10 digits")
+    return row
+
+
+def _hash_all(passwords, pool, workers):
+    if pool is None or len(passwords) < 2 * workers:
+        return [make_password(p) for p in passwords]
+    return list(pool.map(make_password, passwords, chunksize=max(len(passwords) // (workers * 4), 1)))
+
+
+def import_students(lines, chunk_size=CHUNK_SIZE, workers=None, generate_passwords=False, dry_run=False):
+    """
+    Import applicants from the CSV text ``lines``.
+
+    Yields one ``(created, errors, credentials)`` tuple per chunk (with
+    ``dry_run``, ``created`` counts the rows that would be created):
+    ``errors`` are ``(line number, message)`` for skipped rows and
+    ``credentials`` the ``(username, password)`` pairs generated for rows
+    without a password (only with ``generate_passwords``).
+    """
+    reader = csv.DictReader(lines)
+    header = [h.strip().lower() for h in reader.fieldnames or []]
+    missing = [c for c in REQUIRED if c not in header]
+    if missing:
+        raise StudentImportError(f"Missing column(s): {', '.join(missing)}")
+    reader.fieldnames = header
+
+    # one pool for the whole file; PBKDF2 is CPU-bound, so processes, not threads
+    workers = workers or os.cpu_count() or 1
+    use_pool = workers > 1 and not dry_run
+    with ProcessPoolExecutor(max_workers=workers) if use_pool else nullcontext() as pool:
+        yield from _import(reader, chunk_size, pool, workers, generate_passwords, dry_run)
+
+
+def _import(reader, chunk_size, pool, workers, generate_passwords, dry_run):
+    seen_usernames, seen_emails = set(), set()
+    line = 1
+    for chunk in _chunks(reader, chunk_size):
+        rows, errors, credentials = [], [], []
+        for raw in chunk:
+            line += 1
+            try:
+                row = _clean(raw)
+                if row["username"] in seen_usernames:
+                    raise ValidationError("username repeated in the file")
+                if row["email"].lower() in seen_emails:
+                    raise ValidationError("email repeated in the file")
+                if not row["password"]:
+                    if not generate_passwords:
+                        raise ValidationError("no password")
+                    row["password"] = secrets.token_urlsafe(9)
+                    credentials.append((row["username"], row["password"]))
+            except ValidationError as exc:
+                errors.append((line, "; ".join(exc.messages)))
+                continue
+            seen_usernames.add(row["username"])
+            seen_emails.add(row["email"].lower())
+            row["line"] = line
+            rows.append(row)
+
+        # one query each for the whole chunk instead of the form's per-row checks
+        taken_usernames = set(User.objects.filter(username__in=[r["username"] for r in rows])
+                              .values_list("username", flat=True))
+        taken_emails = {e.lower() for e in User.objects.filter(email__in=[r["email"] for r in rows])
+                        .values_list("email", flat=True)}
+        fresh = []
+        for row in rows:
+            if row["username"] in taken_usernames:
+                errors.append((row["line"], "username already taken"))
+            elif row["email"].lower() in taken_emails:
+                errors.append((row["line"], "email already in use"))
+            else:
+                fresh.append(row)
+        kept = {r["username"] for r in fresh}
+        credentials = [(u, p) for u, p in credentials if u in kept and not dry_run]
+
+        if fresh and not dry_run:
+            hashes = _hash_all([r["password"] for r in fresh], pool, workers)
+            try:
+                with transaction.atomic():
+                    users = User.objects.bulk_create([
+                        User(username=r["username"], email=r["email"], password=h) for r, h in zip(fresh, hashes)
+                    ])
+                    ids = sequences.reserve_serials(sequences.STUDENT_PREFIX, len(fresh))
+                    profiles = StudentProfile.objects.bulk_create([
+                        StudentProfile(user=u, unique_id=uid, **{f: r[f] for f in PROFILE_FIELDS})
+                        for u, uid, r in zip(users, ids, fresh)
+                    ])
+                    FeeChallan.objects.bulk_create([FeeChallan(student=p) for p in profiles])
+            except IntegrityError as exc:
+                # e.g. someone registered one of these usernames since the
+                # check above; the whole chunk was rolled back
+                errors.extend((r["line"], f"not imported, re-run the import ({exc})") for r in fresh)
+                fresh, credentials = [], []
+        yield len(fresh), errors, credentials
@@ -0,0 +1,210 @@
+# studentpanel/instrumentation.py
+"""
+Per-request SQL instrumentation.
+
+``SQLInstrumentationMiddleware`` wraps every database call of a request
+(``connection.execute_wrapper``, so it works with DEBUG off) and records
+the query count, the total SQL time, the most repeated statement and the
+slowest statements. Responses to staff (or to everyone with DEBUG on)
+carry a ``Server-Timing`` header; a rolling summary of the last ``WINDOW`` requests per view is kept in
+process memory and shown at ``/admin/sql-stats/``. Streaming responses
+only count the queries run before the first chunk is sent.
+
+Opt-in: set SQL_INSTRUMENTATION=1 in the environment (see settings.py).
+
+``QUERY_BUDGETS`` caps the queries a view may run, by URL name. Over
+budget is logged; with the setting ``SQL_QUERY_BUDGET_STRICT`` it raises
+``QueryBudgetExceeded`` instead, which is how the tests enforce them.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+log = logging.getLogger(__name__)
+
+WINDOW    = 200        # requests kept per view
+SLOWEST   = 5          # statements kept per view
+SQL_CHARS = 500
+
+# URL name -> most queries one request may run. Session and auth lookups
+# count, and so does a cold reference-data cache (up to five), so these
+# only trip on per-row queries.
+QUERY_BUDGETS = {
+    "studentpanel:dashboard": 10,
+    "studentpanel:dashboard_tab": 8,
+    "studentpanel:batch_allotment": 12,
+    "studentpanel:challan": 8,
+    "studentpanel:admit_card": 10,
+    "studentpanel:certificate": 10,
+    "admin:studentpanel_studentprofile_changelist": 14,
+    "admin:studentpanel_feechallan_changelist": 14,
+    "admin:studentpanel_project_changelist": 14,
+    "admin:studentpanel_projectselection_changelist": 14,
+    "admin:studentpanel_certificate_changelist": 14,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# ───────────────────────────────
+# Recording
+# ───────────────────────────────
+class QueryRecorder:
+    """execute_wrapper that times every statement of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self.shapes[sql] += 1           # parameters are placeholders: N+1 shows up as one shape
+            self.statements.append((elapsed, sql))
+
+    def slowest(self, n=SLOWEST):
+        return sorted(self.statements, key=lambda s: s[0], reverse=True)[:n]
+
+    def repeated(self):
+        """``(count, sql)`` of the most repeated statement."""
+        if not self.shapes:
+            return 0, ""
+        sql, count = self.shapes.most_common(1)[0]
+        return count, sql
+
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=WINDOW))
+_slowest = defaultdict(list)
+
+
+def _record(view, recorder, total_ms):
+    repeats, repeated_sql = recorder.repeated()
+    with _lock:
+        _samples[view].append((recorder.count, recorder.seconds * 1000, total_ms, repeats, repeated_sql))
+        merged = _slowest[view] + [(s * 1000, sql[:SQL_CHARS]) for s, sql in recorder.slowest()]
+        _slowest[view] = sorted(merged, key=lambda s: s[0], reverse=True)[:SLOWEST]
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _slowest.clear()
+
+
+def summary():
+    """One dict per view seen, the views spending most time in SQL first."""
+    with _lock:
+        snapshot = {view: (list(samples), list(_slowest[view])) for view, samples in _samples.items()}
+
+    rows = []
+    for view, (samples, slowest) in snapshot.items():
+        n = len(samples)
+        queries = [s[0] for s in samples]
+        totals = sorted(s[2] for s in samples)
+        repeats, repeated_sql = max(((s[3], s[4]) for s in samples), key=lambda r: r[0])
+        budget = QUERY_BUDGETS.get(view)
+        rows.append({
+            "view": view,
+            "requests": n,
+            "avg_queries": round(sum(queries) / n, 1),
+            "max_queries": max(queries),
+            "budget": budget,
+            "over_budget": sum(q > budget for q in queries) if budget is not None else 0,
+            "avg_db_ms": round(sum(s[1] for s in samples) / n, 2),
+            "p95_ms": round(totals[min(n - 1, int(n * 0.95))], 2),
+            "db_ms_total": sum(s[1] for s in samples),
+            "repeats": repeats,
+            "repeated_sql": repeated_sql[:SQL_CHARS],
+            "slowest": [(round(ms, 2), sql) for ms, sql in slowest],
+        })
+    return sorted(rows, key=lambda r: r["db_ms_total"], reverse=True)
+
+
+# ───────────────────────────────
+# Middleware
+# ───────────────────────────────
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "<unresolved>"
+
+
+def check_budget(view, count):
+    budget = QUERY_BUDGETS.get(view)
+    if budget is None or count <= budget:
+        return
+    message = f"{view} ran {count} queries (budget {budget})"
+    if getattr(settings, "SQL_QUERY_BUDGET_STRICT", False):
+        raise QueryBudgetExceeded(message)
+    log.warning(message)
+
+
+class SQLInstrumentationMiddleware:
+    """Outermost middleware, so session and auth queries are counted too."""
+
+    # async-capable, so async views under ASGI are not pushed into a thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _wrapped(self, recorder):
+        stack = ExitStack()
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(recorder))
+        return stack
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with self._wrapped(recorder):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        user = getattr(request, "user", None)
+        staff = not settings.DEBUG and user is not None and user.is_staff
+        return self._finish(request, response, recorder, total_ms, staff)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        # connections are thread-local: install the wrappers in the thread
+        # that runs this request's sync views and async ORM calls
+        stack = await sync_to_async(self._wrapped)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        total_ms = (time.perf_counter() - started) * 1000
+        staff = not settings.DEBUG and hasattr(request, "auser") and (await request.auser()).is_staff
+        return self._finish(request, response, recorder, total_ms, staff)
+
+    def _finish(self, request, response, recorder, total_ms, staff):
+        view = _view_name(request)
+        _record(view, recorder, total_ms)
+        # timings help an attacker too: only staff see them in production
+        if settings.DEBUG or staff:
+            response["Server-Timing"] = (
+                f'db;dur={recorder.seconds * 1000:.2f};desc="{recorder.count} queries", app;dur={total_ms:.2f}'
+            )
+        check_budget(view, recorder.count)
+        return response
@@ -0,0 +1,127 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+
+from studentpanel import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the hot views through the test client against seeded data "
+        "(see seed_benchmark) and report latency percentiles, query counts and "
+        "peak memory as JSON, optionally compared with a baseline. With "
+        "--handlers, compare WSGI and ASGI handler throughput of the student views "
+        "instead (in-process, no server). With --servers, start gunicorn (sync "
+        "workers) and uvicorn and drive them over HTTP with a concurrent load "
+        "generator at each --connections level, e.g. "
+        "'manage.py benchmark --servers --workers 4 --connections 16 --connections 256 --duration 20'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--only", action="append", help="Scenario name; repeatable.")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--baseline", help="JSON report to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="Allowed relative p95 growth over the baseline (default 0.2).")
+        parser.add_argument("--handlers", action="store_true",
+                            help="Requests/s through the WSGI and the ASGI handler at several concurrency "
+                                 "levels; handler-only, no server or network.")
+        parser.add_argument("--servers", action="store_true",
+                            help="Requests/s and latency of gunicorn (sync workers) and uvicorn over local "
+                                 "TCP at several concurrency levels. Needs both installed.")
+        parser.add_argument("--connections", type=int, action="append",
+                            help=f"Requests in flight; repeatable (default: {benchmark.CONNECTIONS}).")
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per handler and level.")
+        parser.add_argument("--server", choices=sorted(benchmark.SERVERS), action="append",
+                            help="With --servers: server(s) to run; default: all.")
+        parser.add_argument("--workers", type=int, help="With --servers: processes per server (default: CPU count).")
+        parser.add_argument("--duration", type=float, default=10,
+                            help="With --servers: seconds of load per scenario and level.")
+
+    def handle(self, *args, **opts):
+        # testserver host, locmem email backend: nothing leaves the machine
+        setup_test_environment()
+        if opts["handlers"]:
+            return self.handlers(opts)
+        if opts["servers"]:
+            return self.servers(opts)
+        report = benchmark.run(opts["iterations"], opts["only"])
+        if not report["meta"]["students"]:
+            raise CommandError("No benchmark data; run seed_benchmark first.")
+
+        text = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                f.write(text + "\n")
+        else:
+            self.stdout.write(text)
+
+        for name, result in report["results"].items():
+            if "error" in result:
+                self.stderr.write(f"{name}: {result['error']}")
+            else:
+                self.stderr.write(
+                    f"{name:<30} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+                    f"{result['queries']:>3} queries  {result['peak_kib']:>6} KiB"
+                )
+
+        if opts["baseline"]:
+            with open(opts["baseline"]) as f:
+                baseline = json.load(f)
+            rows = benchmark.compare(report, baseline, opts["tolerance"])
+            regressions = [r for r in rows if r[4]]
+            for name, metric, before, after, regressed in rows:
+                flag = "REGRESSED" if regressed else "ok"
+                self.stderr.write(f"{name:<30} {metric:<8} {before!s:>10} -> {after!s:<10} {flag}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {opts['baseline']}.")
+
+    def write(self, results, opts):
+        if all("error" in r for r in results.values()):
+            raise CommandError("No benchmark data; run seed_benchmark first.")
+        text = json.dumps(results, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                f.write(text + "\n")
+        else:
+            self.stdout.write(text)
+
+    def handlers(self, opts):
+        results = benchmark.handler_throughput(
+            opts["connections"] or benchmark.CONNECTIONS, opts["requests"], opts["only"],
+        )
+        self.write(results, opts)
+
+        self.stderr.write("Handler-only throughput (in-process test clients, no server or network):")
+        for name, levels in results.items():
+            if "error" in levels:
+                self.stderr.write(f"{name}: {levels['error']}")
+                continue
+            for n, r in levels.items():
+                self.stderr.write(
+                    f"{name:<30} {n:>4} in flight  wsgi {r['wsgi_handler_rps']:>8.1f}/s  "
+                    f"asgi {r['asgi_handler_rps']:>8.1f}/s  x{r['asgi_handler_rps'] / r['wsgi_handler_rps']:.2f}  "
+                    f"{r['errors']} errors"
+                )
+
+    def servers(self, opts):
+        results = benchmark.server_throughput(
+            opts["server"] or sorted(benchmark.SERVERS), opts["connections"] or benchmark.CONNECTIONS,
+            opts["duration"], opts["workers"], opts["only"],
+        )
+        self.write(results, opts)
+
+        self.stderr.write("Server throughput (load generator on this machine, local TCP):")
+        for name, levels in results.items():
+            if "error" in levels:
+                self.stderr.write(f"{name}: {levels['error']}")
+                continue
+            for n, by_server in levels.items():
+                columns = [
+                    f"{server} {r['error']}" if "error" in r else
+                    f"{server} {r['rps']:>8.1f}/s p99 {r['p99_ms']:>8.1f} ms {r['errors']} errors"
+                    for server, r in by_server.items()
+                ]
+                self.stderr.write(f"{name:<30} {n:>4} in flight  " + "  ".join(columns))
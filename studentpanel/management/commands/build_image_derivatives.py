@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from studentpanel import images
+
+
+class Command(BaseCommand):
+    help = "Build the thumbnail / print derivatives of existing photos and signatures."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild derivatives that look current too.")
+
+    def handle(self, *args, **opts):
+        for model, specs in images.DERIVATIVES.items():
+            source = specs[0][0]
+            rows = model.objects.exclude(**{source: ""}).exclude(**{f"{source}__isnull": True}).order_by("pk")
+            updated, total = [], 0
+            for obj in rows.iterator(chunk_size=200):
+                total += 1
+                if images.update_derivatives(obj, force=opts["force"], bump=False):
+                    updated.append(obj)
+            if updated:
+                images.bump_versions(model, updated)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {len(updated)} of {total} updated.")
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from studentpanel import documents
+from studentpanel.models import ProjectSelection
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate admit cards for every approved selection of a batch slot or "
+        "project, rendering in a process pool. Unchanged admit cards are skipped."
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--batch-slot", type=int, help="BatchSlot id")
+        target.add_argument("--project", type=int, help="Project id")
+        parser.add_argument("--workers", type=int, help="Render processes (default: PDF_RENDER_WORKERS or CPU count)")
+
+    def handle(self, *args, **opts):
+        selections = ProjectSelection.objects.filter(status="Approved").select_related("student", "project__batch_slot")
+        if opts["batch_slot"]:
+            selections = selections.filter(project__batch_slot_id=opts["batch_slot"])
+        else:
+            selections = selections.filter(project_id=opts["project"])
+        selections = list(selections.order_by("pk"))
+        if not selections:
+            raise CommandError("No approved selections found.")
+
+        started = time.perf_counter()
+        issued, updated, skipped, failed = documents.admit_card_pdfs(selections, workers=opts["workers"])
+        elapsed = max(time.perf_counter() - started, 0.001)
+
+        rendered = len(issued) + len(updated)
+        for sel, error in failed:
+            self.stderr.write(f"FAILED {sel.student.unique_id} ({sel.student.student_name}): {error}")
+        self.stdout.write(
+            f"Admit cards: {len(issued)} issued, {len(updated)} re-rendered, {skipped} unchanged, "
+            f"{len(failed)} failed in {elapsed:.1f}s ({(rendered + len(failed)) / elapsed:.1f} renders/s)."
+        )
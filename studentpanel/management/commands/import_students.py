@@ -0,0 +1,53 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from studentpanel import imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Import applicants from a CSV file (columns: username, email, password, "
+        "student_name, father_name, college, course, branch, address, mobile). "
+        "Rows that fail validation are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file")
+        parser.add_argument("--chunk-size", type=int, default=imports.CHUNK_SIZE)
+        parser.add_argument("--workers", type=int, help="Password hashing processes (default: CPU count)")
+        parser.add_argument("--credentials", help="Generate passwords for rows without one and write them here (CSV)")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing.")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        created = skipped = 0
+        out = open(opts["credentials"], "w", newline="", encoding="utf-8") if opts["credentials"] else None
+        try:
+            writer = csv.writer(out) if out else None
+            if writer:
+                writer.writerow(["username", "password"])
+            with open(opts["csv_file"], newline="", encoding="utf-8-sig") as f:
+                chunks = imports.import_students(
+                    f, chunk_size=opts["chunk_size"], workers=opts["workers"],
+                    generate_passwords=bool(out), dry_run=opts["dry_run"],
+                )
+                for n, errors, credentials in chunks:
+                    created += n
+                    skipped += len(errors)
+                    for line, message in errors:
+                        self.stderr.write(f"line {line}: {message}")
+                    if writer:
+                        writer.writerows(credentials)
+                    self.stdout.write(f"{created} imported, {skipped} skipped …")
+        except (OSError, imports.StudentImportError) as exc:
+            raise CommandError(str(exc))
+        finally:
+            if out:
+                out.close()
+
+        verb = "would be imported" if opts["dry_run"] else "imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} students {verb}, {skipped} skipped in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from studentpanel import sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions from the database and expired entries from the session cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=sessions.PURGE_BATCH)
+        parser.add_argument("--loop", action="store_true", help="Keep running and purge periodically.")
+        parser.add_argument("--interval", type=float, default=3600, help="Seconds between purges with --loop.")
+
+    def handle(self, *args, **opts):
+        while True:
+            deleted, removed = sessions.purge_expired(opts["batch_size"])
+            if deleted or removed or not opts["loop"]:
+                self.stdout.write(f"Sessions: {deleted} expired deleted, {removed} cache files removed.")
+            if not opts["loop"]:
+                return
+            time.sleep(opts["interval"])
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from studentpanel import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic students, projects, selections and certificates for the "
+        "benchmark suite. Use a scratch database: SQLITE_PATH=/tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000, help="e.g. 1000, 10000 or 100000")
+        parser.add_argument("--flush", action="store_true", help="Remove earlier benchmark data first.")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        if opts["flush"]:
+            benchmark.flush()
+        counts = benchmark.seed(opts["students"])
+        self.stdout.write(
+            f"Seeded {counts['students']} students, {counts['projects']} projects, "
+            f"{counts['selections']} selections in {time.perf_counter() - started:.1f}s."
+        )
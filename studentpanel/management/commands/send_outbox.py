@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from studentpanel import outbox
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox in batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument("--max-attempts", type=int, default=outbox.MAX_ATTEMPTS)
+        parser.add_argument("--loop", action="store_true", help="Keep running and poll the outbox.")
+        parser.add_argument("--interval", type=float, default=15, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **opts):
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = outbox.send_pending(opts["batch_size"], opts["max_attempts"])
+                total_sent += sent
+                total_failed += failed
+                # a batch that was cut short means nothing more is due right now
+                if sent + failed < opts["batch_size"] or sent == 0:
+                    break
+            if total_sent or total_failed or not opts["loop"]:
+                self.stdout.write(f"Outbox: {total_sent} sent, {total_failed} failed.")
+            if not opts["loop"]:
+                return
+            time.sleep(opts["interval"])
@@ -0,0 +1,138 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+
+from studentpanel.models import BatchSlot, Project, ProjectIncharge, Sequence
+
+ALIAS = "loadtest"
+
+# Stock Django SQLite (rollback journal, deferred transactions, 5 s
+# timeout, new connection per request) against settings.SQLITE_OPTIONS.
+PROFILES = {
+    "default": {"OPTIONS": {}, "CONN_MAX_AGE": 0},
+    "tuned": {"OPTIONS": settings.SQLITE_OPTIONS, "CONN_MAX_AGE": None},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a scratch SQLite database with concurrent registrations and "
+        "project listings, once per connection profile, and report the "
+        "'database is locked' rate and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--ops", type=int, default=100, help="Operations per thread.")
+        parser.add_argument("--write-ratio", type=float, default=0.5,
+                            help="Share of operations that are registrations (the rest read).")
+        parser.add_argument("--profile", choices=sorted(PROFILES), action="append",
+                            help="Profile(s) to run; default: all.")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{'profile':<8} {'ops':>6} {'locked':>7} {'rate':>7} {'p50 ms':>8} {'p95 ms':>8} {'ops/s':>8}")
+        for name in opts["profile"] or sorted(PROFILES):
+            r = self.run_profile(PROFILES[name], opts["threads"], opts["ops"], opts["write_ratio"])
+            self.stdout.write(
+                f"{name:<8} {r['ops']:>6} {r['locked']:>7} {r['rate']:>7.1%} "
+                f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['throughput']:>8.0f}"
+            )
+
+    # ───────── setup ─────────
+    def _connect(self, path, profile):
+        connections.settings[ALIAS] = connections.configure_settings({
+            "default": connections.settings["default"],
+            ALIAS: {"ENGINE": "django.db.backends.sqlite3", "NAME": path, **profile},
+        })[ALIAS]
+
+    def _disconnect(self):
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
+
+    def _create_schema(self):
+        with connections[ALIAS].schema_editor() as editor:
+            for model in (BatchSlot, ProjectIncharge, Project, Sequence):
+                editor.create_model(model)
+        # bulk_create: no post_save signals, which would write to "default"
+        [slot] = BatchSlot.objects.using(ALIAS).bulk_create([
+            BatchSlot(start_date=date(2025, 6, 1), end_date=date(2025, 6, 28), duration_weeks=4),
+        ])
+        Project.objects.using(ALIAS).bulk_create(
+            Project(project_code=f"P{i}", title=f"Project {i}", branch="Mechanical",
+                    slots=10 ** 6, batch_slot=slot, duration_weeks=4)
+            for i in range(20)
+        )
+        Sequence.objects.using(ALIAS).create(prefix="STVT", year=25)
+
+    # ───────── workload ─────────
+    def _register(self, i):
+        """Read-then-write transaction, like a registration claiming an ID and a seat."""
+        with transaction.atomic(using=ALIAS):
+            Sequence.objects.using(ALIAS).get(prefix="STVT", year=25)
+            Sequence.objects.using(ALIAS).filter(prefix="STVT", year=25).update(last_value=F("last_value") + 1)
+            Project.objects.using(ALIAS).filter(pk=i % 20 + 1).update(slots_taken=F("slots_taken") + 1)
+
+    def _browse(self, i):
+        list(Project.objects.using(ALIAS).filter(branch="Mechanical", slots_taken__lt=F("slots")))
+
+    def run_profile(self, profile, threads, ops, write_ratio):
+        fd, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self._connect(path, profile)
+        try:
+            self._create_schema()
+            connections[ALIAS].close()
+
+            every = max(1, round(1 / write_ratio)) if write_ratio else None
+            barrier = threading.Barrier(threads)
+
+            def worker(n):
+                latencies, locked = [], 0
+                barrier.wait()
+                try:
+                    for i in range(ops):
+                        op = self._register if every and (n + i) % every == 0 else self._browse
+                        started = time.perf_counter()
+                        try:
+                            op(i)
+                        except OperationalError as exc:
+                            if "locked" not in str(exc):
+                                raise
+                            locked += 1
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        # request_finished: drop the connection unless it is persistent
+                        connections[ALIAS].close_if_unusable_or_obsolete()
+                finally:
+                    connections[ALIAS].close()
+                return latencies, locked
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(worker, range(threads)))
+            elapsed = time.perf_counter() - started
+        finally:
+            self._disconnect()
+            for suffix in ("", "-wal", "-shm", "-journal"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+        latencies = sorted(ms for lat, _ in results for ms in lat)
+        locked = sum(n for _, n in results)
+        return {
+            "ops": len(latencies),
+            "locked": locked,
+            "rate": locked / len(latencies),
+            "p50": statistics.median(latencies),
+            "p95": latencies[int(len(latencies) * 0.95) - 1],
+            "throughput": len(latencies) / elapsed,
+        }
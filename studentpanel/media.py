@@ -0,0 +1,224 @@
+# studentpanel/media.py
+"""
+Protected delivery of uploaded and generated files.
+
+The ``protected_media`` view checks access once and then ``serve``s the
+file. How it is sent depends on settings.MEDIA_DELIVERY:
+
+  "django"            FileResponse from Python, with ETag / 304 and single
+                      byte-range (206) support. Under ASGI the file is
+                      read in FILE_CHUNK pieces by an async iterator, each
+                      read in a worker thread, since Django would
+                      otherwise read the whole file into memory in one
+                      thread first (and warn). Async views use ``aserve``,
+                      which also stats and opens the file in a thread
+  "x-accel-redirect"  empty response; nginx sends the file from an
+                      ``internal`` location mapped to MEDIA_ROOT at
+                      MEDIA_ACCEL_PREFIX
+  "x-sendfile"        empty response; Apache (mod_xsendfile) or lighttpd
+                      sends the absolute path
+
+With either front-server mode, stop serving MEDIA_URL publicly. For
+example, in nginx::
+
+    location /protected-media/ { internal; alias /srv/stvt/media/; }
+
+``signed_url`` creates links that work without a login until
+MEDIA_LINK_MAX_AGE runs out. They are meant for emails.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.urls import reverse
+from django.utils.http import content_disposition_header, http_date, urlencode
+
+from .models import Certificate, FeeChallan, IDCard, StudentProfile
+
+DEFAULT_LINK_MAX_AGE = 7 * 24 * 3600
+FILE_CHUNK = 64 * 1024
+
+# kind -> (model, file attribute, lookup of the owning user's id)
+KINDS = {
+    "photo":       (StudentProfile, "photo_small", "user_id"),
+    "lor":         (StudentProfile, "lor_file", "user_id"),
+    "challan":     (FeeChallan, "challan_pdf", "student__user_id"),
+    "admit-card":  (IDCard, "id_pdf", "student__user_id"),
+    "certificate": (Certificate, "certificate_pdf", "student__user_id"),
+}
+
+_signer = signing.TimestampSigner(salt="studentpanel.media")
+
+
+# ───────────────────────────────
+# Signed links
+# ───────────────────────────────
+def signed_url(kind, pk):
+    """Relative URL of ``kind`` #``pk`` that needs no login while it is fresh."""
+    value = f"{kind}:{pk}"
+    token = _signer.sign(value)[len(value) + 1:]        # the value itself is already in the path
+    return reverse("studentpanel:protected_media", args=[kind, pk]) + "?" + urlencode({"sig": token})
+
+
+def valid_signature(kind, pk, token):
+    if not token:
+        return False
+    max_age = getattr(settings, "MEDIA_LINK_MAX_AGE", DEFAULT_LINK_MAX_AGE)
+    try:
+        _signer.unsign(f"{kind}:{pk}:{token}", max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+# ───────────────────────────────
+# Delivery
+# ───────────────────────────────
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _byte_range(header, size):
+    """``(start, end)`` inclusive, None for no (or an unsupported) range, False if unsatisfiable."""
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None                     # absent, multi-range or malformed: send it all
+    first, last = match.groups()
+    if first == "":                     # bytes=-N: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class _Slice:
+    """Read-only window of an open file, for FileResponse."""
+
+    def __init__(self, f, length):
+        self.f = f
+        self.left = length
+
+    def read(self, size=-1):
+        size = self.left if size < 0 else min(size, self.left)
+        data = self.f.read(size)
+        self.left -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+async def _aread(f):
+    """The open file ``f`` as async chunks, closing it at the end."""
+    try:
+        while chunk := await sync_to_async(f.read, thread_sensitive=False)(FILE_CHUNK):
+            yield chunk
+    finally:
+        f.close()
+
+
+def _preconditions(request, size, etag):
+    """``(response, None)`` for a 304 or 416 answer, else ``(None, byte range or None)``."""
+    if etag in [t.strip() for t in request.headers.get("If-None-Match", "").split(",")]:
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response, None
+
+    if_range = request.headers.get("If-Range")
+    byte_range = _byte_range(request.headers.get("Range"), size) if if_range in (None, etag) else None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response, None
+    return None, byte_range
+
+
+def _open(path, byte_range):
+    f = open(path, "rb")
+    if byte_range:
+        start, end = byte_range
+        f.seek(start)
+        return _Slice(f, end - start + 1)
+    return f
+
+
+def _file(request, f, path, stat, byte_range, content_type, filename, as_attachment, etag):
+    content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    body = _aread(f) if isinstance(request, ASGIRequest) else f
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(body, status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Content-Length"] = end - start + 1
+    else:
+        response = FileResponse(body, content_type=content_type)
+        response["Content-Length"] = stat.st_size
+    if disposition := content_disposition_header(as_attachment, filename or os.path.basename(path)):
+        response["Content-Disposition"] = disposition
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return response
+
+
+def file_response(request, path, content_type=None, filename=None, as_attachment=False, etag=None):
+    stat = os.stat(path)
+    etag = etag or f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response, byte_range = _preconditions(request, stat.st_size, etag)
+    if response is not None:
+        return response
+    f = _open(path, byte_range)
+    return _file(request, f, path, stat, byte_range, content_type, filename, as_attachment, etag)
+
+
+async def afile_response(request, path, content_type=None, filename=None, as_attachment=False, etag=None):
+    """``file_response`` for async views: the stat and open run in a worker thread."""
+    stat = await sync_to_async(os.stat, thread_sensitive=False)(path)
+    etag = etag or f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response, byte_range = _preconditions(request, stat.st_size, etag)
+    if response is not None:
+        return response
+    f = await sync_to_async(_open, thread_sensitive=False)(path, byte_range)
+    return _file(request, f, path, stat, byte_range, content_type, filename, as_attachment, etag)
+
+
+def serve(request, field_file, filename=None, as_attachment=False, etag=None):
+    """
+    Send a stored FieldFile once access has been checked. ``etag``
+    replaces the file's own validator, for views that compute one.
+    """
+    filename = filename or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    mode = getattr(settings, "MEDIA_DELIVERY", "django")
+
+    if mode == "django":
+        return file_response(request, field_file.path, content_type, filename, as_attachment, etag)
+
+    response = HttpResponse(content_type=content_type)
+    if mode == "x-accel-redirect":
+        prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = prefix + quote(field_file.name)
+    elif mode == "x-sendfile":
+        response["X-Sendfile"] = field_file.path
+    else:
+        raise ValueError(f"Unknown MEDIA_DELIVERY {mode!r}")
+    response["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+async def aserve(request, field_file, filename=None, as_attachment=False, etag=None):
+    """``serve`` for async views."""
+    if getattr(settings, "MEDIA_DELIVERY", "django") != "django":
+        return serve(request, field_file, filename, as_attachment, etag)      # no file access
+    filename = filename or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return await afile_response(request, field_file.path, content_type, filename, as_attachment, etag)
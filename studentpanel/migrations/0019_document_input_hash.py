@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studentpanel', '0018_certificate_director_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='input_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='feechallan',
+            name='input_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='input_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:57
+
+import re
+
+from django.db import migrations, models
+
+SERIAL_RE = re.compile(r"^(STVT|CERT)(\d{2})/(\d+)$")
+
+
+def seed_sequences(apps, schema_editor):
+    """Start every counter after the highest serial already issued."""
+    StudentProfile = apps.get_model("studentpanel", "StudentProfile")
+    Certificate = apps.get_model("studentpanel", "Certificate")
+    Sequence = apps.get_model("studentpanel", "Sequence")
+
+    highest = {}
+    serials = list(StudentProfile.objects.values_list("unique_id", flat=True))
+    serials += list(Certificate.objects.values_list("serial_number", flat=True))
+    for serial in serials:
+        m = SERIAL_RE.match(serial or "")
+        if m:
+            key = (m.group(1), int(m.group(2)))
+            highest[key] = max(highest.get(key, 0), int(m.group(3)))
+
+    Sequence.objects.bulk_create(
+        Sequence(prefix=prefix, year=year, last_value=last)
+        for (prefix, year), last in highest.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studentpanel', '0020_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=10)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('prefix', 'year'), name='unique_sequence_prefix_year')],
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
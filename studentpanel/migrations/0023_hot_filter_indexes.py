@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studentpanel', '0022_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(condition=models.Q(('is_verified', True)), fields=['id'], name='certificate_verified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feechallan',
+            index=models.Index(fields=['status'], name='challan_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outboundemail',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['branch', 'batch_slot'], name='project_branch_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectselection',
+            index=models.Index(fields=['status', 'project'], name='selection_status_project_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['branch'], name='profile_branch_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studentpanel', '0023_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='director',
+            name='signature_print',
+            field=models.ImageField(blank=True, editable=False, upload_to='derived/signatures/'),
+        ),
+        migrations.AddField(
+            model_name='projectincharge',
+            name='signature_print',
+            field=models.ImageField(blank=True, editable=False, upload_to='derived/signatures/'),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='photo_print',
+            field=models.ImageField(blank=True, editable=False, upload_to='derived/photos/'),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='photo_thumb',
+            field=models.ImageField(blank=True, editable=False, upload_to='derived/photos/'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_seats(apps, schema_editor):
+    """One row per existing project, from its slots and slots_taken."""
+    Project = apps.get_model("studentpanel", "Project")
+    SeatAvailability = apps.get_model("studentpanel", "SeatAvailability")
+    SeatAvailability.objects.bulk_create(
+        (SeatAvailability(project_id=pk, branch=branch, batch_slot_id=slot, seats_left=max(slots - taken, 0))
+         for pk, branch, slot, slots, taken
+         in Project.objects.values_list("pk", "branch", "batch_slot_id", "slots", "slots_taken").iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studentpanel', '0025_outbox_sending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatAvailability',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seats', serialize=False, to='studentpanel.project')),
+                ('branch', models.CharField(max_length=50)),
+                ('seats_left', models.PositiveIntegerField(default=0)),
+                ('batch_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='studentpanel.batchslot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['branch', 'batch_slot', 'seats_left'], name='seats_branch_slot_idx')],
+            },
+        ),
+        migrations.RunPython(fill_seats, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 import os
 
 # ───────────────────────────────
@@ -34,9 +35,28 @@ class StudentProfile(models.Model):
     is_selected     = models.BooleanField(default=False)
     payment_verified = models.BooleanField(default=False)
 
+    # derivatives of `photo`, built by images.py
+    photo_thumb     = models.ImageField(upload_to="derived/photos/", blank=True, editable=False)
+    photo_print     = models.ImageField(upload_to="derived/photos/", blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # admin list filter
+            models.Index(fields=["branch"], name="profile_branch_idx"),
+        ]
+
     def __str__(self):
         return f"{self.student_name} ({self.unique_id or 'Unassigned'})"
 
+    # the original upload until the derivatives have been built
+    @property
+    def photo_small(self):
+        return self.photo_thumb or self.photo
+
+    @property
+    def photo_for_print(self):
+        return self.photo_print or self.photo
+
 
 # ───────────────────────────────
 # Batch Slot Model (New)
@@ -75,6 +95,12 @@ class Project(models.Model):
     batch_slot = models.ForeignKey('BatchSlot', on_delete=models.CASCADE)
     duration_weeks = models.PositiveIntegerField()
 
+    class Meta:
+        indexes = [
+            # batch allotment, admin branch filter (seats left: SeatAvailability)
+            models.Index(fields=["branch", "batch_slot"], name="project_branch_slot_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if self.batch_slot:
             self.duration_weeks = self.batch_slot.duration_weeks
@@ -84,6 +110,26 @@ class Project(models.Model):
         return f"{self.project_code} - {self.title}"
 
 
+# ───────────────────────────────
+# Seats Left (availability index)
+# ───────────────────────────────
+class SeatAvailability(models.Model):
+    """One row per project: seats left, keyed for the student views (see availability.py)."""
+    project    = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name="seats")
+    branch     = models.CharField(max_length=50)
+    batch_slot = models.ForeignKey(BatchSlot, on_delete=models.CASCADE)
+    seats_left = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # open projects of a branch and slot, answered from the index alone
+            models.Index(fields=["branch", "batch_slot", "seats_left"], name="seats_branch_slot_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id}: {self.seats_left} left"
+
+
 # ───────────────────────────────
 # Student’s Selected Project
 # ───────────────────────────────
@@ -102,6 +148,12 @@ class ProjectSelection(models.Model):
 
     selected_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # admin status filter and the approved roster of one project
+            models.Index(fields=["status", "project"], name="selection_status_project_idx"),
+        ]
+
     def __str__(self):
         return f"{self.student.student_name} → {self.project.title}"
 
@@ -125,6 +177,14 @@ class FeeChallan(models.Model):
     sent_on        = models.DateTimeField(null=True, blank=True)
     created_on     = models.DateTimeField(auto_now_add=True)
 
+    # fingerprint of the inputs challan_pdf was rendered from
+    input_hash     = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="challan_status_idx"),
+        ]
+
     def __str__(self):
         return f"Challan for {self.student.student_name} – {self.status}"
 
@@ -136,6 +196,7 @@ class IDCard(models.Model):
     student    = models.OneToOneField(StudentProfile, on_delete=models.CASCADE)
     id_pdf     = models.FileField(upload_to='idcards/')
     issued_on  = models.DateTimeField(auto_now_add=True)
+    input_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     def __str__(self):
         return f"ID Slip for {self.student.student_name}"
@@ -150,7 +211,7 @@ class Certificate(models.Model):
     serial_number = models.CharField(max_length=20, unique=True)
     is_verified = models.BooleanField(default=False)
     issued_on = models.DateTimeField(auto_now_add=True)
-
+    input_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     training_incharge_name = models.CharField(max_length=100, blank=True, null=True)
     training_incharge_signature = models.ImageField(upload_to='signatures/', blank=True, null=True)
@@ -160,6 +221,14 @@ class Certificate(models.Model):
     # optional
     temp_dummy = models.CharField(max_length=10, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # verified certificates, in id order. Partial: SQLite compiles
+            # is_verified=True to a bare "WHERE is_verified", which a plain
+            # index on the column cannot serve.
+            models.Index(fields=["id"], condition=models.Q(is_verified=True), name="certificate_verified_idx"),
+        ]
+
     def __str__(self):
         return f"{self.student} ({self.serial_number})"
         
@@ -169,10 +238,15 @@ class Certificate(models.Model):
 class ProjectIncharge(models.Model):
     name = models.CharField(max_length=100)
     signature = models.ImageField(upload_to="signatures/incharge/")
+    signature_print = models.ImageField(upload_to="derived/signatures/", blank=True, editable=False)
 
     def __str__(self):
         return self.name
 
+    @property
+    def signature_for_print(self):
+        return self.signature_print or self.signature
+
 
 # ───────────────────────────────
 # Director (Singleton)
@@ -180,6 +254,7 @@ class ProjectIncharge(models.Model):
 class Director(models.Model):
     name = models.CharField(max_length=100)
     signature = models.ImageField(upload_to="directors/signatures/",blank=True, null=True)
+    signature_print = models.ImageField(upload_to="derived/signatures/", blank=True, editable=False)
 
     class Meta:
         verbose_name = "Director"
@@ -187,3 +262,72 @@ class Director(models.Model):
 
     def __str__(self):
         return self.name
+
+    @property
+    def signature_for_print(self):
+        return self.signature_print or self.signature
+
+
+# ───────────────────────────────
+# Outbound Email (outbox)
+# ───────────────────────────────
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = [
+        ("Pending", "Pending"),
+        ("Sending", "Sending"),
+        ("Sent",    "Sent"),
+        ("Failed",  "Failed"),
+    ]
+    subject         = models.CharField(max_length=255)
+    body            = models.TextField(blank=True)
+    html_body       = models.TextField(blank=True)
+    from_email      = models.CharField(max_length=254)
+    recipients      = models.TextField(help_text="Comma separated addresses")
+
+    status          = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
+    attempts        = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error      = models.TextField(blank=True)
+    created_on      = models.DateTimeField(auto_now_add=True)
+    sent_on         = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbox"
+        indexes = [
+            # send_pending: due mails in order
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.recipients} ({self.status})"
+
+
+# ───────────────────────────────
+# Serial Number Sequences
+# ───────────────────────────────
+class Sequence(models.Model):
+    """Last number handed out per prefix and year (e.g. STVT / 25)."""
+    prefix     = models.CharField(max_length=10)
+    year       = models.PositiveSmallIntegerField()
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["prefix", "year"], name="unique_sequence_prefix_year"),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix}{self.year:02d}/{self.last_value:02d}"
+
+
+# ───────────────────────────────
+# Cache Version Stamp
+# ───────────────────────────────
+class CacheVersion(models.Model):
+    """Bumped whenever cached data changes so every worker process notices."""
+    name    = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,139 @@
+# studentpanel/outbox.py
+"""
+Durable outbound email.
+
+Admin actions call ``queue_mail`` (same arguments as ``send_mail``) which
+only inserts an OutboundEmail row. The ``send_outbox`` management command
+drains the table in batches over one reused SMTP connection, retrying
+failures with exponential backoff.
+
+Each batch is claimed before anything is sent: its rows are switched to
+"Sending" with ``next_attempt_at`` pushed out by LEASE_SECONDS in one
+transaction, so two workers never send the same mail. A worker that dies
+mid-batch leaves its rows in "Sending"; once the lease runs out they are
+due again.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+BATCH_SIZE   = 50
+MAX_ATTEMPTS = 5
+RETRY_DELAY  = 60      # seconds before the first retry; doubles every attempt
+LEASE_SECONDS = 300    # how long a claimed batch is reserved for its worker
+
+
+def queue_mail(subject, message, from_email, recipient_list, html_message=None):
+    """Drop-in replacement for ``send_mail`` that stores the mail for the worker."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message or "",
+        html_body=html_message or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=",".join(recipient_list),
+    )
+
+
+def queue_mails(mails):
+    """
+    Queue many mails with one INSERT.
+
+    ``mails`` is an iterable of ``(subject, message, from_email,
+    recipient_list)`` or ``(..., html_message)`` tuples.
+    """
+    rows = []
+    for subject, message, from_email, recipient_list, *html in mails:
+        rows.append(OutboundEmail(
+            subject=subject,
+            body=message or "",
+            html_body=(html[0] if html else None) or "",
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipients=",".join(recipient_list),
+        ))
+    return OutboundEmail.objects.bulk_create(rows)
+
+
+def _build_message(row, connection):
+    msg = EmailMultiAlternatives(
+        row.subject, row.body, row.from_email,
+        [r for r in row.recipients.split(",") if r],
+        connection=connection,
+    )
+    if row.html_body:
+        msg.attach_alternative(row.html_body, "text/html")
+    return msg
+
+
+def _record_failure(row, error, now, max_attempts):
+    row.attempts += 1
+    row.last_error = str(error)[:1000]
+    if row.attempts >= max_attempts:
+        row.status = "Failed"
+    else:
+        row.status = "Pending"
+        row.next_attempt_at = now + timedelta(seconds=RETRY_DELAY * 2 ** (row.attempts - 1))
+
+
+def _claim(batch_size, now):
+    """Reserve up to ``batch_size`` due rows for this worker and return them."""
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=["Pending", "Sending"], next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        # the status/due condition again: another worker may have claimed
+        # some of them between our SELECT and UPDATE (SQLite has no row locks)
+        OutboundEmail.objects.filter(
+            pk__in=ids, status__in=["Pending", "Sending"], next_attempt_at__lte=now,
+        ).update(status="Sending", next_attempt_at=lease)
+    return list(
+        OutboundEmail.objects.filter(pk__in=ids, status="Sending", next_attempt_at=lease).order_by("id")
+    )
+
+
+def send_pending(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Send one batch of due mails over a single connection.
+
+    Returns ``(sent, failed)`` counts for the batch.
+    """
+    now = timezone.now()
+    rows = _claim(batch_size, now)
+    if not rows:
+        return 0, 0
+
+    connection = connection or get_connection()
+    sent = failed = 0
+    try:
+        connection.open()
+        for row in rows:
+            try:
+                connection.send_messages([_build_message(row, connection)])
+            except Exception as exc:   # SMTP errors, refused recipients, timeouts …
+                _record_failure(row, exc, now, max_attempts)
+                failed += 1
+            else:
+                row.status = "Sent"
+                row.sent_on = timezone.now()
+                row.attempts += 1
+                row.last_error = ""
+                sent += 1
+    except Exception as exc:            # could not even connect: retry the whole batch later
+        for row in rows[sent + failed:]:
+            _record_failure(row, exc, now, max_attempts)
+            failed += 1
+    finally:
+        connection.close()
+        OutboundEmail.objects.bulk_update(
+            rows, ["status", "attempts", "next_attempt_at", "last_error", "sent_on"]
+        )
+    return sent, failed
@@ -0,0 +1,155 @@
+# studentpanel/pdf.py
+"""
+WeasyPrint helpers.
+
+WeasyPrint is imported lazily so the rest of the portal keeps working on
+machines where its system libraries (Pango) are not installed.
+"""
+import io
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+
+PDF_CHUNK_SIZE = 25          # documents laid out per worker task
+
+
+class PdfRenderError(Exception):
+    """A document that failed to render; picklable, so it can leave a worker."""
+
+
+# ───────────────────────────────
+# Local URL fetcher
+# ───────────────────────────────
+class LocalUrlFetcher:
+    """
+    Serve /media/ and /static/ URLs straight from disk instead of making
+    WeasyPrint call back into the web server. Picklable, so it can be
+    handed to pool workers.
+    """
+
+    def __init__(self, roots):
+        self.roots = roots      # [(url_prefix, directory), ...]
+
+    def __call__(self, url):
+        from weasyprint.urls import default_url_fetcher
+
+        path = unquote(urlsplit(url).path)
+        for prefix, directory in self.roots:
+            if directory and path.startswith(prefix):
+                full = os.path.join(directory, path[len(prefix):])
+                if os.path.isfile(full):
+                    return {"file_obj": open(full, "rb"), "filename": os.path.basename(full)}
+        return default_url_fetcher(url)
+
+
+def local_url_fetcher():
+    static_url = "/" + settings.STATIC_URL.strip("/") + "/"
+    # collected (hashed) names first, then the source directory for
+    # deployments that have not run collectstatic yet
+    static_dirs = [getattr(settings, "STATIC_ROOT", None)] + list(getattr(settings, "STATICFILES_DIRS", []))[:1]
+    roots = [("/" + settings.MEDIA_URL.strip("/") + "/", str(settings.MEDIA_ROOT))]
+    roots += [(static_url, str(d)) for d in static_dirs if d]
+    return LocalUrlFetcher(roots)
+
+
+# ───────────────────────────────
+# Rendering
+# ───────────────────────────────
+def _html_chunk_to_pdf(htmls, base_url, url_fetcher):
+    """Lay out several HTML documents and write them as one PDF (runs in a worker)."""
+    from weasyprint import HTML
+
+    docs = [HTML(string=h, base_url=base_url, url_fetcher=url_fetcher).render() for h in htmls]
+    pages = [page for doc in docs for page in doc.pages]
+    return docs[0].copy(pages).write_pdf()
+
+
+def _html_chunk_to_pdfs(htmls, base_url, url_fetcher):
+    """Lay out several HTML documents into one PDF each (runs in a worker)."""
+    from weasyprint import HTML
+
+    return [HTML(string=h, base_url=base_url, url_fetcher=url_fetcher).write_pdf() for h in htmls]
+
+
+def _html_chunk_to_pdfs_or_errors(htmls, base_url, url_fetcher):
+    """Like _html_chunk_to_pdfs, but a failing document yields a PdfRenderError."""
+    from weasyprint import HTML
+
+    results = []
+    for h in htmls:
+        try:
+            results.append(HTML(string=h, base_url=base_url, url_fetcher=url_fetcher).write_pdf())
+        except Exception as exc:        # bad markup, missing fonts, unreadable images …
+            results.append(PdfRenderError(f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def _map_chunks(func, htmls, base_url, workers):
+    """
+    Apply ``func`` to chunks of ``htmls`` in a process pool, keeping order.
+
+    The pool lives for one call. Starting it costs a fork per worker, small
+    next to laying out PDF_CHUNK_SIZE documents per chunk, and a call with
+    a single chunk runs in-process without a pool. A pool kept between
+    requests would hold cpu_count idle renderers in every web worker.
+    """
+    fetcher = local_url_fetcher()
+    chunks = [htmls[i:i + PDF_CHUNK_SIZE] for i in range(0, len(htmls), PDF_CHUNK_SIZE)]
+    workers = min(workers or getattr(settings, "PDF_RENDER_WORKERS", None) or os.cpu_count() or 1, len(chunks))
+
+    if workers <= 1:
+        return [func(chunk, base_url, fetcher) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, chunks, [base_url] * len(chunks), [fetcher] * len(chunks)))
+
+
+def render_pdf(html, base_url=None):
+    """Render one HTML string to PDF bytes in the current process."""
+    return _html_chunk_to_pdf([html], base_url, local_url_fetcher())
+
+
+def merge_pdfs(parts):
+    """
+    Concatenate PDF byte strings into a temporary file, rewound. A
+    FileResponse then streams it from disk instead of holding a second,
+    merged copy in memory.
+    """
+    from pypdf import PdfWriter
+
+    out = tempfile.TemporaryFile()
+    if len(parts) == 1:
+        out.write(parts[0])
+    else:
+        writer = PdfWriter()
+        for part in parts:
+            writer.append(io.BytesIO(part))
+        writer.write(out)
+    out.seek(0)
+    return out
+
+
+def render_pdf_parallel(htmls, base_url=None, workers=None):
+    """
+    Render many HTML documents into one multi-page PDF.
+
+    The list is split into chunks that are laid out in a process pool; the
+    chunk PDFs are merged in their original order.
+    """
+    htmls = list(htmls)
+    if not htmls:
+        raise ValueError("Nothing to render.")
+    return merge_pdfs(_map_chunks(_html_chunk_to_pdf, htmls, base_url, workers))
+
+
+def render_pdfs_parallel(htmls, base_url=None, workers=None, return_exceptions=False):
+    """
+    Render many HTML documents in a process pool; one PDF (bytes) per
+    document. With ``return_exceptions`` a document that fails yields a
+    PdfRenderError in its place instead of aborting the whole run.
+    """
+    htmls = list(htmls)
+    func = _html_chunk_to_pdfs_or_errors if return_exceptions else _html_chunk_to_pdfs
+    return [pdf for chunk in _map_chunks(func, htmls, base_url, workers) for pdf in chunk]
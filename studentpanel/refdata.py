@@ -0,0 +1,113 @@
+# studentpanel/refdata.py
+"""
+In-process cache for rarely changing reference data: the Director,
+project incharges, batch slots and the project catalogue (title, code,
+incharge, seats offered; the live seat counts are in availability.py).
+
+Saving or deleting any of them bumps the "refdata" CacheVersion row (see
+signals.py). Each process compares that stamp with the one it loaded at
+most every REFDATA_CHECK_SECONDS, so a change made by one worker reaches
+the others without every request re-reading the tables.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import BatchSlot, CacheVersion, Director, Project, ProjectIncharge
+
+VERSION_NAME = "refdata"
+
+_lock = threading.Lock()
+_state = {"data": None, "version": None, "checked": 0.0}
+
+
+def _db_version():
+    return CacheVersion.objects.filter(name=VERSION_NAME).values_list("version", flat=True).first() or 0
+
+
+def _load():
+    slots = list(BatchSlot.objects.order_by("start_date"))
+    projects = list(Project.objects.select_related("incharge", "batch_slot").order_by("pk"))
+    by_branch = {}
+    for project in projects:
+        by_branch.setdefault(project.branch, []).append(project)
+    return {
+        "projects_by_id": {p.pk: p for p in projects},
+        "projects_by_branch": by_branch,
+        "director": Director.objects.first(),
+        "batch_slots": slots,
+        "batch_slots_by_id": {s.pk: s for s in slots},
+        "incharges": list(ProjectIncharge.objects.order_by("name")),
+    }
+
+
+def _data():
+    now = time.monotonic()
+    interval = getattr(settings, "REFDATA_CHECK_SECONDS", 5)
+    # Inside a transaction our own uncommitted (or rolled back) changes may
+    # differ from what is cached, so always compare the stamp there.
+    data = _state["data"]    # read once: invalidate() may clear it meanwhile
+    if data is not None and now - _state["checked"] < interval and not connection.in_atomic_block:
+        return data
+
+    with _lock:
+        version = _db_version()
+        if _state["data"] is None or version != _state["version"]:
+            _state["data"] = dict(_load(), version=version)
+            _state["version"] = version
+        _state["checked"] = now
+        return _state["data"]
+
+
+def invalidate():
+    """Forget the cached data in this process."""
+    with _lock:
+        _state["data"] = None
+
+
+def bump():
+    """Record a change for every process and drop this process's copy."""
+    if not CacheVersion.objects.filter(name=VERSION_NAME).update(version=F("version") + 1):
+        CacheVersion.objects.get_or_create(name=VERSION_NAME, defaults={"version": 1})
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+# ───────────────────────────────
+# Accessors
+# ───────────────────────────────
+def director():
+    return _data()["director"]
+
+
+def batch_slots():
+    """All batch slots ordered by start date."""
+    return _data()["batch_slots"]
+
+
+def batch_slot(pk):
+    try:
+        return _data()["batch_slots_by_id"].get(int(pk))
+    except (TypeError, ValueError):
+        return None
+
+
+def incharges():
+    return _data()["incharges"]
+
+
+def projects(branch):
+    """Catalogue entries of one branch. Shared objects: copy before modifying."""
+    return _data()["projects_by_branch"].get(branch, [])
+
+
+def project(pk):
+    return _data()["projects_by_id"].get(pk)
+
+
+def version():
+    """Stamp of the data currently cached in this process."""
+    return _data()["version"]
@@ -0,0 +1,51 @@
+# studentpanel/sequences.py
+"""
+Per-prefix, per-year serial numbers (STVT25/01, CERT25/07 …).
+
+A counter row is bumped with ``UPDATE … SET last_value = last_value + n``
+and read back inside the same transaction, so concurrent callers can never
+receive the same number and nothing has to count existing rows.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Sequence
+
+STUDENT_PREFIX     = "STVT"
+CERTIFICATE_PREFIX = "CERT"
+
+
+def current_year():
+    return timezone.localdate().year % 100
+
+
+def reserve(prefix, count=1, year=None):
+    """Reserve ``count`` consecutive numbers and return them as a range."""
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    year = current_year() if year is None else year
+    counter = Sequence.objects.filter(prefix=prefix, year=year)
+    with transaction.atomic():
+        # UPDATE first: it takes the write lock before anything is read
+        if not counter.update(last_value=F("last_value") + count):
+            Sequence.objects.get_or_create(prefix=prefix, year=year)
+            counter.update(last_value=F("last_value") + count)
+        last = counter.values_list("last_value", flat=True).get()
+    return range(last - count + 1, last + 1)
+
+
+def format_serial(prefix, year, number):
+    return f"{prefix}{year:02d}/{number:02d}"
+
+
+def next_serial(prefix, year=None):
+    """Next formatted serial, e.g. ``next_serial("CERT") -> "CERT25/08"``."""
+    year = current_year() if year is None else year
+    return format_serial(prefix, year, reserve(prefix, 1, year)[0])
+
+
+def reserve_serials(prefix, count, year=None):
+    """Block of formatted serials for bulk operations."""
+    year = current_year() if year is None else year
+    return [format_serial(prefix, year, n) for n in reserve(prefix, count, year)]
@@ -0,0 +1,111 @@
+# studentpanel/sessions.py
+"""
+Sessions and the logged-in user, served from a local cache.
+
+Sessions use the ``cached_db`` engine on the ``sessions`` cache, a
+FileBasedCache in /dev/shm where available (see settings.py), so every
+worker process on the machine shares it and no cache server is needed.
+Session writes still go to ``django_session``; reads come from the cache.
+
+``CachedModelBackend`` keeps the User behind ``request.user`` in the same
+cache for ``USER_TIMEOUT`` seconds. Saving or deleting a User drops the
+entry (signals.py); queryset updates of users only show after the timeout.
+Plain ModelBackend stays listed after it only so that sessions logged in
+before it keep resolving; a failed password check ends there instead of
+hashing the password a second time in ModelBackend.
+
+``purge_expired`` deletes expired sessions in short batches and removes
+expired cache files; ``purge_sessions --loop`` runs it periodically.
+
+``SessionFileCache`` is the backend of the ``sessions`` cache. Django's
+FileBasedCache lists the whole directory before every set to enforce
+MAX_ENTRIES; on tmpfs that measured 2.5 ms per set at 1,000 entries,
+17 ms at 10,000 and 126 ms at 50,000. This subclass does that check at
+most once per CULL_INTERVAL seconds per process, so a set costs one file
+write and the cache can overshoot MAX_ENTRIES by the sets of one interval.
+"""
+import time
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import PermissionDenied
+from django.utils import timezone
+
+CACHE_ALIAS  = "sessions"
+USER_TIMEOUT = 300
+PURGE_BATCH  = 1000
+CULL_INTERVAL = 60
+
+_last_cull = {}
+
+
+class SessionFileCache(FileBasedCache):
+    def _cull(self):
+        now = time.monotonic()
+        if now - _last_cull.get(self._dir, -CULL_INTERVAL) < CULL_INTERVAL:
+            return
+        _last_cull[self._dir] = now
+        super()._cull()
+
+
+def _user_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied      # stop: ModelBackend would run the same check
+        return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        user = await super().aauthenticate(request, username, password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        cache = caches[CACHE_ALIAS]
+        user = cache.get(_user_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(_user_key(user_id), user, USER_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        # ModelBackend's own aget_user would skip the cache (async views)
+        cache = caches[CACHE_ALIAS]
+        user = await cache.aget(_user_key(user_id))
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(_user_key(user_id), user, USER_TIMEOUT)
+        return user
+
+
+def forget_user(user_id):
+    caches[CACHE_ALIAS].delete(_user_key(user_id))
+
+
+def purge_expired(batch_size=PURGE_BATCH):
+    """Returns ``(sessions deleted, cache files removed)``."""
+    deleted = 0
+    expired = Session.objects.filter(expire_date__lt=timezone.now())
+    # small DELETEs: one big one would hold SQLite's write lock for long
+    while keys := list(expired.values_list("session_key", flat=True)[:batch_size]):
+        deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+
+    removed = 0
+    cache = caches[CACHE_ALIAS]
+    if hasattr(cache, "_list_cache_files"):      # FileBasedCache: expired files linger until read
+        for name in cache._list_cache_files():
+            try:
+                with open(name, "rb") as f:
+                    removed += cache._is_expired(f)     # deletes the file when expired
+            except FileNotFoundError:
+                pass
+    return deleted, removed
@@ -1,15 +1,73 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.utils import timezone
-from .models import StudentProfile, FeeChallan
+from . import allocation, availability, conditional, images, refdata, sessions
+from .models import (
+    StudentProfile, FeeChallan, Director, ProjectIncharge, BatchSlot, Project, ProjectSelection, Certificate, IDCard,
+)
+from .sequences import STUDENT_PREFIX, next_serial
+
+@receiver(pre_save, sender=StudentProfile)
+def generate_student_id(sender, instance, **kwargs):
+    # assigned before the INSERT, so a new profile is saved only once
+    if not instance.unique_id:
+        instance.unique_id = next_serial(STUDENT_PREFIX)   # e.g. "STVT25/01"
 
-@receiver(post_save, sender=StudentProfile)
-def generate_student_id(sender, instance, created, **kwargs):
-    if created and not instance.unique_id:
-        year_part   = timezone.now().strftime("%y")   # e.g. "25"
-        serial      = f"{instance.id:02d}"            # id 1 -> "01"
-        instance.unique_id = f"STVT{year_part}/{serial}"
-        instance.save()
 
+@receiver(post_save, sender=StudentProfile)
+def create_challan_placeholder(sender, instance, created, **kwargs):
+    if created:
         # create empty challan placeholder (status = Pending)
         FeeChallan.objects.create(student=instance)
+
+
+# ───────── Reference data cache ─────────
+@receiver([post_save, post_delete], sender=Director)
+@receiver([post_save, post_delete], sender=ProjectIncharge)
+@receiver([post_save, post_delete], sender=BatchSlot)
+@receiver([post_save, post_delete], sender=Project)
+def refresh_reference_data(sender, **kwargs):
+    refdata.bump()
+
+
+# ───────── Cached request user ─────────
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    sessions.forget_user(instance.pk)
+
+
+# ───────── Document validators ─────────
+@receiver([post_save, post_delete], sender=StudentProfile)
+def refresh_student_documents(sender, instance, **kwargs):
+    conditional.bump(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=FeeChallan)
+@receiver([post_save, post_delete], sender=IDCard)
+@receiver([post_save, post_delete], sender=Certificate)
+@receiver([post_save, post_delete], sender=ProjectSelection)
+def refresh_student_document(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= conditional.ARTIFACT_FIELDS:
+        return                          # only the rendered PDF was stored
+    conditional.bump(instance.student.user_id)
+
+
+# ───────── Seats ─────────
+@receiver(post_delete, sender=ProjectSelection)
+def release_seat(sender, instance, **kwargs):
+    allocation.release_seat(instance.project_id)
+
+
+@receiver(post_save, sender=Project)
+def refresh_seats(sender, instance, raw=False, **kwargs):
+    if not raw:
+        availability.refresh(instance.pk)
+
+
+# ───────── Image derivatives ─────────
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=ProjectIncharge)
+@receiver(post_save, sender=Director)
+def build_image_derivatives(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.update_derivatives(instance)
@@ -0,0 +1,177 @@
+# studentpanel/staticfiles.py
+"""
+Fingerprinted, precompressed static files.
+
+``CompressedManifestStaticFilesStorage`` is what collectstatic uses (see
+STORAGES in settings.py). Like Django's ManifestStaticFilesStorage it
+copies every file under a content-hashed name (logo.3f2a9c81d0e4.png) and
+rewrites the references in CSS. It also writes ``.gz`` (zopfli) and
+``.br`` (brotli) siblings of every text asset, where they are smaller.
+
+``StaticFilesMiddleware`` serves STATIC_ROOT from the app server. It
+picks the best precompressed variant the client accepts. Hashed names get
+a one-year ``immutable`` Cache-Control, so browsers stop revalidating.
+The file list is read once at start-up, so restart the workers after a
+collectstatic.
+"""
+import mimetypes
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate
+
+import brotli
+import zopfli.gzip
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+
+COMPRESSIBLE = {".css", ".js", ".mjs", ".map", ".svg", ".json", ".txt", ".html", ".xml", ".ico", ".ttf", ".otf", ".eot"}
+MIN_SIZE     = 256              # smaller files are not worth a second request header
+IMMUTABLE    = "public, max-age=31536000, immutable"
+SHORT        = "public, max-age=60"
+
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]     # preferred first
+
+
+# ───────────────────────────────
+# collectstatic
+# ───────────────────────────────
+def compress(path):
+    """
+    Write ``path.gz`` and ``path.br`` next to ``path`` when they come out
+    smaller. Existing siblings are kept: a hashed name only ever holds one
+    content, so a later collectstatic does not compress it again.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    for suffix, pack in ((".gz", lambda: zopfli.gzip.compress(data)),
+                         (".br", lambda: brotli.compress(data, quality=11))):
+        if os.path.exists(path + suffix):
+            continue
+        blob = pack()
+        if len(blob) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(blob)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # before the first collectstatic there is no manifest: serve plain names
+    # rather than failing every {% static %}
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.append(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        todo = [self.path(name) for name in set(hashed)
+                if os.path.splitext(name)[1].lower() in COMPRESSIBLE and self.size(name) >= MIN_SIZE]
+        # zopfli and brotli-11 are slow but CPU-bound: one process per core
+        with ProcessPoolExecutor() as pool:
+            list(pool.map(compress, todo, chunksize=8))
+
+
+# ───────────────────────────────
+# Serving
+# ───────────────────────────────
+class _StaticFile:
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.cache_control = IMMUTABLE if immutable else SHORT
+        self.variants = {enc: (path + ext, os.path.getsize(path + ext))
+                         for enc, ext in ENCODINGS if os.path.isfile(path + ext)}
+
+
+def _accepted(header):
+    """Codings in an Accept-Encoding header that are not refused with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not re.search(r"q\s*=\s*0(\.0*)?\s*$", params):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def build_index(root, prefix, immutable_names):
+    """``{url path: _StaticFile}`` for every file under ``root``, compressed siblings excluded."""
+    index = {}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            if filename.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            index[prefix + name] = _StaticFile(path, name in immutable_names)
+    return index
+
+
+class StaticFilesMiddleware:
+    """Serve STATIC_ROOT with precompressed variants; everything else passes through."""
+
+    # async-capable, so async views under ASGI are not pushed into a thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.strip("/") + "/"
+        root = getattr(settings, "STATIC_ROOT", None)
+        immutable = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        self.files = build_index(root, self.prefix, immutable) if root and os.path.isdir(root) else {}
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _lookup(self, request):
+        return self.files.get(request.path_info) if request.method in ("GET", "HEAD") else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        static = self._lookup(request)
+        if static is None:
+            return self.get_response(request)
+        return self.serve(request, static)
+
+    async def __acall__(self, request):
+        static = self._lookup(request)
+        if static is None:
+            return await self.get_response(request)
+        return self.serve(request, static)
+
+    def serve(self, request, static):
+        accepted = _accepted(request.headers.get("Accept-Encoding", ""))
+        encoding = next((enc for enc, _ in ENCODINGS if enc in accepted and enc in static.variants), None)
+        path, size = static.variants[encoding] if encoding else (static.path, static.size)
+        etag = static.etag[:-1] + f'-{encoding}"' if encoding else static.etag
+
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        elif request.method == "HEAD":
+            response = HttpResponse(content_type=static.content_type)
+            response["Content-Length"] = size
+        else:
+            response = FileResponse(open(path, "rb"), content_type=static.content_type)
+            del response["Content-Disposition"]         # would name the .br / .gz file
+        if encoding:
+            response["Content-Encoding"] = encoding
+        if static.variants:
+            response["Vary"] = "Accept-Encoding"
+        response["ETag"] = etag
+        response["Last-Modified"] = static.last_modified
+        response["Cache-Control"] = static.cache_control
+        return response
@@ -1,3 +1,1412 @@
-from django.test import TestCase
+import asyncio
+import brotli
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest import mock
+from urllib.parse import urlsplit
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.db.models import F
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import AsyncClient, AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from studentpanel.models import (
+    BatchSlot, CacheVersion, Certificate, Director, FeeChallan, IDCard, OutboundEmail, Project, ProjectIncharge,
+    ProjectSelection, SeatAvailability, StudentProfile,
+)
+from studentpanel import (
+    allocation, availability, benchmark, conditional, documents, images, instrumentation, media, outbox, refdata,
+    sequences, sessions, staticfiles, verification,
+)
+from studentpanel.pdf import PdfRenderError, merge_pdfs
+
+# the suite gets its own sessions cache instead of the one the site (or a
+# benchmark run) is using in CACHE_DIR, and a fast password hasher, since
+# every test student has a password
+TEST_SETTINGS = override_settings(
+    CACHES={
+        **settings.CACHES,
+        "sessions": {**settings.CACHES["sessions"], "LOCATION": tempfile.mkdtemp()},
+    },
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+
+
+def setUpModule():
+    TEST_SETTINGS.enable()
+
+
+def tearDownModule():
+    TEST_SETTINGS.disable()
+
+
+def make_student(username="student", branch="Mechanical", **extra):
+    user = User.objects.create_user(username=username, email=f"{username}@example.com", password="pass12345")
+    profile = StudentProfile.objects.create(
+        user=user,
+        student_name=username.title(),
+        father_name="Father",
+        college="College",
+        course="B.Tech",
+        branch=branch,
+        address="Lucknow 226001",
+        mobile="9999999999",
+        **extra,
+    )
+    return user, profile
+
+
+def make_project(code="P1", branch="Mechanical", slots=10, batch_slot=None):
+    if batch_slot is None:
+        batch_slot = BatchSlot.objects.create(
+            start_date=date(2025, 6, 1), end_date=date(2025, 6, 28), duration_weeks=4,
+        )
+    return Project.objects.create(
+        project_code=code, title=f"Project {code}", branch=branch,
+        slots=slots, batch_slot=batch_slot, duration_weeks=batch_slot.duration_weeks,
+    )
+
+
+# ───────────────────────── Dashboard ────────────────────────
+class DashboardQueryCountTests(TestCase):
+    TABS = ("profile", "challan", "batch", "admit", "certificate")
+
+    def setUp(self):
+        cache.clear()
+        refdata.invalidate()
+        self.user, self.profile = make_student()
+        FeeChallan.objects.filter(student=self.profile).update(ticket_number="T-1")
+        self.client.force_login(self.user)
+
+    def assertDashboardQueries(self):
+        self.client.get(reverse("studentpanel:dashboard"))     # warm the process caches
+        refdata.version()
+        cache.clear()                                           # ... but not the fragments
+        for tab in self.TABS:
+            # the batch tab also reads the reference-data stamp (checked on
+            # every access inside the test transaction)
+            extra = tab == "batch"
+            with self.subTest(tab=tab):
+                # the student's version stamp and the profile with just this
+                # tab's rows; the session and the user come from the session cache
+                with self.assertNumQueries(2 + extra):
+                    resp = self.client.get(reverse("studentpanel:dashboard"), {"tab": tab})
+                    self.assertEqual(resp.status_code, 200)
+                # then the fragment cache: only the stamp
+                with self.assertNumQueries(1 + extra):
+                    resp = self.client.get(reverse("studentpanel:dashboard_tab", args=[tab]))
+                    self.assertEqual(resp.status_code, 200)
+
+    def test_unverified_student(self):
+        self.assertDashboardQueries()
+
+    def test_verified_student_choosing_project(self):
+        make_project()
+        self.profile.payment_verified = True
+        self.profile.save()
+        self.assertDashboardQueries()
+
+    def test_selected_project(self):
+        ProjectSelection.objects.create(student=self.profile, project=make_project(), status="Approved")
+        self.profile.payment_verified = True
+        self.profile.save()
+        self.assertDashboardQueries()
+
+    def test_only_the_visible_tab_is_rendered(self):
+        resp = self.client.get(reverse("studentpanel:dashboard"), {"tab": "challan"})
+        self.assertContains(resp, "payment verification")
+        self.assertNotContains(resp, "Full Details")
+        self.assertContains(resp, reverse("studentpanel:dashboard_tab", args=["profile"]))
+
+        part = self.client.get(reverse("studentpanel:dashboard_tab", args=["profile"]))
+        self.assertContains(part, "Full Details")
+        self.assertNotContains(part, "<aside")
+        self.assertEqual(self.client.get("/dashboard/tab/nope/").status_code, 404)
+
+    def test_fragments_follow_changes(self):
+        url = reverse("studentpanel:dashboard_tab", args=["challan"])
+        challan = self.profile.feechallan
+        challan.challan_pdf.name = "challans/c.pdf"
+        challan.save()
+        self.assertContains(self.client.get(url), "payment pending")
+        challan.status = "Verified"
+        challan.save()
+        self.assertContains(self.client.get(url), "Payment verified")
+
+    def test_fragments_follow_admin_bulk_writes(self):
+        FeeChallan.objects.filter(student=self.profile).update(status="Sent")
+        url = reverse("studentpanel:dashboard_tab", args=["batch"])
+        self.assertContains(self.client.get(url), "Payment not verified")
+
+        self.client.force_login(User.objects.create_superuser("office", "office@example.com", None))
+        self.client.get(reverse("admin:fee_verify_single", args=[self.profile.feechallan.pk]))
+        self.client.force_login(self.user)
+        self.assertNotContains(self.client.get(url), "Payment not verified")
+
+    def test_ticket_form_is_not_cached(self):
+        FeeChallan.objects.filter(student=self.profile).update(ticket_number=None)
+        url = reverse("studentpanel:dashboard_tab", args=["batch"])
+        self.assertContains(self.client.get(url), "csrfmiddlewaretoken")
+        resp = self.client.post(reverse("studentpanel:dashboard"), {"ticket_submit": "1", "ticket_number": "T-1"})
+        self.assertRedirects(resp, "/dashboard/?tab=batch", fetch_redirect_response=False)
+        self.assertNotContains(self.client.get(url), "csrfmiddlewaretoken")
+
+    def test_project_request_reuses_available_list(self):
+        project = make_project()
+        self.profile.payment_verified = True
+        self.profile.save()
+        self.client.get(reverse("studentpanel:dashboard"))
+        availability.available_projects(self.profile.branch)
+        with self.assertNumQueries(9):
+            # profile, refdata stamp, seats left, savepoint/claim seat/insert
+            # selection/document version bump/seats left/release
+            resp = self.client.post(reverse("studentpanel:dashboard"), {"project_id": project.pk})
+        self.assertRedirects(resp, "/dashboard/?tab=batch", fetch_redirect_response=False)
+        project.refresh_from_db()
+        self.assertEqual(project.slots_taken, 1)
+
+
+# ───────────────────────── Certificates PDF ─────────────────
+def blank_pdf(pages=1):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+class MergePdfTests(TestCase):
+    def test_parts_are_concatenated_in_order(self):
+        merged = merge_pdfs([blank_pdf(1), blank_pdf(2)])
+        self.assertEqual(len(PdfReader(merged).pages), 3)
+
+    def test_single_part_is_passed_through(self):
+        part = blank_pdf(1)
+        self.assertEqual(merge_pdfs([part]).read(), part)
+
+
+class CertificatesPdfTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("office", password="pass12345", is_staff=True)
+        project = make_project()
+        self.certs = []
+        for name in ("alpha", "beta"):
+            _, profile = make_student(name)
+            ProjectSelection.objects.create(student=profile, project=project, status="Approved")
+            self.certs.append(Certificate.objects.create(student=profile, serial_number=f"CERT25/{name}"))
+
+    def test_students_cannot_download(self):
+        user, _ = make_student("gamma")
+        self.client.force_login(user)
+        resp = self.client.get(reverse("studentpanel:certificates_pdf"))
+        self.assertEqual(resp.status_code, 302)
+
+    @mock.patch("studentpanel.views.render_pdf_parallel")
+    def test_selected_certificates_rendered_into_one_pdf(self, render):
+        render.return_value = io.BytesIO(b"%PDF-merged")
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("studentpanel:certificates_pdf"), {"selected_ids": [self.certs[1].pk]})
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        self.assertEqual(b"".join(resp.streaming_content), b"%PDF-merged")
+        htmls = render.call_args.args[0]
+        self.assertEqual(len(htmls), 1)
+        self.assertIn("CERT25/beta", htmls[0])
+
+    def test_bad_ids_are_rejected(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("studentpanel:certificates_pdf"), {"selected_ids": "x"})
+        self.assertEqual(resp.status_code, 400)
+
+
+# ───────────────────────── Stored documents ─────────────────
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+@mock.patch("studentpanel.documents.render_pdf", side_effect=lambda html, base_url=None: b"%PDF-" + html[:10].encode())
+class StoredDocumentTests(TestCase):
+    def setUp(self):
+        self.user, self.profile = make_student()
+        self.project = make_project()
+        ProjectSelection.objects.create(student=self.profile, project=self.project, status="Approved")
+        self.cert = Certificate.objects.create(student=self.profile, serial_number="CERT25/01", is_verified=True)
+        self.client.force_login(self.user)
+
+    def get_certificate(self):
+        resp = self.client.get(reverse("studentpanel:certificate"))
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        return b"".join(resp.streaming_content)
+
+    def test_rendered_once_then_served_from_storage(self, render):
+        self.assertTrue(self.get_certificate().startswith(b"%PDF-"))
+        self.get_certificate()
+        self.assertEqual(render.call_count, 1)
+        self.cert.refresh_from_db()
+        self.assertTrue(self.cert.certificate_pdf.name.endswith(".pdf"))
+
+    def test_unrelated_change_keeps_artifact(self, render):
+        self.get_certificate()
+        self.profile.payment_verified = True
+        self.profile.save()
+        self.get_certificate()
+        self.assertEqual(render.call_count, 1)
+
+    def test_input_change_invalidates_artifact(self, render):
+        self.get_certificate()
+        Director.objects.create(name="New Director")
+        self.get_certificate()
+        self.project.title = "Renamed"
+        self.project.save()
+        self.get_certificate()
+        self.assertEqual(render.call_count, 3)
+
+    def test_challan_and_admit_card(self, render):
+        challan = self.profile.feechallan
+        resp = self.client.get(reverse("studentpanel:challan"))
+        self.assertEqual(resp.status_code, 302)        # not sent yet
+
+        challan.status = "Sent"
+        challan.save()
+        IDCard.objects.create(student=self.profile)
+        for name in ("challan", "admit_card", "challan", "admit_card"):
+            resp = self.client.get(reverse(f"studentpanel:{name}"))
+            self.assertEqual(resp["Content-Type"], "application/pdf")
+        self.assertEqual(render.call_count, 2)
+
+    def test_conditional_get(self, render):
+        url = reverse("studentpanel:certificate")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url)["ETag"], etag)       # storing the PDF is not a change
+        # the student's version stamp and the reference-data stamp (checked
+        # on every access inside the test transaction); nothing else
+        with self.assertNumQueries(2):
+            resp = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+
+        self.profile.college = "Other College"
+        self.profile.save()
+        resp = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(render.call_count, 2)
+
+    def test_conditional_get_admin_html(self, render):
+        url = reverse("studentpanel:certificate_admin", args=[self.cert.pk])
+        resp = self.client.get(url)
+        self.assertContains(resp, "CERTIFICATE")
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": resp["ETag"]}).status_code, 304)
+        Director.objects.create(name="New Director")
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": resp["ETag"]}).status_code, 200)
+
+    async def test_async_views(self, render):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        for name in ("admit_card", "challan"):                      # not issued yet
+            resp = await client.get(reverse(f"studentpanel:{name}"))
+            self.assertRedirects(resp, reverse("studentpanel:dashboard"), fetch_redirect_response=False)
+
+        url = reverse("studentpanel:certificate")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")      # no sync iterator consumed in one thread
+            resp = await client.get(url)
+            self.assertTrue(resp.is_async)
+            self.assertEqual(resp["Content-Type"], "application/pdf")
+            self.assertTrue(b"".join([part async for part in resp.streaming_content]).startswith(b"%PDF-"))
+        again = await client.get(url, headers={"If-None-Match": resp["ETag"]})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(render.call_count, 1)
+
+
+# ───────────────────────── Seat allocation ──────────────────
+class ClaimSeatTests(TestCase):
+    def setUp(self):
+        self.project = make_project(slots=1)
+
+    def test_claims_until_full(self):
+        _, first = make_student("first")
+        _, second = make_student("second")
+        self.assertEqual(allocation.claim_seat(first, self.project.pk)[0], allocation.ALLOCATED)
+        self.assertEqual(allocation.claim_seat(second, self.project.pk), (allocation.FULL, None))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.slots_taken, 1)
+
+    def test_second_claim_by_same_student_is_rolled_back(self):
+        self.project.slots = 5
+        self.project.save()
+        _, profile = make_student()
+        allocation.claim_seat(profile, self.project.pk)
+        self.assertEqual(allocation.claim_seat(profile, self.project.pk), (allocation.ALREADY_SELECTED, None))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.slots_taken, 1)
+
+    def test_other_branch_is_not_claimable(self):
+        _, profile = make_student(branch="Electrical")
+        self.assertEqual(allocation.claim_seat(profile, self.project.pk)[0], allocation.FULL)
+
+
+class ClaimSeatStressTests(TransactionTestCase):
+    STUDENTS = 60
+    SLOTS = 25
+
+    def test_concurrent_claims_never_oversubscribe(self):
+        project = make_project(slots=self.SLOTS)
+        profiles = [make_student(f"s{i}")[1] for i in range(self.STUDENTS)]
+        barrier = threading.Barrier(self.STUDENTS)
+
+        def claim(profile):
+            barrier.wait()
+            try:
+                return allocation.claim_seat(profile, project.pk)[0]
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.STUDENTS) as pool:
+            results = list(pool.map(claim, profiles))
+        elapsed = time.perf_counter() - started
+
+        project.refresh_from_db()
+        self.assertEqual(results.count(allocation.ALLOCATED), self.SLOTS)
+        self.assertEqual(results.count(allocation.FULL), self.STUDENTS - self.SLOTS)
+        self.assertEqual(project.slots_taken, self.SLOTS)
+        self.assertEqual(ProjectSelection.objects.filter(project=project).count(), self.SLOTS)
+        self.assertEqual(SeatAvailability.objects.get(pk=project.pk).seats_left, 0)
+        sys.stderr.write(f"\n[claim_seat] {self.STUDENTS / elapsed:.0f} claims/s with {self.STUDENTS} threads\n")
+
+
+# ───────────────────────── Outbox ───────────────────────────
+class OutboxTests(TestCase):
+    def test_queue_does_not_send(self):
+        outbox.queue_mail("Hello", "Body", None, ["a@example.com"])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.get().status, "Pending")
+
+    def test_worker_drains_in_batches(self):
+        for i in range(5):
+            outbox.queue_mail(f"Mail {i}", "Body", None, [f"s{i}@example.com"], html_message="<p>Body</p>")
+        out = io.StringIO()
+        call_command("send_outbox", batch_size=2, stdout=out)
+        self.assertIn("5 sent, 0 failed", out.getvalue())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertFalse(OutboundEmail.objects.exclude(status="Sent").exists())
+
+    def test_failures_back_off_then_give_up(self):
+        row = outbox.queue_mail("Hello", "Body", None, ["a@example.com"])
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("boom")):
+            self.assertEqual(outbox.send_pending(), (0, 1))
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts, row.last_error), ("Pending", 1, "boom"))
+            self.assertGreater(row.next_attempt_at, timezone.now())
+            self.assertEqual(outbox.send_pending(), (0, 0))     # not due yet
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            outbox.send_pending(max_attempts=2)
+        row.refresh_from_db()
+        self.assertEqual(row.status, "Failed")
+
+    def test_batches_are_claimed_before_sending(self):
+        for i in range(3):
+            outbox.queue_mail(f"Mail {i}", "Body", None, [f"s{i}@example.com"])
+        now = timezone.now()
+        first = outbox._claim(2, now)
+        self.assertEqual(len(first), 2)
+        self.assertEqual([r.subject for r in outbox._claim(5, now)], ["Mail 2"])    # the rest only
+        self.assertEqual(outbox._claim(5, now), [])
+
+        # a worker that died mid-batch: its rows are due again once the lease runs out
+        later = now + timedelta(seconds=outbox.LEASE_SECONDS + 1)
+        self.assertEqual(len(outbox._claim(5, later)), 3)
+
+    def test_admin_verification_queues_mail(self):
+        admin_user = User.objects.create_superuser("office", "office@example.com", None)
+        _, profile = make_student()
+        challan = profile.feechallan
+        challan.status = "Sent"
+        challan.save()
+        self.client.force_login(admin_user)
+        self.client.get(reverse("admin:fee_verify_single", args=[challan.pk]))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.get().recipients, profile.user.email)
+
+
+# ───────────────────────── Bulk challan actions ─────────────
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BulkChallanActionTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("office", "office@example.com", None))
+        self.profiles = [make_student(f"s{i}")[1] for i in range(4)]
+        self.url = reverse("admin:studentpanel_feechallan_changelist")
+
+    def run_action(self, action, challans):
+        return self.client.post(self.url, {
+            "action": action,
+            "_selected_action": [c.pk for c in challans],
+        }, follow=True)
+
+    @mock.patch("studentpanel.documents.render_pdfs_parallel", side_effect=lambda htmls, base_url=None: [b"%PDF-"] * len(htmls))
+    def test_issue_then_verify(self, render):
+        challans = list(FeeChallan.objects.order_by("pk"))
+        challans[0].status = "Sent"
+        challans[0].save()
+
+        resp = self.run_action("issue_challans", challans)
+        self.assertContains(resp, "Challans issued: 3, skipped (already issued): 1.")
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(FeeChallan.objects.filter(status="Sent").count(), 4)
+        self.assertTrue(all(c.challan_pdf for c in FeeChallan.objects.exclude(pk=challans[0].pk)))
+        self.assertEqual(OutboundEmail.objects.count(), 3)
+
+        resp = self.run_action("verify_payments", challans[:3])
+        self.assertContains(resp, "Payments verified: 3, skipped (not in &#x27;Sent&#x27; state): 0.")
+        self.assertEqual(StudentProfile.objects.filter(payment_verified=True).count(), 3)
+        self.assertEqual(OutboundEmail.objects.count(), 6)
+
+
+# ───────────────────────── Sequences ────────────────────────
+class SequenceTests(TestCase):
+    def test_student_ids_are_sequential_and_saved_once(self):
+        year = sequences.current_year()
+        with CaptureQueriesContext(connection) as ctx:
+            _, first = make_student("first")
+            _, second = make_student("second")
+        profile_writes = [q["sql"] for q in ctx.captured_queries if "studentpanel_studentprofile" in q["sql"]]
+        self.assertEqual(len(profile_writes), 2)        # one INSERT each, no follow-up UPDATE
+        self.assertEqual(first.unique_id, f"STVT{year}/01")
+        self.assertEqual(second.unique_id, f"STVT{year}/02")
+        self.assertTrue(FeeChallan.objects.filter(student=second).exists())
+
+    def test_block_reservation(self):
+        self.assertEqual(list(sequences.reserve("CERT", 3, year=25)), [1, 2, 3])
+        self.assertEqual(sequences.reserve_serials("CERT", 2, year=25), ["CERT25/04", "CERT25/05"])
+        self.assertEqual(sequences.next_serial("CERT", year=26), "CERT26/01")
+
+    def test_approval_uses_certificate_sequence(self):
+        self.client.force_login(User.objects.create_superuser("office", "office@example.com", None))
+        project = make_project()
+        for name in ("a", "b"):
+            _, profile = make_student(name)
+            sel = ProjectSelection.objects.create(student=profile, project=project)
+            self.client.get(reverse("admin:psel_approve", args=[sel.pk]))
+        year = sequences.current_year()
+        self.assertEqual(
+            sorted(Certificate.objects.values_list("serial_number", flat=True)),
+            [f"CERT{year}/01", f"CERT{year}/02"],
+        )
+
+
+class SequenceConcurrencyTests(TransactionTestCase):
+    def test_concurrent_reservations_do_not_overlap(self):
+        def take(_):
+            try:
+                return list(sequences.reserve("STVT", 5, year=25))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            blocks = list(pool.map(take, range(20)))
+        numbers = sorted(n for block in blocks for n in block)
+        self.assertEqual(numbers, list(range(1, 101)))
+
+
+# ───────────────────────── Reference data cache ─────────────
+class ReferenceDataTests(TestCase):
+    def setUp(self):
+        refdata.invalidate()
+
+    def test_cached_after_first_load(self):
+        Director.objects.create(name="Director A")
+        refdata.director()
+        # inside a transaction only the version stamp is re-checked
+        with self.assertNumQueries(1):
+            self.assertEqual(refdata.director().name, "Director A")
+
+    def test_saving_reference_data_invalidates(self):
+        director = Director.objects.create(name="Director A")
+        self.assertEqual(refdata.director().name, "Director A")
+        director.name = "Director B"
+        director.save()
+        self.assertEqual(refdata.director().name, "Director B")
+
+        slot = make_project().batch_slot
+        self.assertEqual(refdata.batch_slot(str(slot.pk)), slot)
+        self.assertIsNone(refdata.batch_slot("nope"))
+
+    @override_settings(REFDATA_CHECK_SECONDS=0)
+    def test_change_from_another_process_is_noticed_through_version(self):
+        Director.objects.create(name="Director A")
+        refdata.director()
+        # another worker: rows changed and stamp bumped, no signal here
+        Director.objects.update(name="Director B")
+        self.assertEqual(refdata.director().name, "Director A")
+        CacheVersion.objects.filter(name=refdata.VERSION_NAME).update(version=F("version") + 1)
+        self.assertEqual(refdata.director().name, "Director B")
+
+
+# ───────────────────────── Availability ─────────────────────
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        refdata.invalidate()
+        self.project = make_project(slots=2)
+        self.other_slot = make_project("P2", slots=1).batch_slot
+        make_project("P3", branch="Electrical", batch_slot=self.other_slot)
+
+    def available(self, **kwargs):
+        return {p.project_code: p.available for p in availability.available_projects("Mechanical", **kwargs)}
+
+    def test_one_query_for_the_seat_counts(self):
+        self.assertEqual(self.available(), {"P1": 2, "P2": 1})
+        self.assertEqual(self.available(batch_slot_id=self.other_slot.pk), {"P2": 1})
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.available(), {"P1": 2, "P2": 1})
+        self.assertEqual(len(ctx.captured_queries), 2)      # refdata stamp and the seat counts
+        self.assertFalse([q for q in ctx.captured_queries if "studentpanel_project" in q["sql"]])
+
+    def test_claim_and_release(self):
+        self.available()
+        _, first = make_student("first")
+        _, second = make_student("second")
+        allocation.claim_seat(first, self.project.pk)
+        allocation.claim_seat(second, self.project.pk)
+        self.assertEqual(self.available(), {"P2": 1})
+
+        ProjectSelection.objects.get(student=first).delete()
+        self.assertEqual(self.available(), {"P1": 1, "P2": 1})
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.slots_taken, 1)
+        self.assertEqual(SeatAvailability.objects.get(pk=self.project.pk).seats_left, 1)
+
+    def test_writes_elsewhere_show_at_once(self):
+        self.available()
+        availability.claimed(self.project.pk)       # e.g. another worker
+        self.assertEqual(self.available(), {"P1": 1, "P2": 1})
+
+    def test_approve_keeps_the_index(self):
+        _, profile = make_student("first")
+        _, sel = allocation.claim_seat(profile, self.project.pk)
+        self.client.force_login(User.objects.create_superuser("office", "office@example.com", None))
+        self.client.get(reverse("admin:psel_approve", args=[sel.pk]))
+        self.assertEqual(self.available(), {"P1": 1, "P2": 1})
+
+    def test_rebuild(self):
+        SeatAvailability.objects.all().delete()
+        Project.objects.filter(pk=self.project.pk).update(slots_taken=2)
+        availability.rebuild()
+        self.assertEqual(self.available(), {"P2": 1})
+        self.assertEqual(SeatAvailability.objects.count(), 3)
+
+    def test_editing_a_project(self):
+        self.available()
+        self.project.slots = 5
+        self.project.save()
+        self.assertEqual(self.available(), {"P1": 5, "P2": 1})
+
+
+# ───────────────────────── Query plans ──────────────────────
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN QUERY PLAN of the hot queries: each one must reach its table
+    through an index, never with a full table scan.
+    """
+
+    def assertSearches(self, queryset, table):
+        plan = queryset.explain()
+        steps = [line for line in plan.splitlines() if f" {table} " in f"{line} "]
+        self.assertTrue(steps, f"{table} not in plan:\n{plan}")
+        for step in steps:
+            self.assertIn("USING", step, f"full scan of {table}:\n{plan}")
+
+    def test_available_projects(self):
+        self.assertSearches(
+            SeatAvailability.objects.filter(branch="Mechanical", batch_slot_id__in=[1, 2], seats_left__gt=0)
+            .values_list("project_id", "seats_left"),
+            "studentpanel_seatavailability",
+        )
+
+    def test_project_admin_branch_filter(self):
+        self.assertSearches(Project.objects.filter(branch="Mechanical").order_by("-pk"), "studentpanel_project")
+
+    def test_selection_admin_status_filter(self):
+        self.assertSearches(ProjectSelection.objects.filter(status="Pending").order_by("-pk"),
+                            "studentpanel_projectselection")
+
+    def test_selection_admin_incharge_filter(self):
+        self.assertSearches(ProjectSelection.objects.filter(project__incharge_id=1),
+                            "studentpanel_projectselection")
+
+    def test_batch_roster(self):
+        self.assertSearches(ProjectSelection.objects.filter(project_id=1, status="Approved"),
+                            "studentpanel_projectselection")
+
+    def test_challan_admin_status_filter(self):
+        self.assertSearches(FeeChallan.objects.filter(status="Sent").order_by("-pk"), "studentpanel_feechallan")
+
+    def test_verified_certificates(self):
+        self.assertSearches(Certificate.objects.filter(is_verified=True).order_by("id"), "studentpanel_certificate")
+        self.assertSearches(Certificate.objects.filter(is_verified=True).order_by("-pk"), "studentpanel_certificate")
+
+    def test_certificate_by_serial(self):
+        self.assertSearches(Certificate.objects.filter(serial_number="CERT25/01"), "studentpanel_certificate")
+
+    def test_student_admin_branch_filter(self):
+        self.assertSearches(StudentProfile.objects.filter(branch="Mechanical").order_by("-pk"),
+                            "studentpanel_studentprofile")
+
+    def test_outbox_due_mails(self):
+        self.assertSearches(
+            OutboundEmail.objects.filter(status="Pending", next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at", "id"),
+            "studentpanel_outboundemail",
+        )
+
+
+# ───────────────────────── SQLite profile ───────────────────
+class SqliteProfileTests(TestCase):
+    def test_connection_uses_wal_and_immediate_transactions(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 20000)
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+
+# ───────────────────────── Image derivatives ────────────────
+def image_upload(name, size, color="navy", fmt="JPEG", draw=None):
+    img = Image.new("RGB", size, color)
+    if draw:
+        img.paste("black", draw)
+    out = io.BytesIO()
+    img.save(out, fmt)
+    return SimpleUploadedFile(name, out.getvalue())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImageDerivativeTests(TestCase):
+    def open(self, field):
+        with field.open("rb"), Image.open(field) as img:
+            return img.format, img.size
+
+    def test_photo_derivatives_built_on_upload(self):
+        _, profile = make_student(photo=image_upload("me.jpg", (2400, 3000)))
+        profile.refresh_from_db()
+        self.assertEqual(self.open(profile.photo_thumb), ("JPEG", (160, 200)))
+        self.assertEqual(self.open(profile.photo_print), ("JPEG", (480, 600)))
+        self.assertEqual(profile.photo_for_print, profile.photo_print)
+
+    def test_unchanged_photo_is_not_rebuilt(self):
+        _, profile = make_student(photo=image_upload("me.jpg", (800, 1000)))
+        profile.refresh_from_db()
+        with mock.patch.object(images, "print_photo") as build:
+            profile.payment_verified = True
+            profile.save()
+        build.assert_not_called()
+
+    def test_signature_is_trimmed(self):
+        # ink in a 300x60 box on a large white sheet
+        upload = image_upload("sig.png", (2000, 1000), color="white", fmt="PNG", draw=(500, 400, 800, 460))
+        incharge = ProjectIncharge.objects.create(name="Incharge", signature=upload)
+        incharge.refresh_from_db()
+        self.assertEqual(self.open(incharge.signature_print), ("PNG", (300, 60)))
+
+    def test_backfill_command(self):
+        _, profile = make_student(photo=image_upload("me.jpg", (800, 1000)))
+        StudentProfile.objects.filter(pk=profile.pk).update(photo_thumb="", photo_print="")
+        out = io.StringIO()
+        with self.assertLogs("studentpanel.images", "WARNING"):
+            StudentProfile.objects.create(user=User.objects.create_user("broken"), photo="photos/missing.jpg")
+            call_command("build_image_derivatives", stdout=out)
+        self.assertIn("student profiles: 1 of 2 updated.", out.getvalue())
+        profile.refresh_from_db()
+        self.assertTrue(profile.photo_thumb)
+        # a broken source keeps falling back to the original
+        broken = StudentProfile.objects.get(user__username="broken")
+        self.assertEqual(broken.photo_small, broken.photo)
+
+    def test_backfill_bumps_the_cache_stamps(self):
+        upload = image_upload("sig.png", (900, 300), color="white", fmt="PNG", draw=(100, 100, 400, 160))
+        director = Director.objects.create(name="Director", signature=upload)
+        _, profile = make_student(photo=image_upload("me.jpg", (800, 1000)))
+        Director.objects.filter(pk=director.pk).update(signature_print="")
+        StudentProfile.objects.filter(pk=profile.pk).update(photo_print="")
+        refdata.invalidate()
+        self.assertFalse(refdata.director().signature_print)
+        docs = conditional.student_version(profile.user_id)
+
+        call_command("build_image_derivatives", stdout=io.StringIO())
+        self.assertTrue(refdata.director().signature_print)
+        self.assertGreater(conditional.student_version(profile.user_id), docs)
+
+
+# ───────────────────────── Exports ──────────────────────────
+class ExportTests(TestCase):
+    def setUp(self):
+        staff = User.objects.create_user("office", is_staff=True)
+        self.client.force_login(staff)
+        self.slot = make_project().batch_slot
+        self.project = Project.objects.get()
+        for i, branch in enumerate(["Mechanical", "Mechanical", "Electrical"]):
+            _, profile = make_student(f"s{i}", branch=branch)
+            if branch == "Mechanical":
+                ProjectSelection.objects.create(student=profile, project=self.project,
+                                                status="Approved" if i == 0 else "Pending")
+
+    def export(self, kind, **params):
+        resp = self.client.get(reverse("studentpanel:export_data", args=[kind]), params)
+        self.assertTrue(resp.streaming)
+        return resp, b"".join(resp.streaming_content)
+
+    def test_csv_with_filters(self):
+        _, body = self.export("selections", status="Approved", batch_slot=self.slot.pk)
+        lines = body.decode("utf-8-sig").splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["Student ID", "Name", "Branch"])
+        self.assertEqual(len(lines), 2)
+        self.assertIn("S0", lines[1])
+
+        _, body = self.export("students", branch="Electrical")
+        self.assertEqual(len(body.decode("utf-8-sig").splitlines()), 2)
+
+    def test_xlsx_is_a_valid_workbook(self):
+        resp, body = self.export("students", format="xlsx")
+        self.assertIn("spreadsheetml", resp["Content-Type"])
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertIsNone(zf.testzip())
+            sheet = zf.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 4)
+        self.assertIn("<t xml:space=\"preserve\">S2</t>", sheet)
+
+    def test_one_query_for_the_rows(self):
+        self.client.get(reverse("studentpanel:export_data", args=["challans"]))     # warm session
+        with self.assertNumQueries(1):      # the rows; session and user are cached
+            self.export("challans")
+
+    def test_formulas_are_neutralised_in_csv(self):
+        StudentProfile.objects.filter(user__username="s2").update(student_name="=HYPERLINK(\"x\")", college="@SUM(A1)")
+        _, body = self.export("students", branch="Electrical")
+        row = next(csv.reader(io.StringIO(body.decode("utf-8-sig").splitlines()[1])))
+        self.assertEqual((row[1], row[3]), ("'=HYPERLINK(\"x\")", "'@SUM(A1)"))
+
+    def test_bad_filters_are_rejected(self):
+        url = reverse("studentpanel:export_data", args=["selections"])
+        self.assertEqual(self.client.get(url, {"batch_slot": "x"}).status_code, 404)
+        self.assertEqual(self.client.get(url, {"status": "Rejected"}).status_code, 404)
+        _, body = self.export("certificates", status="Verified")
+        self.assertEqual(len(body.decode("utf-8-sig").splitlines()), 1)
+
+    def test_unknown_export_and_non_staff(self):
+        self.assertEqual(self.client.get(reverse("studentpanel:export_data", args=["users"])).status_code, 404)
+        self.client.force_login(User.objects.get(username="s0"))
+        resp = self.client.get(reverse("studentpanel:export_data", args=["students"]))
+        self.assertEqual(resp.status_code, 302)
+
+
+# ───────────────────────── Rosters ──────────────────────────
+def fake_pdfs(htmls, base_url=None):
+    return [b"%PDF-roster " + h.encode()[-40:] for h in htmls]
+
+
+@mock.patch("studentpanel.documents.render_pdfs_parallel", side_effect=fake_pdfs)
+class RosterTests(TestCase):
+    def setUp(self):
+        # rosters are cached by file name, so every test needs empty storage
+        self.enterContext(override_settings(MEDIA_ROOT=tempfile.mkdtemp()))
+        self.client.force_login(User.objects.create_superuser("office", "office@example.com", None))
+        self.p1 = make_project("P1")
+        self.slot = self.p1.batch_slot
+        self.p2 = make_project("P2", batch_slot=self.slot)
+        for i, project in enumerate([self.p1, self.p1, self.p2]):
+            ProjectSelection.objects.create(student=make_student(f"s{i}")[1], project=project, status="Approved")
+
+    def get_zip(self):
+        resp = self.client.get(reverse("admin:batch_rosters", args=[self.slot.pk]))
+        self.assertEqual(resp["Content-Type"], "application/zip")
+        return zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content)))
+
+    def test_project_roster_is_a_pdf(self, render):
+        resp = self.client.get(reverse("admin:project_pdf", args=[self.p1.pk]))
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(resp.streaming_content).startswith(b"%PDF-"))
+        html = render.call_args[0][0][0]
+        self.assertIn("S1", html)
+        self.assertNotIn("window.print", html)
+
+    def test_slot_zip_reuses_unchanged_rosters(self, render):
+        with self.get_zip() as zf:
+            self.assertEqual(len(zf.namelist()), 2)
+            self.assertTrue(all(zf.read(n).startswith(b"%PDF-") for n in zf.namelist()))
+        self.assertEqual(len(render.call_args[0][0]), 2)
+
+        self.get_zip()
+        self.assertEqual(len(render.call_args[0][0]), 0)
+
+        ProjectSelection.objects.create(student=make_student("late")[1], project=self.p2, status="Approved")
+        self.get_zip()
+        self.assertEqual(len(render.call_args[0][0]), 1)      # only P2's roster changed
+        self.assertEqual(len(os.listdir(os.path.join(settings.MEDIA_ROOT, "rosters"))), 2)
+
+    def test_one_directory_listing_per_batch(self, render):
+        self.get_zip()
+        for i, project in enumerate([self.p1, self.p2]):
+            ProjectSelection.objects.create(student=make_student(f"late{i}")[1], project=project, status="Approved")
+        with mock.patch.object(documents.default_storage, "listdir", wraps=documents.default_storage.listdir) as listdir:
+            self.get_zip()
+        self.assertEqual(len(render.call_args[0][0]), 2)
+        self.assertEqual(listdir.call_count, 1)
+        self.assertEqual(len(os.listdir(os.path.join(settings.MEDIA_ROOT, "rosters"))), 2)
+
+    def test_admin_action(self, render):
+        resp = self.client.post(reverse("admin:studentpanel_batchslot_changelist"), {
+            "action": "download_rosters", "_selected_action": [self.slot.pk],
+        })
+        self.assertEqual(resp["Content-Type"], "application/zip")
+
+
+# ───────────────────────── Bulk admit cards ─────────────────
+def fake_admit_cards(htmls, base_url=None, workers=None, return_exceptions=False):
+    return [PdfRenderError("ValueError: broken photo") if "Broken" in h else b"%PDF-admit" for h in htmls]
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+@mock.patch("studentpanel.documents.render_pdfs_parallel", side_effect=fake_admit_cards)
+class BulkAdmitCardTests(TestCase):
+    def setUp(self):
+        self.project = make_project()
+        self.profiles = [make_student(f"s{i}")[1] for i in range(3)]
+        for profile in self.profiles:
+            ProjectSelection.objects.create(student=profile, project=self.project, status="Approved")
+        ProjectSelection.objects.create(student=make_student("pending")[1], project=self.project)
+
+    def generate(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command("generate_admit_cards", batch_slot=self.project.batch_slot_id, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_unchanged_cards_are_skipped(self, render):
+        out, _ = self.generate()
+        self.assertIn("3 issued, 0 re-rendered, 0 unchanged, 0 failed", out)
+        self.assertEqual(IDCard.objects.count(), 3)
+        self.assertTrue(all(c.id_pdf and c.input_hash for c in IDCard.objects.all()))
+
+        self.profiles[0].college = "Another College"
+        self.profiles[0].save()
+        out, _ = self.generate()
+        self.assertIn("0 issued, 1 re-rendered, 2 unchanged, 0 failed", out)
+        self.assertEqual(len(render.call_args[0][0]), 1)
+
+    def test_admit_tab_follows_bulk_issue(self, render):
+        self.client.force_login(self.profiles[0].user)
+        url = reverse("studentpanel:dashboard_tab", args=["admit"])
+        self.assertContains(self.client.get(url), "Admit card will be sent shortly")
+        self.generate()
+        self.assertContains(self.client.get(url), "Download Admit Card")
+
+    def test_failures_are_reported_not_issued(self, render):
+        self.profiles[1].student_name = "Broken"
+        self.profiles[1].save()
+        out, err = self.generate()
+        self.assertIn("2 issued, 0 re-rendered, 0 unchanged, 1 failed", out)
+        self.assertIn("ValueError: broken photo", err)
+        self.assertFalse(IDCard.objects.filter(student=self.profiles[1]).exists())
+
+    def test_admin_action_mails_newly_issued(self, render):
+        self.client.force_login(User.objects.create_superuser("office", "office@example.com", None))
+        resp = self.client.post(reverse("admin:studentpanel_project_changelist"), {
+            "action": "generate_admit_cards", "_selected_action": [self.project.pk],
+        }, follow=True)
+        self.assertContains(resp, "3 issued, 0 re-rendered, 0 unchanged, 0 failed")
+        self.assertEqual(OutboundEmail.objects.filter(subject="Your Admit Card is Ready").count(), 3)
+
+
+# ───────────────────────── Benchmark suite ──────────────────
+class BenchmarkTests(TestCase):
+    def test_seed_run_and_compare(self):
+        counts = benchmark.seed(60)
+        self.assertEqual(counts["students"], 60)
+        self.assertEqual(StudentProfile.objects.filter(user__username__startswith="bench").count(), 60)
+        self.assertFalse(Project.objects.filter(slots_taken__gt=F("slots")).exists())
+
+        report = benchmark.run(iterations=2, only=["dashboard.profile", "admin.studentprofile"])
+        self.assertEqual(report["meta"]["students"], 60)
+        result = report["results"]["dashboard.profile"]
+        self.assertEqual(result["status"], 200)
+        self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+        self.assertGreater(result["queries"], 0)
+
+        baseline = json.loads(json.dumps(report))
+        baseline["results"]["dashboard.profile"]["queries"] -= 1
+        regressed = [(name, metric) for name, metric, *_, bad in benchmark.compare(report, baseline) if bad]
+        self.assertEqual(regressed, [("dashboard.profile", "queries")])
+
+        benchmark.flush()
+        self.assertFalse(User.objects.filter(username__startswith="bench").exists())
+
+
+class HandlerThroughputTests(TransactionTestCase):
+    # the WSGI side runs in threads with their own connections: commit the data
+    def test_wsgi_and_asgi(self):
+        cache.clear()
+        benchmark.seed(30)
+        results = benchmark.handler_throughput([1, 4], requests=8, only=["dashboard_tab.certificate"])
+        self.assertEqual(list(results), ["dashboard_tab.certificate"])
+        for level in (1, 4):
+            result = results["dashboard_tab.certificate"][level]
+            self.assertEqual(result["errors"], 0)
+            self.assertGreater(result["wsgi_handler_rps"], 0)
+            self.assertGreater(result["asgi_handler_rps"], 0)
+
+
+class ServerThroughputTests(TestCase):
+    def test_load_generator(self):
+        # keep-alive with Content-Length, then chunked replies that close the connection
+        replies = [b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok",
+                   b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nConnection: close\r\n\r\n2\r\nok\r\n0\r\n\r\n"]
+
+        async def run(reply):
+            async def handle(reader, writer):
+                try:
+                    while True:
+                        await reader.readuntil(b"\r\n\r\n")
+                        writer.write(reply)
+                        await writer.drain()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    pass
+                writer.close()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                return await benchmark._load(port, b"GET / HTTP/1.1\r\nHost: x\r\n\r\n", 4, 0.2)
+
+        for reply in replies:
+            result = asyncio.run(run(reply))
+            self.assertEqual(result["errors"], 0)
+            self.assertGreater(result["rps"], 0)
+
+    def test_missing_server(self):
+        benchmark.seed(10)
+        with mock.patch("importlib.util.find_spec", return_value=None):
+            results = benchmark.server_throughput(["uvicorn"], [1, 4], only=["dashboard_tab.certificate"])
+        self.assertEqual(results["dashboard_tab.certificate"][4], {"uvicorn": {"error": "uvicorn is not installed"}})
+
+
+# ───────────────────── SQL instrumentation ──────────────────
+INSTRUMENTED = override_settings(
+    MIDDLEWARE=["studentpanel.instrumentation.SQLInstrumentationMiddleware"] + settings.MIDDLEWARE,
+    SQL_QUERY_BUDGET_STRICT=True,
+)
+
+
+@INSTRUMENTED
+class SQLInstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        refdata.invalidate()
+        instrumentation.reset()
+
+    def test_server_timing_and_summary(self):
+        user, _ = make_student()
+        self.client.force_login(user)
+        resp = self.client.get(reverse("studentpanel:dashboard"))
+        self.assertNotIn("Server-Timing", resp)         # students do not see timings
+        with self.settings(DEBUG=True):
+            self.assertIn("Server-Timing", self.client.get(reverse("studentpanel:dashboard")))
+
+        row, = instrumentation.summary()
+        self.assertEqual((row["view"], row["requests"]), ("studentpanel:dashboard", 2))
+        self.assertEqual(row["budget"], instrumentation.QUERY_BUDGETS["studentpanel:dashboard"])
+        self.assertTrue(row["slowest"])
+
+        staff = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(staff)
+        page = self.client.get(reverse("sql_stats"))
+        self.assertContains(page, "studentpanel:dashboard")
+        self.assertRegex(page["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    async def test_async_requests(self):
+        user, _ = await sync_to_async(make_student)()
+        staff = await User.objects.acreate(username="admin", is_staff=True)
+        await sync_to_async(refdata.director)()             # a cold cache is over the budget
+        client = AsyncClient()
+        await client.aforce_login(user)
+        url = reverse("studentpanel:challan")              # an async view
+        self.assertNotIn("Server-Timing", await client.get(url))
+        await client.aforce_login(staff)
+        self.assertRegex((await client.get(url))["Server-Timing"], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+        row, = await sync_to_async(instrumentation.summary)()
+        self.assertEqual((row["view"], row["requests"]), ("studentpanel:challan", 2))
+        self.assertGreater(row["max_queries"], 0)
+
+    def test_over_budget(self):
+        user, _ = make_student()
+        self.client.force_login(user)
+        with mock.patch.dict(instrumentation.QUERY_BUDGETS, {"studentpanel:dashboard": 0}):
+            with self.assertRaises(instrumentation.QueryBudgetExceeded):
+                self.client.get(reverse("studentpanel:dashboard"))
+            with self.settings(SQL_QUERY_BUDGET_STRICT=False), self.assertLogs("studentpanel.instrumentation", "WARNING"):
+                self.client.get(reverse("studentpanel:dashboard"))
+
+    def test_hot_views_within_budget(self):
+        # strict mode: any view over its budget raises here
+        benchmark.seed(60, projects_per_branch=4)
+        users = benchmark._sample_users()
+        for name, user_key, url, data in benchmark.scenarios():
+            if name in ("challan_view", "admit_card", "certificate"):      # PDF rendering, covered elsewhere
+                continue
+            with self.subTest(name):
+                self.client.force_login(User.objects.get(pk=users[user_key]))
+                resp = self.client.post(url, data) if data is not None else self.client.get(url)
+                self.assertIn(resp.status_code, (200, 302))
+
+    def test_selection_changelist_hides_sent_admit_cards(self):
+        _, with_card = make_student("withcard")
+        _, without_card = make_student("nocard")
+        project = make_project()
+        sent, unsent = (ProjectSelection.objects.create(student=p, project=project, status="Approved")
+                        for p in (with_card, without_card))
+        IDCard.objects.create(student=with_card)
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        resp = self.client.get(reverse("admin:studentpanel_projectselection_changelist"))
+        self.assertNotContains(resp, reverse("admin:psel_send_admit", args=[sent.pk]))
+        self.assertContains(resp, reverse("admin:psel_send_admit", args=[unsent.pk]))
+
+
+# ─────────────────────── Student import ─────────────────────
+IMPORT_HEADER = "Username,Email,Password,Student_Name,Father_Name,College,Course,Branch,Address,Mobile\n"
+
+
+def applicant_row(username, email=None, password="s3cret-pass", mobile="9876543210"):
+    email = email or f"{username}@example.com"
+    return f"{username},{email},{password},{username.title()},Father,College,B.Tech,Civil,\"Lucknow, 226001\",{mobile}\n"
+
+
+class ImportStudentsTests(TestCase):
+    def write_csv(self, *rows):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), "applicants.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(IMPORT_HEADER + "".join(rows))
+        return path
+
+    def test_import(self):
+        make_student("taken")
+        path = self.write_csv(
+            applicant_row("asha"),
+            applicant_row("ravi", password=""),
+            applicant_row("badmobile", mobile="12345"),
+            applicant_row("taken"),
+            applicant_row("twin", email="asha@example.com"),
+            applicant_row("meera"),
+        )
+        creds = os.path.join(os.path.dirname(path), "credentials.csv")
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_students", path, "--credentials", creds, "--workers", "2", "--chunk-size", "4",
+                     stdout=out, stderr=err)
+
+        self.assertIn("3 students imported, 3 skipped", out.getvalue())
+        self.assertIn("line 4: mobile must be 10 digits", err.getvalue())
+        self.assertIn("line 5: username already taken", err.getvalue())
+        self.assertIn("line 6: email repeated in the file", err.getvalue())
+
+        profiles = StudentProfile.objects.filter(user__username__in=["asha", "ravi", "meera"]).order_by("pk")
+        self.assertEqual([p.branch for p in profiles], ["Civil"] * 3)
+        self.assertEqual(len({p.unique_id for p in profiles}), 3)
+        self.assertTrue(all(p.unique_id.startswith(sequences.STUDENT_PREFIX) for p in profiles))
+        self.assertEqual(FeeChallan.objects.filter(student__in=profiles, status="Pending").count(), 3)
+        self.assertTrue(User.objects.get(username="asha").check_password("s3cret-pass"))
+
+        with open(creds, encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["username", "password"])
+        self.assertEqual([r[0] for r in rows[1:]], ["ravi"])
+        self.assertTrue(User.objects.get(username="ravi").check_password(rows[1][1]))
+
+    def test_model_field_rules(self):
+        path = self.write_csv(
+            applicant_row("asha"),
+            applicant_row("bad name!"),
+            applicant_row("longcollege").replace(",College,", "," + "C" * 151 + ","),
+            applicant_row("bademail", email="not-an-email"),
+        )
+        err = io.StringIO()
+        call_command("import_students", path, "--dry-run", stdout=io.StringIO(), stderr=err)
+        self.assertIn("line 3: username: Enter a valid username.", err.getvalue())
+        self.assertIn("line 4: college: Ensure this value has at most 150 characters", err.getvalue())
+        self.assertIn("line 5: email: Enter a valid email address.", err.getvalue())
+        self.assertNotIn("line 2", err.getvalue())
+
+    def test_conflicting_chunk_is_reported(self):
+        path = self.write_csv(applicant_row("asha"), applicant_row("ravi"))
+        err = io.StringIO()
+        with mock.patch("studentpanel.imports.sequences.reserve_serials", side_effect=IntegrityError("UNIQUE")):
+            call_command("import_students", path, "--workers", "1", stdout=io.StringIO(), stderr=err)
+        self.assertIn("line 2: not imported, re-run the import (UNIQUE)", err.getvalue())
+        self.assertFalse(User.objects.filter(username__in=["asha", "ravi"]).exists())
+
+    def test_dry_run_and_missing_password(self):
+        path = self.write_csv(applicant_row("asha"), applicant_row("ravi", password=""))
+        err = io.StringIO()
+        call_command("import_students", path, "--dry-run", stdout=io.StringIO(), stderr=err)
+        self.assertIn("line 3: no password", err.getvalue())
+        self.assertFalse(User.objects.filter(username="asha").exists())
+
+    def test_missing_column(self):
+        path = self.write_csv()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("username,email\n")
+        with self.assertRaisesMessage(CommandError, "Missing column(s): student_name"):
+            call_command("import_students", path, stdout=io.StringIO())
+
+
+# ─────────────────────── Cached sessions ────────────────────
+class CachedSessionTests(TestCase):
+    def setUp(self):
+        self.user, _ = make_student()
+
+    def test_request_user_cached_until_saved(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("studentpanel:dashboard"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("studentpanel:dashboard"))
+        tables = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("django_session", tables)
+        self.assertNotIn('FROM "auth_user"', tables)
+
+        self.user.is_active = False
+        self.user.save()
+        resp = self.client.get(reverse("studentpanel:dashboard"))
+        self.assertRedirects(resp, "/login/?next=/dashboard/", fetch_redirect_response=False)
+
+    def test_failed_login_hashes_once(self):
+        with mock.patch("django.contrib.auth.base_user.check_password", return_value=False) as check:
+            self.assertIsNone(authenticate(username="student", password="wrong"))
+        self.assertEqual(check.call_count, 1)
+        self.assertIsNotNone(authenticate(username="student", password="pass12345"))
+
+    def test_flash_messages_skip_the_session(self):
+        resp = self.client.post(reverse("studentpanel:login"), {"username": "student", "password": "wrong"})
+        self.assertIn("messages", resp.cookies)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, resp.cookies)
+
+    def test_cache_is_private_and_culled_lazily(self):
+        session_cache = caches["sessions"]
+        self.assertNotEqual(session_cache._dir, os.path.abspath(settings.CACHE_DIR))
+        sessions._last_cull.clear()
+        with mock.patch.object(session_cache, "_list_cache_files", wraps=session_cache._list_cache_files) as listing:
+            for i in range(3):
+                session_cache.set(f"k{i}", i)
+        self.assertEqual(listing.call_count, 1)
+
+    def test_purge_expired(self):
+        past = timezone.now() - timezone.timedelta(days=1)
+        Session.objects.bulk_create([Session(session_key=f"old{i:03d}", session_data="", expire_date=past)
+                                     for i in range(5)])
+        self.client.force_login(self.user)
+        out = io.StringIO()
+        call_command("purge_sessions", "--batch-size", "2", stdout=out)
+        self.assertIn("5 expired deleted", out.getvalue())
+        self.assertEqual(Session.objects.count(), 1)
+
+
+# ──────────────────────── Static files ──────────────────────
+class StaticPipelineTests(TestCase):
+    CSS = "body { background: url('logo.png'); }\n" + "".join(f".c{i} {{ margin: {i}px; }}\n" for i in range(40))
+
+    def setUp(self):
+        source = self.enterContext(tempfile.TemporaryDirectory())
+        self.root = self.enterContext(tempfile.TemporaryDirectory())
+        with open(os.path.join(source, "site.css"), "w") as f:
+            f.write(self.CSS)
+        Image.new("RGB", (4, 4), "navy").save(os.path.join(source, "logo.png"))
+        self.enterContext(override_settings(
+            STATICFILES_DIRS=[source], STATIC_ROOT=self.root,
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+        ))
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.middleware = staticfiles.StaticFilesMiddleware(lambda request: HttpResponse("app"))
+
+    def get(self, url, **headers):
+        return self.middleware(RequestFactory().get(url, headers=headers))
+
+    def test_collectstatic_fingerprints_and_compresses(self):
+        css = static("site.css")
+        self.assertRegex(css, r"^/static/site\.[0-9a-f]{12}\.css$")
+        path = os.path.join(self.root, css.removeprefix("/static/"))
+        with open(path, "rb") as f:
+            data = f.read()
+        self.assertIn(static("logo.png").removeprefix("/static/").encode(), data)    # reference rewritten
+        with open(path + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), data)
+        with open(path + ".br", "rb") as f:
+            self.assertEqual(brotli.decompress(f.read()), data)
+        self.assertFalse(any(name.endswith((".png.gz", ".png.br")) for name in os.listdir(self.root)))
+
+    def test_serves_negotiated_encoding_with_immutable_caching(self):
+        url = static("site.css")
+        resp = self.get(url, accept_encoding="gzip, br")
+        self.assertEqual((resp["Content-Encoding"], resp["Vary"]), ("br", "Accept-Encoding"))
+        self.assertEqual(resp["Cache-Control"], staticfiles.IMMUTABLE)
+        with open(os.path.join(self.root, url.removeprefix("/static/")), "rb") as f:
+            self.assertEqual(brotli.decompress(b"".join(resp.streaming_content)), f.read())
+
+        self.assertEqual(self.get(url, accept_encoding="br;q=0, gzip")["Content-Encoding"], "gzip")
+        plain = self.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(self.get(url, if_none_match=plain["ETag"]).status_code, 304)
+
+        self.assertEqual(self.get("/static/site.css")["Cache-Control"], staticfiles.SHORT)
+        self.assertEqual(self.get("/dashboard/").content, b"app")
+
+
+# ─────────────────────── Protected media ────────────────────
+class ProtectedMediaTests(TestCase):
+    PDF = b"%PDF-" + bytes(range(256)) * 4
+
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=tempfile.mkdtemp()))
+        self.user, profile = make_student()
+        self.cert = Certificate.objects.create(student=profile, serial_number="CERT25/01", is_verified=True)
+        self.cert.certificate_pdf.save("cert.pdf", ContentFile(self.PDF))
+        self.url = reverse("studentpanel:protected_media", args=["certificate", self.cert.pk])
+
+    def test_owner_staff_and_others(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)            # login first
+        self.client.force_login(make_student("other")[0])
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        for user in (self.user, User.objects.create_superuser("office", "office@example.com", None)):
+            self.client.force_login(user)
+            resp = self.client.get(self.url)
+            self.assertEqual((resp.status_code, resp["Content-Type"]), (200, "application/pdf"))
+            self.assertEqual(b"".join(resp.streaming_content), self.PDF)
+
+    def test_signed_link(self):
+        signed = media.signed_url("certificate", self.cert.pk)
+        self.assertEqual(self.client.get(signed).status_code, 200)
+        other = reverse("studentpanel:protected_media", args=["lor", self.cert.pk]) + "?" + signed.split("?")[1]
+        self.assertEqual(self.client.get(other).status_code, 403)
+        with self.settings(MEDIA_LINK_MAX_AGE=-1):
+            self.assertEqual(self.client.get(signed).status_code, 403)
+
+    def test_ranges_and_etag(self):
+        self.client.force_login(self.user)
+        full = self.client.get(self.url)
+        self.assertEqual(full["Accept-Ranges"], "bytes")
+
+        part = self.client.get(self.url, headers={"Range": "bytes=5-14"})
+        self.assertEqual(part.status_code, 206)
+        self.assertEqual(part["Content-Range"], f"bytes 5-14/{len(self.PDF)}")
+        self.assertEqual(b"".join(part.streaming_content), self.PDF[5:15])
+
+        tail = self.client.get(self.url, headers={"Range": "bytes=-4"})
+        self.assertEqual(b"".join(tail.streaming_content), self.PDF[-4:])
+        self.assertEqual(self.client.get(self.url, headers={"Range": "bytes=99999-"}).status_code, 416)
+        stale = self.client.get(self.url, headers={"Range": "bytes=0-1", "If-Range": '"old"'})
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(self.client.get(self.url, headers={"If-None-Match": full["ETag"]}).status_code, 304)
+
+    async def test_async_serve_off_the_event_loop(self):
+        threads, real_open = [], media._open
+
+        def record(*args):
+            threads.append(threading.get_ident())
+            return real_open(*args)
+
+        request = AsyncRequestFactory().get("/", headers={"Range": "bytes=5-14"})
+        with mock.patch.object(media, "_open", record):
+            resp = await media.aserve(request, self.cert.certificate_pdf)
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(b"".join([part async for part in resp.streaming_content]), self.PDF[5:15])
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_front_server_handoff(self):
+        self.client.force_login(self.user)
+        with self.settings(MEDIA_DELIVERY="x-accel-redirect"):
+            resp = self.client.get(self.url)
+            self.assertEqual(resp["X-Accel-Redirect"], "/protected-media/" + self.cert.certificate_pdf.name)
+            self.assertEqual(resp.content, b"")
+        with self.settings(MEDIA_DELIVERY="x-sendfile"):
+            self.assertEqual(self.client.get(self.url)["X-Sendfile"], self.cert.certificate_pdf.path)
+
+
+# ─────────────────────── Certificate verification ───────────────
+class VerificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _, profile = make_student()
+        self.project = make_project()
+        ProjectSelection.objects.create(student=profile, project=self.project, status="Approved")
+        self.cert = Certificate.objects.create(student=profile, serial_number="CERT25/01", is_verified=True)
+        url = urlsplit(verification.verify_url("CERT25/01"))
+        self.url = f"{url.path}?{url.query}"
+
+    def test_found_then_cached(self):
+        resp = self.client.get(self.url)
+        self.assertContains(resp, "Valid certificate")
+        self.assertContains(resp, "Project P1")
+        # the certificate's stamp, plus the reference-data stamp (re-checked
+        # on every access inside the test transaction)
+        with self.assertNumQueries(2):
+            again = self.client.get(self.url)
+        self.assertEqual(again.content, resp.content)
+        self.assertEqual(again["Cache-Control"], "public, max-age=300")
+
+    def test_forged_and_malformed_serials(self):
+        forged = reverse("studentpanel:verify_certificate", args=["CERT25/02"]) + "?t=" + "0" * 16
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(forged).status_code, 404)
+            self.assertEqual(self.client.get("/verify/../etc/passwd/").status_code, 404)
+            # serials are sequential, so the token is required
+            bare = reverse("studentpanel:verify_certificate", args=["CERT25/01"])
+            self.assertEqual(self.client.get(bare).status_code, 404)
+        missing = urlsplit(verification.verify_url("CERT25/02"))
+        self.assertContains(self.client.get(f"{missing.path}?{missing.query}"), "CERT25/02", status_code=404)
+
+    def test_etag_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        resp = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual((resp.status_code, resp["ETag"], resp.content), (304, etag, b""))
+
+    def test_save_invalidates(self):
+        self.client.get(self.url)
+        self.cert.is_verified = False
+        self.cert.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_edits_change_the_page(self):
+        self.client.get(self.url)
+        profile = self.cert.student
+        profile.student_name = "Renamed Student"
+        profile.save()
+        self.assertContains(self.client.get(self.url), "Renamed Student")
+        self.project.title = "Renamed Project"
+        self.project.save()
+        self.assertContains(self.client.get(self.url), "Renamed Project")
+
+    def test_qr_on_certificate(self):
+        context = documents.certificate_context(lambda url: url, self.cert.student, self.project, self.cert, None)
+        self.assertTrue(context["verify_qr"].startswith("data:image/svg+xml"))
@@ -9,6 +9,7 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path("dashboard/tab/<slug:tab>/", views.dashboard_tab, name="dashboard_tab"),
 
     # Batch Allotment – Step 1: Select Date
      path("batch/", views.batch_allotment, name="batch_allotment"),
@@ -24,9 +25,19 @@ urlpatterns = [
     path("certificate/<int:cert_id>/", views.certificate_admin, name="certificate_admin"),
     path("certificate/download_selected/", views.download_selected_certificates, name="download_selected_certificates"),
     path("certificate/view_all/", views.view_all_certificates, name="view_all_certificates"),
+    path("certificate/pdf/", views.certificates_pdf, name="certificates_pdf"),
 
 
     # Challan view
     path('challan/', views.challan_view, name='challan'),
 
+    # Public certificate check (QR code on the certificate)
+    path("verify/<path:serial_number>/", views.verify_certificate, name="verify_certificate"),
+
+    # Stored files behind an access check (owner, staff or signed link)
+    path("files/<slug:kind>/<int:pk>/", views.protected_media, name="protected_media"),
+
+    # Spreadsheet exports (staff)
+    path("export/<slug:kind>/", views.export_data, name="export_data"),
+
 ]
\ No newline at end of file
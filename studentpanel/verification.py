@@ -0,0 +1,114 @@
+# studentpanel/verification.py
+"""
+Public certificate verification.
+
+Every certificate PDF carries a QR code. It points to
+``/verify/<serial>/?t=<token>``, where the token is an HMAC of the serial
+under SECRET_KEY. The token is required: serials are sequential, so a
+bare serial would let anyone walk the register. A request without a
+matching token, or with a serial that does not look like one, gets the
+generic not-found page before any cache or database work.
+
+The rendered page is cached under a key that includes the certificate's
+stamp: its pk, the student's "docs:<user id>" version (bumped by saves of
+the certificate, the profile and the project selection, see
+conditional.py) and refdata.version() for project titles and batch dates.
+Reading the stamp is one indexed query, so a change made by any worker
+shows up on the next request in every process, and stale entries simply
+expire.
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from . import conditional, refdata
+from .models import Certificate
+
+CACHE_TIMEOUT     = 3600
+MISS_TIMEOUT      = 300
+TOKEN_LENGTH      = 16
+TEMPLATE          = "studentpanel/verify.html"
+SERIAL_RE         = re.compile(r"^[A-Z]{2,10}\d{2}/\d{1,6}$")
+_SALT             = "studentpanel.verification"
+
+
+def token(serial):
+    return salted_hmac(_SALT, serial).hexdigest()[:TOKEN_LENGTH]
+
+
+def token_ok(serial, value):
+    return constant_time_compare(token(serial), value or "")
+
+
+def verify_url(serial):
+    """Absolute URL for the QR code on the certificate."""
+    base = getattr(settings, "PUBLIC_BASE_URL", "").rstrip("/")
+    return f"{base}{reverse('studentpanel:verify_certificate', args=[serial])}?t={token(serial)}"
+
+
+def qr_data_uri(url):
+    """SVG QR code as a data: URI, or None when segno is not installed."""
+    try:
+        import segno
+    except ImportError:
+        return None
+    return segno.make(url, error="m").svg_data_uri(scale=3, border=2)
+
+
+def _key(serial, stamp):
+    # serials come from the URL, so hash them into a safe cache key
+    return "verify:" + hashlib.sha256(repr((serial, stamp)).encode("utf-8")).hexdigest()[:32]
+
+
+def _stamp(serial):
+    row = (
+        Certificate.objects
+        .filter(serial_number=serial)
+        .annotate(docs=conditional.student_version_subquery(OuterRef("student__user_id")))
+        .values_list("pk", "docs")
+        .first()
+    )
+    return row, refdata.version()
+
+
+def _render(serial):
+    row = (
+        Certificate.objects
+        .filter(serial_number=serial, is_verified=True)
+        .values(
+            "serial_number", "issued_on", "student__student_name", "student__college",
+            "student__projectselection__project__title",
+            "student__projectselection__project__batch_slot__start_date",
+            "student__projectselection__project__batch_slot__end_date",
+        )
+        .first()
+    )
+    body = render_to_string(TEMPLATE, {"serial": serial, "certificate": row}).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return (200 if row else 404), etag, body
+
+
+@lru_cache(maxsize=1)
+def not_found_page():
+    """Generic not-found page for forged tokens and malformed serials; no database work."""
+    body = render_to_string(TEMPLATE, {"serial": "", "certificate": None}).encode("utf-8")
+    return 404, '"' + hashlib.sha256(body).hexdigest()[:32] + '"', body
+
+
+def lookup(serial):
+    """``(status, etag, body)`` of the verification page for ``serial``."""
+    if not SERIAL_RE.match(serial):
+        return not_found_page()
+    key = _key(serial, _stamp(serial))
+    page = cache.get(key)
+    if page is None:
+        page = _render(serial)
+        cache.set(key, page, CACHE_TIMEOUT if page[0] == 200 else MISS_TIMEOUT)
+    return page
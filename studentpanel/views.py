@@ -1,11 +1,18 @@
 # studentpanel/views.py  ◆◆ copy-paste everything ◆◆
+import asyncio
 from datetime import date
-from django.contrib import messages
+from asgiref.sync import sync_to_async
+from django.contrib import admin, messages
 from django.contrib.auth import authenticate, login, logout
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.db.models import F
-from django.http import HttpResponse
-from django.views.decorators.http import require_http_methods
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition, require_http_methods
 from django.template.loader import render_to_string
 from django.db.models import Count
 from urllib.parse import urljoin
@@ -13,21 +20,18 @@ from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
+from . import allocation, availability, conditional, documents, exports, instrumentation, media, refdata, verification
+from .documents import certificate_context
+from .pdf import render_pdf_parallel
 from .forms import TicketForm, BatchSlotForm, RegistrationForm, ProjectRequestForm
 from .models import (
     StudentProfile,
     FeeChallan,
     ProjectSelection,
     IDCard,
-    Project,
-    BatchSlot,
     Certificate,
     ProjectIncharge,
-    Director,   # ✅ Added
 )
-    # Get director info
-
-director = Director.objects.first()
 
 # ───────────────────────── Register ─────────────────────────
 def register(request):
@@ -63,108 +67,157 @@ def logout_view(request):
 
 
 # ───────────────────────── Dashboard ────────────────────────
+def _one_to_one(obj, name):
+    """Reverse one-to-one accessor that returns None instead of raising."""
+    try:
+        return getattr(obj, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+# rows each tab reads, joined onto the profile in its one query
+DASHBOARD_TABS = {
+    "profile":     ("user",),
+    "challan":     ("feechallan",),
+    "batch":       ("feechallan", "projectselection__project__batch_slot", "projectselection__project__incharge"),
+    "admit":       ("idcard", "projectselection"),
+    "certificate": ("certificate",),
+}
+TAB_CACHE_TIMEOUT = 600
+
+
+def load_dashboard_profile(user, tab=None):
+    """Profile plus the one-to-one rows the dashboard (or one ``tab``) shows, in one query."""
+    related = DASHBOARD_TABS[tab] if tab else {r for rows in DASHBOARD_TABS.values() for r in rows}
+    return StudentProfile.objects.select_related(*related).filter(user=user).first()
+
+
+def _tab_context(profile, tab, ticket_form=None):
+    context = {"profile": profile}
+    if tab == "challan":
+        context["challan"] = _one_to_one(profile, "feechallan")
+    elif tab == "batch":
+        challan = _one_to_one(profile, "feechallan")
+        project_sel = _one_to_one(profile, "projectselection")
+        if ticket_form is None and challan and not challan.ticket_number:
+            ticket_form = TicketForm(instance=challan)
+        context.update({
+            "challan": challan,
+            "ticket_form": ticket_form,
+            "project_req": project_sel,
+            "project": project_sel.project if project_sel else None,
+        })
+    elif tab == "admit":
+        context["id_card"] = _one_to_one(profile, "idcard")
+        context["project_req"] = _one_to_one(profile, "projectselection")
+    elif tab == "certificate":
+        certificate = _one_to_one(profile, "certificate")
+        context.update({
+            "certificate": certificate,
+            "cert_ready": bool(certificate and certificate.is_verified),
+            # The certificate view serves the stored PDF (rendered on first request)
+            "cert_download_url": reverse("studentpanel:certificate"),
+        })
+    return context
+
+
+def _render_tab(request, tab, context):
+    return mark_safe(render_to_string(f"studentpanel/dashboard_tabs/{tab}.html", context, request))
+
+
+def _tab_html(request, tab):
+    """
+    Rendered partial of one tab, or None when the user has no profile.
+
+    Cached per student under the document version stamp (conditional.py),
+    which every change to the student's rows bumps, so a hit needs no
+    profile query. The batch tab also shows catalogue data, hence the
+    refdata stamp; while it holds the ticket form (with its CSRF token)
+    it is not cached.
+    """
+    stamps = [conditional.student_version(request.user.pk), request.user.email]
+    if tab == "batch":
+        stamps.append(refdata.version())
+    key = make_template_fragment_key(f"dashboard.{tab}", [request.user.pk, *stamps])
+    html = cache.get(key)
+    if html is None:
+        profile = load_dashboard_profile(request.user, tab)
+        if not profile:
+            return None
+        context = _tab_context(profile, tab)
+        html = _render_tab(request, tab, context)
+        if not context.get("ticket_form"):
+            cache.set(key, html, TAB_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+def _dashboard_page(request, tab, tab_html):
+    return render(request, "studentpanel/dashboard.html", {"tabs": DASHBOARD_TABS, "tab": tab, "tab_html": tab_html})
+
+
 @login_required
 def dashboard(request):
-    profile = StudentProfile.objects.filter(user=request.user).first()
+    tab = request.GET.get("tab", "profile")
+    if tab not in DASHBOARD_TABS:
+        tab = "profile"
+
+    if request.method != "POST":
+        # only the visible tab is rendered; the page fetches the others on demand
+        tab_html = _tab_html(request, tab)
+        if tab_html is None:
+            messages.warning(request, "Student profile not found. Please register first.")
+            return redirect("studentpanel:register")
+        return _dashboard_page(request, tab, tab_html)
+
+    profile = load_dashboard_profile(request.user)
     if not profile:
         messages.warning(request, "Student profile not found. Please register first.")
         return redirect("studentpanel:register")
 
-    challan = FeeChallan.objects.filter(student=profile).first()
-    project_sel = ProjectSelection.objects.filter(student=profile).first()
-    id_card = IDCard.objects.filter(student=profile).first()
+    challan = _one_to_one(profile, "feechallan")
+    project_sel = _one_to_one(profile, "projectselection")
 
     # ✅ Ticket Form Logic
-    ticket_form = None
-    if challan and not challan.ticket_number:
-        ticket_form = TicketForm(instance=challan)
-
-    if request.method == "POST" and "ticket_submit" in request.POST:
+    if "ticket_submit" in request.POST:
         ticket_form = TicketForm(request.POST, instance=challan)
         if ticket_form.is_valid():
             ticket_form.save()
             messages.success(request, "Ticket number submitted successfully!")
             return redirect("/dashboard/?tab=batch")
+        return _dashboard_page(request, "batch", _render_tab(request, "batch", _tab_context(profile, "batch", ticket_form)))
 
     # ✅ Project Request Logic
-    if request.method == "POST" and "project_id" in request.POST and profile.payment_verified:
-        form = ProjectRequestForm(profile.branch, request.POST)
-        if form.is_valid() and not project_sel:
-            proj = form.cleaned_data["project_id"]
-            ProjectSelection.objects.create(student=profile, project=proj, status="Pending")
-            proj.slots_taken = F("slots_taken") + 1
-            proj.save(update_fields=["slots_taken"])
-            messages.success(request, "Project request submitted. Await admin approval.")
+    if "project_id" in request.POST and profile.payment_verified and not project_sel:
+        # Evaluated once and shared with ProjectRequestForm
+        available_projects = availability.available_projects(profile.branch)
+        form = ProjectRequestForm(profile.branch, request.POST, projects=available_projects)
+        if form.is_valid():
+            status, _ = allocation.claim_seat(profile, form.cleaned_data["project_id"].pk)
+            if status == allocation.FULL:
+                messages.error(request, "This project is already full.")
+            else:
+                messages.success(request, "Project request submitted. Await admin approval.")
             return redirect("/dashboard/?tab=batch")
 
-    available_projects = None
-    if profile.payment_verified and not project_sel:
-        available_projects = (
-            Project.objects
-            .filter(branch=profile.branch)
-            .annotate(available=F("slots") - F("slots_taken"))
-            .filter(available__gt=0)
-        )
+    return redirect(f"/dashboard/?tab={tab}")
 
-    # ✅ Certificate context (NEW)
-    certificate = Certificate.objects.filter(student=profile).order_by('-id').first()
-    cert_ready = bool(certificate and getattr(certificate, 'certificate_pdf', None))
-    # Prefer stored file URL when present; else fall back to your old route (if it streams PDF)
-    cert_download_url = None
-    if cert_ready and certificate.certificate_pdf:
-        cert_download_url = certificate.certificate_pdf.url
-    else:
-        # optional fallback to old view if you had one:
-        try:
-            cert_download_url = reverse('studentpanel:certificate')
-        except Exception:
-            cert_download_url = None
-
-    context = {
-        "profile": profile,
-        "challan": challan,
-        "ticket_form": ticket_form,
-        "project_req": project_sel,
-        "project": project_sel.project if project_sel else None,
-        "available_projects": available_projects,
-        "id_card": id_card,
-        "lor_is_pdf": bool(profile.lor_file and profile.lor_file.name.lower().endswith(".pdf")),
-        "tab": request.GET.get("tab", "profile"),
-        "today": date.today(),
 
-        # NEW
-        "certificate": certificate,
-        "cert_ready": cert_ready,
-        "cert_download_url": cert_download_url,
-    }
-    return render(request, "studentpanel/dashboard.html", context)
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def dashboard_tab(request, tab):
+    """One dashboard tab as an HTML fragment, fetched by the dashboard page."""
+    if tab not in DASHBOARD_TABS:
+        raise Http404
+    tab_html = _tab_html(request, tab)
+    if tab_html is None:
+        raise Http404
+    return HttpResponse(tab_html)
 
 
 
 
 # ───────────────────────── Certificate ──────────────────────
-@login_required
-def certificate(request):
-    profile = StudentProfile.objects.filter(user=request.user).first()
-    if not profile:
-        messages.warning(request, "Student profile not found.")
-        return redirect("studentpanel:dashboard")
-
-    project_sel = (
-        ProjectSelection.objects
-        .filter(student=profile, status="Approved")
-        .select_related("project__batch_slot", "project__incharge")
-        .first()
-    )
-    if not project_sel:
-        messages.warning(request, "Project not found or not approved yet.")
-        return redirect("studentpanel:dashboard")
-
-    project = project_sel.project
-    batch_slot = project.batch_slot
-    certificate = Certificate.objects.filter(student=profile).first()
-    director = Director.objects.first()
-
+def _abs_url_builder(request):
     # --- Build absolute URLs so images always load in new tab/print ---
     base = request.build_absolute_uri("/")  # e.g. http://127.0.0.1:8000/
     def abs_url(path_or_none):
@@ -174,35 +227,46 @@ def certificate(request):
         if str(path_or_none).startswith("http://") or str(path_or_none).startswith("https://"):
             return path_or_none
         return urljoin(base, str(path_or_none).lstrip("/"))
+    return abs_url
 
-    # Logo from MEDIA (change to STATIC if you actually serve it from static)
-    logo_media_path = getattr(settings, "MEDIA_URL", "/media/") + "cert_assets/word/media/image1.png"
-    logo_url = abs_url(logo_media_path)
-
-    photo_url = abs_url(getattr(profile.photo, "url", None))
-    incharge_sig_url = abs_url(getattr(getattr(project.incharge, "signature", None), "url", None))
-    director_sig_url = abs_url(getattr(getattr(director, "signature", None), "url", None))
-
-    context = {
-        "profile": profile,
-        "project": project,
-        "incharge": project.incharge,
-        "director": director,
-        "start_date": getattr(batch_slot, "start_date", None),
-        "end_date": getattr(batch_slot, "end_date", None),
-        "today": date.today(),
-        "issue_date": getattr(batch_slot, "start_date", date.today()),
-        "certificate": certificate,
-
-        # absolute URLs used by the template
-        "logo_url": logo_url,
-        "photo_url": photo_url,
-        "incharge_sig_url": incharge_sig_url,
-        "director_sig_url": director_sig_url,
-    }
-    return render(request, "studentpanel/certificate.html", context)
+
+async def _pdf_response(request, field_file, etag=None):
+    return await media.aserve(request, field_file, etag=etag)
+
+
+# Repeat requests are answered with 304 by condition() from cheap version
+# stamps (see conditional.py), before any of the queries below.
+#
+# The student's own documents are async views: their lookups do not depend
+# on each other (all are keyed by the user), so they are issued together.
+@login_required
+@conditional.acondition(conditional.certificate_etag)
+async def certificate(request):
+    user = await request.auser()
+    has_profile, project_sel, certificate, director = await asyncio.gather(
+        StudentProfile.objects.filter(user=user).aexists(),
+        ProjectSelection.objects
+        .filter(student__user=user, status="Approved")
+        .select_related("project__batch_slot", "project__incharge")
+        .afirst(),
+        Certificate.objects.filter(student__user=user).select_related("student").afirst(),
+        sync_to_async(refdata.director)(),
+    )
+    if not has_profile:
+        messages.warning(request, "Student profile not found.")
+        return redirect("studentpanel:dashboard")
+    if not project_sel:
+        messages.warning(request, "Project not found or not approved yet.")
+        return redirect("studentpanel:dashboard")
+    if not certificate:
+        messages.warning(request, "Certificate not issued yet.")
+        return redirect("studentpanel:dashboard")
+
+    pdf = await sync_to_async(documents.certificate_pdf)(certificate, project_sel.project, director)
+    return await _pdf_response(request, pdf, request.document_etag)
 
 @login_required
+@condition(etag_func=conditional.certificate_admin_etag)
 def certificate_admin(request, cert_id):
     # Certificate ko fetch karo by id
     certificate = get_object_or_404(Certificate, id=cert_id)
@@ -211,34 +275,8 @@ def certificate_admin(request, cert_id):
     if not project_sel:
         return HttpResponse("Project not approved or missing.", status=404)
 
-    project = project_sel.project
-    batch_slot = project.batch_slot
-    director = Director.objects.first()
-
-    base = request.build_absolute_uri("/")
-    def abs_url(path_or_none):
-        if not path_or_none:
-            return None
-        if str(path_or_none).startswith("http"):
-            return path_or_none
-        return urljoin(base, str(path_or_none).lstrip("/"))
-
-    logo_media_path = getattr(settings, "MEDIA_URL", "/media/") + "cert_assets/word/media/image1.png"
-    context = {
-        "profile": profile,
-        "project": project,
-        "incharge": project.incharge,
-        "director": director,
-        "start_date": getattr(batch_slot, "start_date", None),
-        "end_date": getattr(batch_slot, "end_date", None),
-        "today": date.today(),
-        "issue_date": getattr(batch_slot, "start_date", date.today()),
-        "certificate": certificate,
-        "logo_url": abs_url(logo_media_path),
-        "photo_url": abs_url(getattr(profile.photo, "url", None)),
-        "incharge_sig_url": abs_url(getattr(getattr(project.incharge, "signature", None), "url", None)),
-        "director_sig_url": abs_url(getattr(getattr(director, "signature", None), "url", None)),
-    }
+    director = refdata.director()
+    context = certificate_context(_abs_url_builder(request), profile, project_sel.project, certificate, director)
     return render(request, "studentpanel/certificate.html", context)
 
 
@@ -248,16 +286,59 @@ def view_all_certificates(request):
     certificates = Certificate.objects.all()
     return render(request, "studentpanel/certificate_selected.html", {
         "certificates": certificates,
-        "today": date.today()
+        "today": date.today(),
+        "pdf_url": reverse("studentpanel:certificates_pdf"),
     })
 
 
+# ───────── Admin: Merged PDF of Certificates ─────────
+@staff_member_required
+def certificates_pdf(request):
+    """
+    All (or the ``selected_ids``) certificates as one multi-page PDF,
+    rendered server-side instead of one iframe per certificate.
+    """
+    certificates = (
+        Certificate.objects
+        .filter(student__projectselection__status="Approved")
+        .select_related(
+            "student",
+            "student__projectselection__project__batch_slot",
+            "student__projectselection__project__incharge",
+        )
+        .order_by("id")
+    )
+    try:
+        ids = [int(i) for i in request.GET.getlist("selected_ids")]
+    except ValueError:
+        return HttpResponse("selected_ids must be certificate ids.", status=400)
+    if ids:
+        certificates = certificates.filter(id__in=ids)
+
+    director = refdata.director()
+    abs_url = _abs_url_builder(request)
+    htmls = [
+        render_to_string(
+            "studentpanel/certificate.html",
+            certificate_context(abs_url, cert.student, cert.student.projectselection.project, cert, director),
+        )
+        for cert in certificates
+    ]
+    if not htmls:
+        return HttpResponse("No approved certificates selected.", status=404)
+
+    # the chunk PDFs are held in memory while they are merged; the merged
+    # file is written to a temporary file and streamed from there
+    pdf = render_pdf_parallel(htmls, base_url=request.build_absolute_uri("/"))
+    return FileResponse(pdf, content_type="application/pdf", filename=f"certificates_{date.today():%Y%m%d}.pdf")
+
+
 
 # ───────── Batch Allotment ─────────
 @login_required
 def batch_allotment(request):
     profile = StudentProfile.objects.get(user=request.user)
-    batch_slots = BatchSlot.objects.all().order_by("start_date")
+    batch_slots = refdata.batch_slots()
 
     already_selected = ProjectSelection.objects.filter(student=profile).first()
     if already_selected:
@@ -273,29 +354,22 @@ def batch_allotment(request):
     if request.method == "POST":
         slot_id = request.POST.get("batch_slot")
         if slot_id:
-            selected_slot = BatchSlot.objects.filter(id=slot_id).first()
+            selected_slot = refdata.batch_slot(slot_id)
 
         if "project_id" in request.POST:
             project_id = request.POST.get("project_id")
-            if project_id:
-                project = Project.objects.get(id=project_id)
-                if project.slots_taken >= project.slots:
+            if project_id and project_id.isdigit():
+                status, _ = allocation.claim_seat(profile, int(project_id))
+                if status == allocation.FULL:
                     messages.error(request, "This project is already full.")
                 else:
-                    ProjectSelection.objects.create(student=profile, project=project, status="Pending")
-                    project.slots_taken = F("slots_taken") + 1
-                    project.save(update_fields=["slots_taken"])
                     messages.success(request, "✅ Project request submitted successfully!")
                     return redirect("/dashboard/?tab=batch")
 
         if selected_slot:
-            available_projects = (
-                Project.objects
-                .filter(batch_slot=selected_slot, branch=profile.branch)
-                .select_related("incharge")
-                .annotate(available=F("slots") - F("slots_taken"))
-                .filter(available__gt=0)
-                .order_by("project_code")
+            available_projects = sorted(
+                availability.available_projects(profile.branch, selected_slot.pk),
+                key=lambda p: p.project_code,
             )
 
     return render(request, "studentpanel/select_project.html", {
@@ -328,62 +402,145 @@ def download_selected_certificates(request):
     certificates = Certificate.objects.filter(id__in=ids)
     return render(request, "studentpanel/certificate_selected.html", {
         "certificates": certificates,
-        "today": date.today()
+        "today": date.today(),
+        "pdf_url": reverse("studentpanel:certificates_pdf") + "?" + request.GET.urlencode(),
     })
 
 
 
 # ───────────────────────── Challan View ───────────────────────
 @login_required
-def challan_view(request):
-    profile = StudentProfile.objects.filter(user=request.user).first()
-    if not profile:
+@conditional.acondition(conditional.challan_etag)
+async def challan_view(request):
+    user = await request.auser()
+    has_profile, challan, director = await asyncio.gather(
+        StudentProfile.objects.filter(user=user).aexists(),
+        FeeChallan.objects.filter(student__user=user).select_related("student").afirst(),
+        sync_to_async(refdata.director)(),
+    )
+    if not has_profile:
         messages.warning(request, "Student profile not found. Please register first.")
         return redirect("studentpanel:register")
 
-    challan = FeeChallan.objects.filter(student=profile).first()
-    if not challan:
+    if not challan or challan.status == "Pending":
         messages.warning(request, "Fee Challan not generated yet.")
         return redirect("studentpanel:dashboard")
 
-    # Director singleton fetch karo
-    director = Director.objects.first()
-
-    context = {
-        "profile": profile,
-        "challan": challan,
-        "director": director,
-        "student_name": profile.user.get_full_name() or profile.user.username,  
-        "unique_id": profile.unique_id,
-        "date": challan.sent_on.strftime('%d-%m-%Y') if challan.sent_on else challan.created_on.strftime('%d-%m-%Y'),
-    }
-    return render(request, "studentpanel/challan.html", context)
+    pdf = await sync_to_async(documents.challan_pdf)(challan, director)
+    return await _pdf_response(request, pdf, request.document_etag)
 
 
 # ───────────────────────── Admit Card ───────────────────────
 @login_required
-def admit_card(request):
-    profile = StudentProfile.objects.filter(user=request.user).first()
-    if not profile:
-        messages.warning(request, "Profile not found.")
-        return redirect("studentpanel:dashboard")
-
-    psel = (
+@conditional.acondition(conditional.admit_card_etag)
+async def admit_card(request):
+    user = await request.auser()
+    has_profile, psel, idcard, director = await asyncio.gather(
+        StudentProfile.objects.filter(user=user).aexists(),
         ProjectSelection.objects
-        .filter(student=profile, status="Approved")
-        .select_related("project")
-        .first()
+        .filter(student__user=user, status="Approved")
+        .select_related("project__batch_slot")
+        .afirst(),
+        IDCard.objects.filter(student__user=user).select_related("student").afirst(),
+        sync_to_async(refdata.director)(),
     )
+    if not has_profile:
+        messages.warning(request, "Profile not found.")
+        return redirect("studentpanel:dashboard")
     if not psel:
         messages.warning(request, "Project not approved yet.")
         return redirect("studentpanel:dashboard")
+    if not idcard:
+        messages.warning(request, "Admit card not issued yet.")
+        return redirect("studentpanel:dashboard")
 
+    pdf = await sync_to_async(documents.admit_card_pdf)(idcard, psel.project, director)
+    return await _pdf_response(request, pdf, request.document_etag)
 
 
-    director = Director.objects.first()
-    context = {
-        "profile": profile,
-        "project": psel.project,
-        "director": director,
-    }
-    return render(request, "studentpanel/admit_card.html", context)
+# ─────────────────── Certificate verification ───────────────
+@require_http_methods(["GET", "HEAD"])
+def verify_certificate(request, serial_number):
+    """Public page confirming a verified certificate; see verification.py."""
+    if not verification.token_ok(serial_number, request.GET.get("t")):
+        status, etag, body = verification.not_found_page()
+    else:
+        status, etag, body = verification.lookup(serial_number)
+
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, status=status)
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=300"
+    return response
+
+
+# ──────────────────────── Protected media ───────────────────
+def protected_media(request, kind, pk):
+    """
+    A stored file (see media.KINDS) for its owner, staff, or anyone holding
+    a fresh signed link.
+    """
+    if kind not in media.KINDS:
+        raise Http404("Unknown file.")
+    model, attr, owner = media.KINDS[kind]
+    signed = media.valid_signature(kind, pk, request.GET.get("sig"))
+    if not signed and not request.user.is_authenticated:
+        if request.GET.get("sig"):
+            raise PermissionDenied("This link has expired.")
+        return redirect_to_login(request.get_full_path())
+
+    objects = model.objects.filter(pk=pk)
+    if not signed and not request.user.is_staff:
+        objects = objects.filter(**{owner: request.user.pk})
+    obj = objects.first()
+    field_file = getattr(obj, attr, None) if obj else None
+    if not field_file:
+        raise Http404("File not found.")
+    return media.serve(request, field_file)
+
+
+# ───────────────────────── Exports ──────────────────────────
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", exports.csv_stream),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", exports.xlsx_stream),
+}
+
+
+@staff_member_required
+def export_data(request, kind):
+    """
+    Stream one table as CSV or XLSX (``?format=xlsx``), optionally
+    filtered by ``branch``, ``batch_slot`` and ``status``.
+    """
+    export = exports.EXPORTS.get(kind)
+    fmt = request.GET.get("format", "csv")
+    if export is None or fmt not in EXPORT_FORMATS:
+        raise Http404("Unknown export.")
+
+    try:
+        rows = export.rows(request.GET)
+    except ValueError:
+        raise Http404("Unknown filter.")
+
+    content_type, stream = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(stream(export.header, rows), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{kind}_{date.today():%Y%m%d}.{fmt}"'
+    return response
+
+
+# ──────────────────────── SQL stats ─────────────────────────
+@staff_member_required
+def sql_stats(request):
+    """Rolling per-view SQL summary of this process (SQL_INSTRUMENTATION)."""
+    if request.method == "POST":
+        instrumentation.reset()
+        return redirect("sql_stats")
+    return render(request, "admin/sql_stats.html", {
+        **admin.site.each_context(request),
+        "title": "SQL per view",
+        "enabled": "studentpanel.instrumentation.SQLInstrumentationMiddleware" in settings.MIDDLEWARE,
+        "rows": instrumentation.summary(),
+        "window": instrumentation.WINDOW,
+    })
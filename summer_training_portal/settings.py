@@ -59,6 +59,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -96,6 +97,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'studentpanel.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -104,6 +106,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL counts / timings, Server-Timing header and /admin/sql-stats/
+if os.environ.get('SQL_INSTRUMENTATION'):
+    MIDDLEWARE.insert(0, 'studentpanel.instrumentation.SQLInstrumentationMiddleware')
+
 ROOT_URLCONF = 'summer_training_portal.urls'
 
 TEMPLATES = [
@@ -127,13 +133,57 @@ WSGI_APPLICATION = 'summer_training_portal.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# SQLite tuned for many concurrent students:
+#  - WAL: readers no longer block the writer, and the writer no longer blocks readers
+#  - timeout: wait up to 20 s for the write lock instead of failing at once
+#    with "database is locked"
+#  - IMMEDIATE: write transactions take the lock at BEGIN. A deferred
+#    transaction that reads first and then writes can fail on the upgrade
+#    no matter how long the timeout is.
+SQLITE_OPTIONS = {
+    'timeout': 20,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
 }
 
+if os.environ.get('DB_ENGINE') == 'postgresql':
+    # Optional PostgreSQL with a psycopg 3 connection pool
+    # (pip install "psycopg[binary,pool]"). Pooling replaces CONN_MAX_AGE,
+    # which must stay 0 when 'pool' is set.
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'stvt'),
+            'USER': os.environ.get('DB_USER', 'stvt'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX', 10)),
+                    'timeout': 10,
+                },
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            # SQLITE_PATH: e.g. a scratch database for the benchmarks
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': SQLITE_OPTIONS,
+            # Keep connections open between requests; the PRAGMAs above run
+            # once per connection instead of once per request.
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            # File-backed test database: the in-memory one cannot be shared
+            # between the threads of the concurrency tests.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -171,16 +221,64 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [ BASE_DIR / 'static' ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic writes content-hashed names plus .br / .gz siblings
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'studentpanel.staticfiles.CompressedManifestStaticFilesStorage'},
+}
 
 MEDIA_URL  = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# how studentpanel.media sends protected files: "django", "x-accel-redirect"
+# (nginx, internal location at MEDIA_ACCEL_PREFIX) or "x-sendfile"
+MEDIA_DELIVERY = os.environ.get('MEDIA_DELIVERY', 'django')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_LINK_MAX_AGE = 7 * 24 * 3600      # signed email links
+
+# public address of the portal, for links printed on documents (QR codes)
+PUBLIC_BASE_URL = os.environ.get('PUBLIC_BASE_URL', 'http://127.0.0.1:8000')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Caches: the default one is per process; sessions and the logged-in user
+# live in a file cache shared by every worker on the machine (tmpfs when
+# /dev/shm exists), so no cache server is needed
+CACHE_DIR = os.environ.get('CACHE_DIR') or (
+    '/dev/shm/stvt-cache' if os.path.isdir('/dev/shm') else str(BASE_DIR / '.cache')
+)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        # FileBasedCache that does not list the directory on every set
+        'BACKEND': 'studentpanel.sessions.SessionFileCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# sessions logged in before the cached backend still resolve via ModelBackend;
+# logins are checked by CachedModelBackend alone (it stops on a failed password)
+AUTHENTICATION_BACKENDS = [
+    'studentpanel.sessions.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# flash messages travel in a cookie, so showing one never writes the session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
 # Where to send unauthenticated users
 LOGIN_URL = "/login/"
 
@@ -7,8 +7,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from studentpanel.views import sql_stats
+
 urlpatterns = [
     # Admin – Jazzmin will skin this automatically
+    path("admin/sql-stats/", sql_stats, name="sql_stats"),
     path("admin/", admin.site.urls),
 
     # Student panel app (handles register, login, dashboard, etc.)